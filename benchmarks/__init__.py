@@ -0,0 +1,5 @@
+"""Performance benchmarks for lexing, parsing, matching and dispatch.
+
+Run with `python -m benchmarks run` and compare two runs with
+`python -m benchmarks compare <baseline.json> <current.json>`.
+"""
@@ -0,0 +1,53 @@
+import argparse
+import fnmatch
+import sys
+from . import suite  # noqa: F401 (registers benchmarks)
+from .runner import BENCHMARKS, run, compare, load, save
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='cliffs benchmarks')
+    subparsers = parser.add_subparsers(dest='action', required=True)
+
+    run_parser = subparsers.add_parser('run', help='run benchmarks')
+    run_parser.add_argument('-o', '--output', help='write results as JSON to this file')
+    run_parser.add_argument('-k', '--select', action='append', default=[],
+                            help='only run benchmarks matching this glob pattern (repeatable)')
+    run_parser.add_argument('--repeat', type=int, default=5, help='number of measurements per benchmark')
+    run_parser.add_argument('--min-time', type=float, default=0.2, help='minimum duration of a measurement in seconds')
+
+    compare_parser = subparsers.add_parser('compare', help='compare two runs')
+    compare_parser.add_argument('baseline', help='results of the baseline run')
+    compare_parser.add_argument('current', help='results of the current run')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help='relative slowdown reported as a regression (default: 0.1)')
+
+    subparsers.add_parser('list', help='list benchmarks')
+
+    args = parser.parse_args(argv)
+
+    if args.action == 'list':
+        print('\n'.join(BENCHMARKS))
+
+    elif args.action == 'run':
+        names = [name for name in BENCHMARKS
+                 if args.select == [] or any(fnmatch.fnmatch(name, p) for p in args.select)]
+        if names == []:
+            print('no benchmarks matched')
+            return 1
+
+        results = run(names, repeat=args.repeat, min_time=args.min_time)
+        if args.output is not None:
+            save(results, args.output)
+
+    elif args.action == 'compare':
+        regressions = compare(load(args.baseline), load(args.current), args.threshold)
+        if regressions != []:
+            print(f'{len(regressions)} regression(s) above {args.threshold:.0%}')
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+import json
+import platform
+import timeit
+from typing import Callable, Iterable, Optional
+
+
+# Registered benchmarks: name -> setup function returning the callable to time
+BENCHMARKS: dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """(decorator)
+    Registers a benchmark. The annotated function performs any setup and returns
+    the callable to be timed.
+    """
+
+    def decorator(setup: Callable[[], Callable[[], object]]):
+        if name in BENCHMARKS:
+            raise ValueError(f"Benchmark {repr(name)} registered more than once")
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+def run(names: Optional[Iterable[str]] = None, repeat: int = 5, min_time: float = 0.2,
+        log: Callable[[str], None] = print) -> dict:
+    """Runs the selected benchmarks and returns the results as a JSON-serializable dict.
+    The time per operation is the best of `repeat` measurements, each running the
+    benchmark at least for `min_time` seconds."""
+
+    results = {}
+
+    for name in names if names is not None else BENCHMARKS:
+        fn = BENCHMARKS[name]()
+        timer = timeit.Timer(fn)
+
+        # Find the number of loops taking at least min_time
+        number = 1
+        while True:
+            elapsed = timer.timeit(number)
+            if elapsed >= min_time:
+                break
+            number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+
+        best = min([elapsed] + timer.repeat(repeat - 1, number)) / number
+        results[name] = {'seconds_per_op': best, 'loops': number}
+        log(f'{name:<48} {best * 1e6:12.2f} us/op')
+
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1,
+            log: Callable[[str], None] = print) -> list[str]:
+    """Compares two benchmark runs and returns the names of the benchmarks that
+    became slower by more than the given relative threshold."""
+
+    regressions = []
+
+    for name, result in current['results'].items():
+        if name not in baseline['results']:
+            log(f'{name:<48} {"(new)":>12}')
+            continue
+
+        ratio = result['seconds_per_op'] / baseline['results'][name]['seconds_per_op']
+
+        if ratio > 1 + threshold:
+            status = 'REGRESSION'
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            status = 'improvement'
+        else:
+            status = ''
+
+        log(f'{name:<48} {ratio:11.2f}x {status}')
+
+    return regressions
+
+
+def load(path: str) -> dict:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save(results: dict, path: str):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
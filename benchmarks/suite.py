@@ -0,0 +1,199 @@
+import random
+from itertools import cycle
+from cliffs import CommandDispatcher, Command, CallMatchFail, CommandDispatchError
+from cliffs.call_lexer import CallLexer
+from cliffs.syntax_lexer import SyntaxLexer
+from cliffs.syntax_parser import SyntaxParser
+from cliffs.corpus import CorpusGenerator
+from .runner import benchmark
+
+
+NOUNS = ['cluster', 'node', 'pool', 'user', 'table', 'job', 'queue', 'disk']
+VERBS = ['get', 'set', 'list', 'drain', 'describe', 'create', 'delete', 'cordon']
+
+COMPLEX_SYNTAX = 'set [loud] alarm at <hour: int> [am|pm] [every <days>] {[saying <message>] [repeat <n: int>]}'
+COMPLEX_CALL = 'set loud alarm at 7 pm every monday repeat 3 saying "Hello, world!"'
+
+# Syntax and a matching call for each node type
+NODE_SYNTAXES = {
+    'literal': ('foo', 'foo'),
+    'parameter': ('<a>', 'foo'),
+    'typed_parameter': ('<a: int>', '42'),
+    'varargs': ('<a*>', 'foo bar baz'),
+    'tail': ('<a...>', 'foo bar baz'),
+    'sequence': ('a b c d', 'a b c d'),
+    'optional_sequence': ('[a b] c', 'a b c'),
+    'variant_group': ('(a|b|c|d)', 'd'),
+    'unordered_group': ('{a b c d}', 'd c b a'),
+    'complex': (COMPLEX_SYNTAX, COMPLEX_CALL),
+}
+
+
+def command_syntax(i: int) -> str:
+    return f'{NOUNS[i % len(NOUNS)]} {VERBS[i // len(NOUNS) % len(VERBS)]} item{i} <id>'
+
+
+def make_dispatcher(num_commands: int, **kwargs) -> CommandDispatcher:
+    dispatcher = CommandDispatcher(**kwargs)
+    for i in range(num_commands):
+        dispatcher.command(command_syntax(i))(lambda id: id)
+    return dispatcher
+
+
+def make_calls(num_commands: int, mix: str, count: int = 16) -> list[str]:
+    rng = random.Random(num_commands)
+    calls = []
+
+    for _ in range(count):
+        i = rng.randrange(num_commands)
+        noun, verb = NOUNS[i % len(NOUNS)], VERBS[i // len(NOUNS) % len(VERBS)]
+
+        if mix == 'hit':
+            calls.append(f'{noun} {verb} item{i} 42')
+        elif mix == 'typo':
+            calls.append(f'{noun} {verb} itme{i} 42')
+        elif mix == 'unknown':
+            calls.append(f'frobnicate {rng.randrange(1000)}')
+        else:
+            raise ValueError(f"Unknown call mix: {mix}")
+
+    return calls
+
+
+@benchmark('call_lexer.tokenize')
+def bench_call_lexer():
+    lexer = CallLexer()
+    return lambda: list(lexer.tokenize(COMPLEX_CALL))
+
+
+@benchmark('syntax_lexer.tokenize')
+def bench_syntax_lexer():
+    lexer = SyntaxLexer()
+    return lambda: list(lexer.tokenize(COMPLEX_SYNTAX))
+
+
+@benchmark('syntax_parser.parse')
+def bench_syntax_parser():
+    parser = SyntaxParser()
+    return lambda: parser.parse(COMPLEX_SYNTAX)
+
+
+def _bench_match(syntax: str, call: str):
+    command = Command(SyntaxParser().parse(syntax), lambda: None)
+
+    def run():
+        command.match(command.begin_match(call))
+
+    # Make sure the call actually matches
+    run()
+    return run
+
+
+for _node_type, (_syntax, _call) in NODE_SYNTAXES.items():
+    benchmark(f'command.match[{_node_type}]')(lambda syntax=_syntax, call=_call: _bench_match(syntax, call))
+
+
+@benchmark('command.match[generated]')
+def bench_match_generated():
+    generator = CorpusGenerator(seed=0)
+    commands = []
+
+    while len(commands) < 16:
+        syntax = generator.random_syntax(depth=2, fanout=3, unordered_size=3)
+        call = generator.call(syntax)
+        if call is not None:
+            commands.append((Command(SyntaxParser().parse(syntax), lambda: None), call))
+
+    workload = cycle(commands)
+
+    def run():
+        command, call = next(workload)
+        command.match(command.begin_match(call))
+
+    return run
+
+
+def _bench_dispatch(num_commands: int, mix: str, **kwargs):
+    dispatcher = make_dispatcher(num_commands, **kwargs)
+    calls = cycle(make_calls(num_commands, mix))
+
+    def run():
+        try:
+            dispatcher.dispatch(next(calls))
+        except (CallMatchFail, CommandDispatchError):
+            pass
+
+    return run
+
+
+for _num_commands in (10, 1_000, 10_000):
+    for _mix in ('hit', 'typo', 'unknown'):
+        benchmark(f'dispatch[{_num_commands}, {_mix}]')(
+            lambda n=_num_commands, mix=_mix: _bench_dispatch(n, mix))
+        benchmark(f'dispatch[routed, {_num_commands}, {_mix}]')(
+            lambda n=_num_commands, mix=_mix: _bench_dispatch(n, mix, prefix_routing=True))
+        benchmark(f'dispatch[automaton, {_num_commands}, {_mix}]')(
+            lambda n=_num_commands, mix=_mix: _bench_dispatch(n, mix, automaton=True))
+        benchmark(f'dispatch[adaptive, {_num_commands}, {_mix}]')(
+            lambda n=_num_commands, mix=_mix: _bench_dispatch(n, mix, adaptive_order={'interval': 16}))
+
+
+def _bench_suggest(num_commands: int):
+    from cliffs.suggest import SuggestionIndex
+
+    dispatcher = make_dispatcher(num_commands)
+    index = SuggestionIndex(timeout=1.)
+    for command in dispatcher._commands:
+        index.add(command)
+
+    calls = cycle(call.replace(' 42', '') for call in make_calls(num_commands, 'typo'))
+
+    def run():
+        index.suggest(next(calls))
+
+    return run
+
+
+for _num_commands in (10, 1_000, 10_000):
+    benchmark(f'suggest[{_num_commands}]')(lambda n=_num_commands: _bench_suggest(n))
+
+
+def _bench_complete(num_commands: int):
+    dispatcher = make_dispatcher(num_commands)
+    call = make_calls(num_commands, 'hit', 1)[0]
+    keystrokes = cycle(call[:end] for end in range(len(call) + 1))
+
+    def run():
+        dispatcher.complete(next(keystrokes))
+
+    return run
+
+
+for _num_commands in (10, 1_000):
+    benchmark(f'complete[keystroke, {_num_commands}]')(lambda n=_num_commands: _bench_complete(n))
+
+
+def _bench_retokenize(length: int, incremental: bool):
+    lexer = CallLexer()
+    text = ' '.join(f'word{i} "quoted {i}"' for i in range(length))
+    tokens = list(lexer.tokenize(text))
+    offset = len(text) // 2
+
+    # Alternately type and delete a character in the middle of the call
+    edits = cycle([(offset, 0, 'x'), (offset, 1, '')])
+
+    def run():
+        nonlocal text, tokens
+        if incremental:
+            text, tokens = lexer.retokenize(text, tokens, *next(edits))
+        else:
+            o, d, i = next(edits)
+            text = text[:o] + i + text[o + d:]
+            tokens = list(lexer.tokenize(text))
+
+    return run
+
+
+for _length in (10, 1_000):
+    benchmark(f'call_lexer.retokenize[keystroke, {_length}]')(lambda n=_length: _bench_retokenize(n, True))
+    benchmark(f'call_lexer.tokenize[keystroke, {_length}]')(lambda n=_length: _bench_retokenize(n, False))
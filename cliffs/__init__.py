@@ -1,7 +1,8 @@
-from .dispatcher import CommandDispatcher, CommandDispatchError, UnknownCommandError
+from .dispatcher import CommandDispatcher, CommandDispatchError, UnknownCommandError, ScriptLineError, NO_RESULT
 from .command import Command
-from .call_match import CallMatch, CallMatchFail
+from .call_match import CallMatch, CallMatchFail, MatchBudget, MatchBudgetExceeded
 from .call_matcher import CallMatcher
+from .cache import LRUCache
 
 from .command import TooManyArguments
 from .syntax_tree.literal import MissingLiteral, MismatchedLiteral, MismatchedLiteralSuggestion
@@ -9,14 +10,17 @@ from .syntax_tree.param import MissingParameter, MismatchedParameterType
 from .syntax_tree.tail import MissingTail
 from .syntax_tree.unordered_group import MissingUnorderedGroup
 from .syntax_tree.variant_group import MissingVariant
+from .mount import UnknownMountedCommand
 
 __all__ = [
-    'CommandDispatcher', 'CommandDispatchError', 'UnknownCommandError',
-    'CallMatch', 'CallMatcher', 'CallMatchFail',
+    'CommandDispatcher', 'CommandDispatchError', 'UnknownCommandError', 'ScriptLineError', 'NO_RESULT',
+    'CallMatch', 'CallMatcher', 'CallMatchFail', 'LRUCache',
+    'MatchBudget', 'MatchBudgetExceeded',
     'Command', 'TooManyArguments',
     'MissingLiteral', 'MismatchedLiteral', 'MismatchedLiteralSuggestion',
     'MissingParameter', 'MismatchedParameterType',
     'MissingTail',
     'MissingUnorderedGroup',
     'MissingVariant',
+    'UnknownMountedCommand',
 ]
@@ -0,0 +1,260 @@
+"""Detects ambiguities between and within command syntaxes.
+
+Three kinds of problems are reported, each with an example call where possible:
+  * 'overlap': two commands both match the same call, so both have to be fully
+    matched on every such dispatch and the winner is decided by score (or by
+    registration order on ties).
+  * 'shadowed_variant': calls meant for a variant of a variant group are won
+    by another variant of the same group.
+  * 'swallowing': varargs or a tail is followed by other nodes, which can never
+    be matched since varargs and tails consume all remaining tokens.
+
+Overlaps and shadowed variants are found by sampling: random calls are generated
+for each command (or variant) and matched against the others, so the analysis
+can miss rare overlaps but never reports false ones.
+
+Usage: python -m cliffs.ambiguity <grammar file> [--samples N] [--seed N]
+(the grammar file contains one syntax specification per line)
+"""
+
+import sys
+from typing import Iterable, Optional
+from .call_match import CallMatchFail
+from .command import Command
+from .corpus import CorpusGenerator
+from .syntax_tree import *
+
+
+class Ambiguity:
+    """A single problem found by `find_ambiguities()`."""
+
+    def __init__(self, kind: str, message: str, commands: tuple[Command, ...],
+                 example: Optional[str] = None, node: Optional[Node] = None):
+        # 'overlap', 'shadowed_variant' or 'swallowing'
+        self.kind = kind
+        self.message = message
+        # The commands involved
+        self.commands = commands
+        # A call demonstrating the problem
+        self.example = example
+        # The variant group or the varargs/tail node involved
+        self.node = node
+
+    def __repr__(self) -> str:
+        return f'<Ambiguity {self.kind}: {self.message}>'
+
+    def __str__(self) -> str:
+        if self.example is None:
+            return f'{self.kind}: {self.message}'
+        return f'{self.kind}: {self.message}, e.g. {repr(self.example)}'
+
+
+def find_ambiguities(commands: Iterable[Command], samples: int = 20, seed: int = 0) -> list[Ambiguity]:
+    """Analyzes the given commands for overlaps, shadowed variants and varargs
+    or tails swallowing later nodes.
+
+    Parameters
+    ----------
+      * commands: `Iterable[Command]` - The commands in registration order.
+      * samples: `int` (optional) - The number of random calls to generate
+        per command and per variant. Defaults to 20.
+      * seed: `int` (optional) - The seed for generating calls. Defaults to 0.
+
+    Returns
+    -------
+      * `list[Ambiguity]`: The problems found.
+    """
+
+    commands = list(commands)
+    generator = CorpusGenerator(seed)
+
+    ambiguities = []
+    for command in commands:
+        ambiguities += _find_swallowing(command, command.syntax, False, generator)
+        ambiguities += _find_shadowed_variants(command, command.syntax, samples, generator)
+
+    ambiguities += _find_overlaps(commands, samples, generator)
+    return ambiguities
+
+
+def _score(command: Command, call: str) -> Optional[float]:
+    """Returns the score of the given call matched against the command or None if it doesn't match"""
+
+    match = command.begin_match(call)
+    try:
+        command.match(match)
+    except (CallMatchFail, SyntaxError):
+        # Matching after varargs or a tail raises SyntaxError
+        return None
+    return match.score
+
+
+def _samples(command: Command, tree: Node, count: int, generator: CorpusGenerator) -> list[str]:
+    """Returns up to the given number of distinct calls matching the given tree"""
+
+    subcommand = Command(tree, lambda: None, lexer=command.lexer, matcher=command.matcher)
+    calls = []
+
+    for _ in range(count):
+        call = generator.call(tree, verify=False)
+        if call not in calls and _score(subcommand, call) is not None:
+            calls.append(call)
+
+    return calls
+
+
+def _leading_literal(tree: Node) -> Optional[str]:
+    """Returns the value of the literal every call matching the tree must start with, if there is one"""
+
+    while isinstance(tree, Sequence) and tree.children != []:
+        tree = tree.children[0]
+
+    if isinstance(tree, Literal) and tree.case_sensitive and not tree.tolerant:
+        return tree.value
+    return None
+
+
+def _find_overlaps(commands: list[Command], samples: int, generator: CorpusGenerator) -> list[Ambiguity]:
+    leading = [_leading_literal(command.syntax) for command in commands]
+    examples: dict[tuple[int, int], tuple[str, int]] = {}
+
+    for a, command in enumerate(commands):
+        # Only commands that can start with the same token can overlap
+        others = [b for b in range(len(commands))
+                  if b != a and (leading[a] is None or leading[b] is None or leading[a] == leading[b])]
+        if others == []:
+            continue
+
+        for call in _samples(command, command.syntax, samples, generator):
+            score = _score(command, call)
+
+            for b in others:
+                pair = (min(a, b), max(a, b))
+                if pair in examples:
+                    continue
+
+                other_score = _score(commands[b], call)
+                if other_score is not None:
+                    # Ties are won by the command registered first
+                    winner = b if other_score > score or (other_score == score and b < a) else a
+                    examples[pair] = (call, winner)
+
+    ambiguities = []
+    for (a, b), (call, winner) in sorted(examples.items()):
+        ambiguities.append(Ambiguity(
+            'overlap',
+            f'{commands[a].syntax} and {commands[b].syntax} match the same calls'
+            f' (won by {commands[winner].syntax})',
+            (commands[a], commands[b]), call))
+
+    return ambiguities
+
+
+def _find_shadowed_variants(command: Command, node: Node, samples: int,
+                            generator: CorpusGenerator) -> list[Ambiguity]:
+    ambiguities = []
+
+    if isinstance(node, VariantGroup):
+        variants = [Command(variant, lambda: None, lexer=command.lexer, matcher=command.matcher)
+                    for variant in node.children]
+
+        for j, variant in enumerate(variants):
+            calls = _samples(command, variant.syntax, samples, generator)
+            won: dict[int, str] = {}
+            lost = 0
+
+            for call in calls:
+                score = _score(variant, call)
+                winner = j
+
+                for i, other in enumerate(variants):
+                    if i != j:
+                        other_score = _score(other, call)
+                        # The first variant with the highest score wins
+                        if other_score is not None and (other_score > score or (other_score == score and i < j)):
+                            winner, score = i, other_score
+
+                if winner != j:
+                    won.setdefault(winner, call)
+                    lost += 1
+
+            for i, call in won.items():
+                extent = 'shadowed' if lost == len(calls) else 'partially shadowed'
+                ambiguities.append(Ambiguity(
+                    'shadowed_variant',
+                    f'variant ({node.children[j]}) is {extent} by ({node.children[i]}) in {command.syntax}',
+                    (command,), call, node))
+
+    for child in node.children:
+        ambiguities += _find_shadowed_variants(command, child, samples, generator)
+
+    return ambiguities
+
+
+def _find_swallowing(command: Command, node: Node, followed: bool,
+                     generator: CorpusGenerator) -> list[Ambiguity]:
+    """Finds varargs and tails followed by other nodes. `followed` tells whether
+    any node can be matched after the given node."""
+
+    if isinstance(node, (VarArgs, Tail)):
+        if not followed:
+            return []
+
+        # Look for a call that is generated from the syntax but doesn't match it
+        example = None
+        for _ in range(generator.max_attempts):
+            call = generator.call(command.syntax, verify=False)
+            if _score(command, call) is None:
+                example = call
+                break
+
+        return [Ambiguity('swallowing', f'{node} swallows the nodes following it in {command.syntax}',
+                          (command,), example, node)]
+
+    ambiguities = []
+    last = len(node.children) - 1
+
+    for i, child in enumerate(node.children):
+        if isinstance(node, VariantGroup):
+            child_followed = followed
+        elif isinstance(node, UnorderedGroup):
+            child_followed = followed or last > 0
+        else:
+            child_followed = followed or i < last
+
+        ambiguities += _find_swallowing(command, child, child_followed, generator)
+
+    return ambiguities
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    import argparse
+    from .script import iter_script_lines
+    from .syntax_parser import SyntaxParser
+
+    parser = argparse.ArgumentParser(prog='python -m cliffs.ambiguity',
+                                     description='Find overlapping commands, shadowed variants and swallowed nodes')
+    parser.add_argument('grammar', help='file with one syntax specification per line (- for stdin)')
+    parser.add_argument('--samples', type=int, default=20, help='random calls generated per command and variant')
+    parser.add_argument('--seed', type=int, default=0, help='seed for generating calls')
+    args = parser.parse_args(argv)
+
+    syntax_parser = SyntaxParser()
+    commands = []
+
+    with open(args.grammar, 'r') if args.grammar != '-' else sys.stdin as f:
+        for line_number, spec in iter_script_lines(f):
+            try:
+                commands.append(Command(syntax_parser.parse(spec), lambda: None))
+            except SyntaxError as e:
+                print(f'{line_number}: error: {e}')
+
+    ambiguities = find_ambiguities(commands, args.samples, args.seed)
+    for ambiguity in ambiguities:
+        print(ambiguity)
+
+    return 1 if ambiguities != [] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""Compiles syntax trees into a token-level automaton matching all commands at once.
+
+Syntaxes built from literals, parameters, varargs, tails, sequences, optional
+sequences and variant groups describe regular token languages. Such trees are
+compiled into a single nondeterministic automaton, which is run as a lazily built
+deterministic one: each distinct set of live states is created once and its transitions
+are cached, so routing a call costs one dictionary lookup per token.
+
+The automaton accepts a superset of the calls the interpreter (`Node.match`) accepts:
+literals that are tolerant and parameter types are not checked, and the greedy choices
+of the interpreter (an optional sequence matching whenever it can, the best-scoring
+variant being taken) are not modeled. Accepted commands are therefore matched by
+the interpreter, which reconstructs parameters, optionals, variants and scores exactly.
+Trees containing other nodes (e.g. unordered groups) are always matched by the interpreter.
+"""
+
+from typing import Iterable, Optional
+from .call_lexer import CallLexer
+from .command import Command
+from .routing import Route
+from .syntax_tree import *
+from .token import Token
+
+
+class NotRegular(Exception):
+    """Raised when compiling a syntax tree that contains nodes the automaton does not support"""
+
+
+class _State:
+    __slots__ = ('exact', 'lower', 'any', 'epsilon', 'accepts')
+
+    def __init__(self):
+        # Transitions on exact token values, on lowercased token values and on any token
+        self.exact: dict[str, list[int]] = {}
+        self.lower: dict[str, list[int]] = {}
+        self.any: list[int] = []
+        self.epsilon: list[int] = []
+        # Index of the command accepted in this state
+        self.accepts: Optional[int] = None
+
+
+class _DFAState:
+    __slots__ = ('states', 'exact_keys', 'lower_keys', 'accepts', 'next', 'next_any')
+
+    def __init__(self, states: frozenset[int], nfa: list[_State]):
+        self.states = states
+        self.exact_keys = set()
+        self.lower_keys = set()
+        accepts = []
+
+        for i in states:
+            state = nfa[i]
+            self.exact_keys.update(state.exact)
+            self.lower_keys.update(state.lower)
+            if state.accepts is not None:
+                accepts.append(state.accepts)
+
+        # Indices of commands accepting the tokens consumed so far
+        self.accepts = tuple(sorted(accepts))
+
+        # Cached transitions on token values matching some literal and on all other values
+        self.next: dict[str, _DFAState] = {}
+        self.next_any: Optional[_DFAState] = None
+
+
+class TokenAutomaton:
+    """An automaton over token values accepting calls of multiple commands."""
+
+    def __init__(self, max_states: int = 10_000, max_dead: float = 0.5):
+        """Initializes an empty automaton.
+
+        Parameters
+        ----------
+          * max_states: `int` (optional) - The number of deterministic states to cache
+            before the cache is cleared. Defaults to 10000.
+          * max_dead: `float` (optional) - The fraction of states of removed trees
+            above which the automaton is rebuilt from the remaining trees. Defaults to 0.5.
+        """
+
+        self.max_states = max_states
+        self.max_dead = max_dead
+
+        self._nfa: list[_State] = [_State()]
+        self._dfa: dict[frozenset[int], _DFAState] = {}
+        self._start: Optional[_DFAState] = None
+
+        # Compiled trees by index with their entry states and numbers of states,
+        # and the number of states of removed trees
+        self._trees: dict[int, tuple[Node, int, int]] = {}
+        self._dead = 0
+
+    def _new_state(self) -> int:
+        self._nfa.append(_State())
+        return len(self._nfa) - 1
+
+    def add(self, tree: Node, index: int):
+        """Compiles the given syntax tree into the automaton.
+
+        Parameters
+        ----------
+          * tree: `Node` - The syntax tree.
+          * index: `int` - The value to report when a call is accepted by the tree.
+
+        Raises
+        ------
+          * `NotRegular` if the tree contains unsupported nodes. The automaton is left unchanged.
+        """
+
+        size = len(self._nfa)
+        entry = self._new_state()
+
+        try:
+            end = self._compile(tree, entry)
+        except NotRegular:
+            del self._nfa[size:]
+            raise
+
+        self._nfa[end].accepts = index
+        self._nfa[0].epsilon.append(entry)
+        self._trees[index] = (tree, entry, len(self._nfa) - size)
+
+        self._dfa.clear()
+        self._start = None
+
+    def remove(self, index: int):
+        """Removes the tree compiled with the given index. Its states are unlinked
+        from the start state and the automaton is rebuilt from the remaining trees
+        once the states of removed trees exceed `max_dead` of all states.
+
+        Raises
+        ------
+          * `KeyError` if no tree was compiled with the index.
+        """
+
+        _, entry, size = self._trees.pop(index)
+        self._nfa[0].epsilon.remove(entry)
+        self._dead += size
+
+        if self._dead > self.max_dead * len(self._nfa):
+            self._rebuild()
+
+        self._dfa.clear()
+        self._start = None
+
+    def _rebuild(self):
+        trees = self._trees
+        self._nfa = [_State()]
+        self._trees = {}
+        self._dead = 0
+
+        for index, (tree, _, _) in trees.items():
+            self.add(tree, index)
+
+    def _compile(self, node: Node, state: int) -> int:
+        """Adds transitions matching the given node from the given state and returns the end state"""
+
+        kind = type(node)
+
+        if kind is Literal:
+            end = self._new_state()
+            if node.tolerant:
+                self._nfa[state].any.append(end)
+            elif node.case_sensitive:
+                self._nfa[state].exact.setdefault(node.value, []).append(end)
+            else:
+                self._nfa[state].lower.setdefault(node.value.lower(), []).append(end)
+            return end
+
+        elif kind is Parameter:
+            end = self._new_state()
+            self._nfa[state].any.append(end)
+            return end
+
+        elif kind in (VarArgs, Tail):
+            loop = self._new_state()
+            if kind is VarArgs:
+                self._nfa[state].epsilon.append(loop)
+            else:
+                self._nfa[state].any.append(loop)
+            self._nfa[loop].any.append(loop)
+            return loop
+
+        elif kind in (Sequence, Variant):
+            for child in node.children:
+                state = self._compile(child, state)
+            return state
+
+        elif kind is OptionalSequence:
+            end = state
+            for child in node.children:
+                end = self._compile(child, end)
+            if end != state:
+                self._nfa[state].epsilon.append(end)
+            return end
+
+        elif kind is VariantGroup:
+            end = self._new_state()
+            for variant in node.children:
+                entry = self._new_state()
+                self._nfa[state].epsilon.append(entry)
+                self._nfa[self._compile(variant, entry)].epsilon.append(end)
+            return end
+
+        raise NotRegular(f"Cannot compile {node.node_name} into an automaton")
+
+    def _closure(self, states) -> frozenset[int]:
+        closure = set(states)
+        stack = list(closure)
+        while stack != []:
+            for target in self._nfa[stack.pop()].epsilon:
+                if target not in closure:
+                    closure.add(target)
+                    stack.append(target)
+        return frozenset(closure)
+
+    def _dfa_state(self, states: frozenset[int]) -> _DFAState:
+        state = self._dfa.get(states)
+        if state is None:
+            if len(self._dfa) >= self.max_states:
+                # Drop the start state too, since all cached states are reachable from it
+                self._dfa.clear()
+                self._start = None
+            state = self._dfa[states] = _DFAState(states, self._nfa)
+        return state
+
+    def _step(self, state: _DFAState, value: str) -> _DFAState:
+        if value in state.exact_keys or value.lower() in state.lower_keys:
+            next_state = state.next.get(value)
+            if next_state is None:
+                lower = value.lower()
+                targets = []
+                for i in state.states:
+                    s = self._nfa[i]
+                    targets += s.exact.get(value, ())
+                    targets += s.lower.get(lower, ())
+                    targets += s.any
+                next_state = state.next[value] = self._dfa_state(self._closure(targets))
+            return next_state
+
+        if state.next_any is None:
+            targets = [target for i in state.states for target in self._nfa[i].any]
+            state.next_any = self._dfa_state(self._closure(targets))
+        return state.next_any
+
+    def run(self, values: list[str]) -> tuple[int, ...]:
+        """Returns the indices of the trees accepting the given token values, in ascending order."""
+
+        state = self._start
+        if state is None:
+            state = self._start = self._dfa_state(self._closure([0]))
+
+        for value in values:
+            state = self._step(state, value)
+            if not state.states:
+                return ()
+
+        return state.accepts
+
+
+class AutomatonRouter:
+    """Routes calls to commands using `TokenAutomaton`s (one per lexer configuration).
+    Provides the same interface as `PrefixRouter`, so commands resume matching after
+    the leading literals and untyped parameters of their syntax."""
+
+    def __init__(self, commands: Iterable[tuple[int, Command]]):
+        """Builds a router for the given commands with their registration sequence numbers
+        (see `PrefixRouter.__init__`)."""
+
+        self._automata: dict[str, TokenAutomaton] = {}
+        self._lexers: dict[str, CallLexer] = {}
+        # Routes by the keys their syntaxes were compiled with
+        self._keys: dict[int, Route] = {}
+        self._key_of: dict[Command, int] = {}
+        self._next_key = 0
+        # Routes of commands that must always be matched by the interpreter
+        self._unrouted: dict[Command, Route] = {}
+
+        for index, command in commands:
+            self.add(index, command)
+
+    def add(self, index: int, command: Command):
+        """Compiles a command into the automaton in time proportional to the size
+        of its syntax. Cached deterministic states are dropped and rebuilt lazily."""
+
+        route = Route(index, command)
+
+        if route.quotes is None:
+            self._unrouted[command] = route
+            return
+
+        if route.quotes not in self._automata:
+            self._automata[route.quotes] = TokenAutomaton()
+            self._lexers[route.quotes] = CallLexer(route.quotes)
+
+        key = self._next_key
+        try:
+            self._automata[route.quotes].add(command.syntax, key)
+        except NotRegular:
+            # The prefix of the route is only verified by the automaton
+            self._unrouted[command] = Route(index, command, prefix=False)
+            return
+
+        self._next_key += 1
+        self._keys[key] = route
+        self._key_of[command] = key
+
+    def remove(self, command: Command):
+        """Removes a command, unlinking its syntax from the automaton (see `TokenAutomaton.remove()`)."""
+
+        if self._unrouted.pop(command, None) is None:
+            key = self._key_of.pop(command)
+            route = self._keys.pop(key)
+            self._automata[route.quotes].remove(key)
+
+    def route(self, call: str) -> list[tuple[Route, Optional[list[Token]]]]:
+        """Returns the routes of commands that can possibly match the given call,
+        in registration order (see `PrefixRouter.route()`)."""
+
+        tokens = {quotes: list(lexer.tokenize(call)) for quotes, lexer in self._lexers.items()}
+        candidates = [(route, tokens.get(route.quotes)) for route in self._unrouted.values()]
+
+        for quotes, automaton in self._automata.items():
+            values = [token.value for token in tokens[quotes]]
+            candidates += ((self._keys[key], tokens[quotes]) for key in automaton.run(values))
+
+        candidates.sort(key=lambda c: c[0].index)
+        return candidates
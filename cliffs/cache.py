@@ -0,0 +1,114 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Any, Hashable, Optional
+from .utils import deep_sizeof
+
+
+class LRUCache:
+    """A bounded cache evicting least recently used entries, with an optional
+    time-to-live for entries. Counts hits, misses and evictions."""
+
+    def __init__(self, max_size: int = 128, ttl: Optional[float] = None):
+        """Initializes a cache.
+
+        Parameters
+        ----------
+          * max_size: `int` (optional) - The maximum number of entries to keep. Defaults to 128.
+          * ttl: `float` (optional) - The number of seconds after which entries expire.
+            Defaults to None (entries never expire).
+        """
+
+        if max_size < 1:
+            raise ValueError(f"Cache size must be positive, got {max_size}")
+
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Maps keys to tuples: (value, expiry time)
+        self._entries: OrderedDict[Hashable, tuple[Any, Optional[float]]] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f'<LRUCache size={len(self)}/{self.max_size}, hits={self.hits}, '\
+            f'misses={self.misses}, evictions={self.evictions}>'
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the value cached under the given key and marks it as recently used.
+
+        Parameters
+        ----------
+          * key: `Hashable` - The key to look up.
+          * default (optional) - The value to return on a miss. Defaults to None.
+
+        Returns
+        -------
+          * The cached value or the default if the key is absent or expired.
+        """
+
+        with self._lock:
+            try:
+                value, expiry = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+
+            if expiry is not None and expiry <= monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """Caches the given value under the given key, evicting the least recently
+        used entry if the cache is full.
+
+        Parameters
+        ----------
+          * key: `Hashable` - The key to store the value under.
+          * value - The value to store.
+        """
+
+        expiry = monotonic() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            self._entries[key] = (value, expiry)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Removes all entries from the cache. Counters are left untouched."""
+
+        with self._lock:
+            self._entries.clear()
+
+    def footprint(self) -> int:
+        """Returns the approximate memory footprint of the cached keys and values
+        in bytes. Objects other than built-in containers are measured shallowly."""
+
+        with self._lock:
+            return deep_sizeof(self._entries)
+
+    def stats(self) -> dict[str, int]:
+        """Returns the counters of this cache as a dictionary."""
+
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
@@ -1,3 +1,4 @@
+from bisect import bisect_left
 from typing import Iterable
 from .token import Token
 
@@ -109,3 +110,97 @@ class CallLexer:
         # Leftover plain token
         elif current != '':
             yield plain_token(i + 1)
+
+    def retokenize(self, text: str, tokens: list[Token], offset: int, deleted: int,
+                   inserted: str) -> tuple[str, list[Token]]:
+        """Applies an edit to a call and updates its tokens, re-lexing only the part of the call
+        from the nearest safe boundary before the edit until the new tokens resynchronize
+        with the old ones (see below).
+
+        A boundary is safe if it directly follows whitespace outside quoted tokens that is
+        not preceded by a pending escape (an odd number of backslashes before the whitespace),
+        so lexing from it in a fresh state yields the same tokens as lexing the whole call.
+        Re-lexing stops at the first new token equal to an old token after the edit shifted
+        by the length difference and followed by a safe boundary, since the rest of the call
+        is lexed the same way.
+
+        Parameters
+        ----------
+          * text: `str` - The call before the edit.
+          * tokens: `list[Token]` - The tokens of the call before the edit, as returned by `tokenize()`.
+          * offset: `int` - The index of the edit in the call.
+          * deleted: `int` - The number of characters removed at the offset.
+          * inserted: `str` - The text inserted at the offset.
+
+        Returns
+        -------
+          * `str`: The call after the edit.
+          * `list[Token]`: The tokens of the call after the edit. Tokens before the re-lexed part
+            are reused, as are tokens after it if the edit doesn't change the length of the call.
+        """
+
+        new_text = text[:offset] + inserted + text[offset + deleted:]
+
+        # Subclasses may lex differently
+        if type(self).tokenize is not CallLexer.tokenize:
+            return new_text, list(self.tokenize(new_text))
+
+        delta = len(inserted) - deleted
+        restart = self._safe_boundary(text, tokens, offset)
+
+        updated = tokens[:bisect_left(tokens, restart, key=lambda t: t.end)]
+        # Old tokens entirely after the edit are candidates for resynchronizing
+        old = bisect_left(tokens, offset + deleted, key=lambda t: t.start)
+
+        for token in self.tokenize(new_text[restart:]):
+            token = _shifted(token, restart)
+
+            while old < len(tokens) and tokens[old].start + delta < token.start:
+                old += 1
+
+            # The lexer is in the same fresh state after an equal token followed by whitespace,
+            # unless it ends with a backslash, which may start an escape in one of the calls
+            if old < len(tokens) and tokens[old].start + delta == token.start \
+                    and tokens[old].end + delta == token.end and tokens[old].raw == token.raw \
+                    and tokens[old].value == token.value and token.end < len(new_text) \
+                    and new_text[token.end].isspace() and new_text[token.end - 1] != '\\':
+                updated += tokens[old:] if delta == 0 else (_shifted(t, delta) for t in tokens[old:])
+                return new_text, updated
+
+            updated.append(token)
+
+        return new_text, updated
+
+    def _safe_boundary(self, text: str, tokens: list[Token], offset: int) -> int:
+        """Returns the nearest index not after the given offset at which the lexer
+        can be restarted in a fresh state (see `retokenize()`)"""
+
+        i = min(offset, len(text)) - 1
+
+        while i >= 0:
+            if not text[i].isspace():
+                i -= 1
+                continue
+
+            # Whitespace inside a quoted token: continue before the token
+            k = bisect_left(tokens, i + 1, key=lambda t: t.end)
+            if k < len(tokens) and tokens[k].start <= i:
+                i = tokens[k].start - 1
+                continue
+
+            # Count the backslashes in the run of backslashes and whitespace ending here,
+            # since whitespace outside quoted tokens does not consume a pending escape
+            j, backslashes = i, 0
+            while j >= 0 and (text[j] == '\\' or text[j].isspace()):
+                backslashes += text[j] == '\\'
+                j -= 1
+
+            if backslashes % 2 == 0:
+                return i + 1
+            i = j
+
+        return 0
+
+
+def _shifted(token: Token, delta: int) -> Token:
+    return Token(token.type, token.raw, token.start + delta, token.end + delta, value=token.value)
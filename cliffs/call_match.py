@@ -1,4 +1,5 @@
-from typing import Any, Optional
+from time import monotonic
+from typing import Any, Hashable, Optional
 from .token import Token
 
 
@@ -13,6 +14,77 @@ class CallMatchFail(Exception):
         self.command = None
 
 
+class MatchBudgetExceeded(CallMatchFail):
+    """
+    Raised when matching a call exceeds the step budget or the deadline
+    of its `MatchBudget`. Unlike other fails, it is not caught by composite
+    nodes and aborts matching altogether.
+    """
+    def __init__(self, budget: 'MatchBudget', timed_out: bool = False, exhausted: bool = True):
+        if timed_out:
+            super().__init__(f"Match timed out after {budget.steps} steps")
+        elif exhausted:
+            super().__init__(f"Match exceeded the budget of {budget.max_steps} steps")
+        else:
+            super().__init__(f"Match exceeded the budget of {budget.max_attempt_steps} steps per command")
+
+        self.steps = budget.steps
+        self.timed_out = timed_out
+        # Whether the whole budget is exhausted, rather than the steps of a single attempt
+        self.exhausted = exhausted
+
+
+class MatchBudget:
+    """Limits the number of node visits and optionally the time spent matching a call.
+    A budget can be shared by the attempts to match a call against multiple commands,
+    each of which can be limited separately (see `begin_attempt()`)."""
+
+    def __init__(self, max_steps: Optional[int] = None, timeout: Optional[float] = None,
+                 max_attempt_steps: Optional[int] = None):
+        """Initializes a budget.
+
+        Parameters
+        ----------
+          * max_steps: `int` (optional) - The maximum number of node visits.
+          * timeout: `float` (optional) - The time in seconds after which matching is aborted.
+          * max_attempt_steps: `int` (optional) - The maximum number of node visits of a single attempt.
+        """
+
+        self.max_steps = max_steps
+        self.deadline = None if timeout is None else monotonic() + timeout
+        self.max_attempt_steps = max_attempt_steps
+        # The number of node visits so far, in total and in the current attempt
+        self.steps = 0
+        self.attempt_steps = 0
+
+    def begin_attempt(self, max_attempt_steps: Optional[int] = None):
+        """Starts counting the node visits of a new attempt, limited to the given number."""
+
+        self.max_attempt_steps = max_attempt_steps
+        self.attempt_steps = 0
+
+    def step(self):
+        """Counts a single node visit.
+
+        Raises
+        ------
+          * `MatchBudgetExceeded` when the step budget is exhausted or the deadline has passed,
+            or when the steps of the current attempt exceed their limit.
+        """
+
+        self.steps += 1
+        self.attempt_steps += 1
+
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise MatchBudgetExceeded(self)
+
+        if self.deadline is not None and monotonic() > self.deadline:
+            raise MatchBudgetExceeded(self, timed_out=True)
+
+        if self.max_attempt_steps is not None and self.attempt_steps > self.max_attempt_steps:
+            raise MatchBudgetExceeded(self, exhausted=False)
+
+
 class CallMatch:
     """Stores the result of a command call matched entirely or partially
     against a command syntax."""
@@ -43,6 +115,12 @@ class CallMatch:
         self._vars: list[int] = []
         # Error hint
         self.hint: Optional[Exception] = None
+        # Tracer recording the matching process, shared with forks
+        self.tracer = None
+        # Budget limiting the matching process, shared with forks
+        self.budget: Optional[MatchBudget] = None
+        # The match and the command resolved by a nested dispatcher (see `cliffs.mount`)
+        self.nested: Optional[tuple['CallMatch', Any]] = None
 
     def __repr__(self) -> str:
         return f'<CallMatch params={self._params}, optionals={self._opts}, variants={self._vars}>'
@@ -55,7 +133,14 @@ class CallMatch:
         -------
           * `CallMatch`: The forked match
         """
-        return CallMatch(self.raw, self.tokens)
+        fork = CallMatch(self.raw, self.tokens)
+        fork.budget = self.budget
+
+        if self.tracer is not None:
+            fork.tracer = self.tracer
+            self.tracer.fork(self)
+
+        return fork
 
     def __iadd__(self, other: 'CallMatch') -> 'CallMatch':
         self.tokens = other.tokens
@@ -66,6 +151,24 @@ class CallMatch:
         self._vars += other._vars
         return self
 
+    def key(self) -> Hashable:
+        """Returns a hashable key identifying the matched parameters, optional
+        sequences and variants of this match. Lists of values (e.g. varargs) are
+        converted to tuples.
+
+        Raises
+        ------
+          * `TypeError` when a parameter value is not hashable.
+        """
+
+        params = tuple(
+            (name, tuple(value) if isinstance(value, list) else value)
+            for name, value in sorted(self._params.items()))
+
+        key = (params, tuple(self._opts), tuple(self._vars))
+        hash(key)
+        return key
+
     def has_tokens(self, num: int = 1) -> bool:
         """Returns true if the number of tokens left to be matched is at least
         the specified number."""
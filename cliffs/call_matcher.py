@@ -1,5 +1,6 @@
 from typing import Any, Callable, Optional
 from .utils import loose_bool
+from .call_match import MatchBudget
 
 
 class CallMatcher:
@@ -9,14 +10,39 @@ class CallMatcher:
     are matched and manages registered parameter types.
     """
 
-    def __init__(self, literal_threshold: float = 0.75):
-        """Initializes a matcher"""
+    def __init__(self, literal_threshold: float = 0.75, max_steps: Optional[int] = None,
+                 timeout: Optional[float] = None, max_command_steps: Optional[int] = None):
+        """Initializes a matcher
+
+        Parameters
+        ----------
+          * literal_threshold: `float` (optional) - How similar a literal must be to a token
+            to be hinted. Defaults to 0.75.
+          * max_steps: `int` (optional) - The maximum number of node visits allowed when matching
+            a single call, after which matching fails with `MatchBudgetExceeded`. A dispatcher shares
+            the budget between all commands it tries to match a call against (with the same limits),
+            bounding the latency of the whole dispatch. Unlimited by default.
+          * timeout: `float` (optional) - The time in seconds after which matching a single call
+            fails with `MatchBudgetExceeded`. Shared like `max_steps`. Unlimited by default.
+          * max_command_steps: `int` (optional) - The maximum number of node visits allowed when
+            matching a single call against a single command. A command exceeding it fails with
+            `MatchBudgetExceeded`, which a dispatcher records as a fail of that command and
+            continues with other commands. Unlimited by default.
+        """
 
         # How similar a literal must be to a token to be hinted
         self.literal_threshold = literal_threshold
 
+        # Limits of a single call match
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.max_command_steps = max_command_steps
+
         self._types: dict[str, Callable[[str], Any]] = {}
 
+        # Callbacks notified whenever a type is registered
+        self._type_listeners: list[Callable[[], None]] = []
+
         self.register_type(str)
         self.register_type(int)
         self.register_type(float)
@@ -35,6 +61,29 @@ class CallMatcher:
         name = name or constructor.__name__
         self._types[name] = constructor
 
+        for listener in self._type_listeners:
+            listener()
+
+    def add_type_listener(self, listener: Callable[[], None]):
+        """Registers a callback to be called whenever a type is registered with
+        this matcher. Used to invalidate cached match results.
+
+        Parameters
+        ----------
+          * listener: `() -> None` - The callback.
+        """
+
+        if listener not in self._type_listeners:
+            self._type_listeners.append(listener)
+
+    def new_budget(self) -> Optional[MatchBudget]:
+        """Returns a new budget for matching a single call or `None` if matching is unlimited."""
+
+        if self.max_steps is None and self.timeout is None and self.max_command_steps is None:
+            return None
+
+        return MatchBudget(self.max_steps, self.timeout, self.max_command_steps)
+
     def parse_arg(self, typename: str, value: str) -> Any:
         """Parses the given string using a registered type with the given name.
 
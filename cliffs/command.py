@@ -1,7 +1,8 @@
 from typing import Optional, Callable, Iterable
 from inspect import signature
 from .utils import instance_or_kwargs
-from .syntax_tree import Node
+from .cache import LRUCache
+from .syntax_tree import Node, Sequence, Literal, Parameter
 from .call_lexer import CallLexer
 from .call_match import *
 from .call_matcher import CallMatcher
@@ -15,6 +16,10 @@ class TooManyArguments(CallMatchFail):
 class Command:
     """Matches command calls against its syntax and controls callback dispatch."""
 
+    # Whether overrides of `match()` only extend it after matching the syntax,
+    # so that the leading nodes of the syntax can be matched by a router (see `cliffs.routing`)
+    routable = False
+
     def __init__(self, syntax: Node, callback: Callable, **kwargs):
         """Initializes a command.
 
@@ -29,6 +34,15 @@ class Command:
           * matcher: `CallMatcher` - The matcher to use to match calls against the syntax of this command.
           * description: `str` - The description to include in the usage help message. Ignored if hidden is True.
           * hidden: `bool` - Whether the usage help message should exclude this command entirely.
+          * cache: `LRUCache`, `dict` or `bool` - Enables caching of callback results for commands
+            whose callbacks are pure functions of their parameters. Results are keyed by the matched
+            parameters, optional sequences and variants; additional callback arguments are not
+            taken into account.
+          * idempotent: `bool` - Whether identical concurrent calls to this command may share
+            a single execution (see the `coalesce` option of `CommandDispatcher`).
+          * namespace: `str` - The group of commands to reload together (see `CommandDispatcher.reload()`).
+          * tags: `Iterable[str]` - Tags for selecting the commands visible to a dispatch
+            (see `CommandDispatcher.tag_mask()`).
 
         All keyword arguments will be saved in `kwargs`.
         """
@@ -42,17 +56,53 @@ class Command:
         self.description: Optional[str] = kwargs.get('description', None)
         self.hidden: Optional[str] = kwargs.get('hidden', False)
 
-    def begin_match(self, call: str) -> CallMatch:
-        return CallMatch(call, list(self.lexer.tokenize(call)))
+        cache = kwargs.get('cache', None)
+        if cache is True:
+            cache = {}
+        self.cache: Optional[LRUCache] = None if cache in (None, False) \
+            else instance_or_kwargs(cache, LRUCache)
+
+        self.idempotent: bool = kwargs.get('idempotent', False)
+        self.namespace: Optional[str] = kwargs.get('namespace', None)
+        self.tags: frozenset[str] = frozenset(kwargs.get('tags', ()))
+
+        # Leaves of the syntax if it is a flat sequence of literals and parameters,
+        # which is matched by comparing token values without the interpreter
+        self._flat: Optional[list[Node]] = None
+        if type(self.syntax) is Sequence and all(type(child) in (Literal, Parameter) for child in self.syntax.children):
+            self._flat = list(self.syntax.children)
+
+            # Scores added by the leaves from each index on
+            self._flat_scores = [0.] * (len(self._flat) + 1)
+            for i in range(len(self._flat) - 1, -1, -1):
+                self._flat_scores[i] = (1. if type(self._flat[i]) is Literal else 0.5) + self._flat_scores[i + 1]
 
-    def match(self, match: CallMatch):
+    def begin_match(self, call: str, tokens: Optional[list[Token]] = None) -> CallMatch:
+        """Creates a match of the given call to be passed to `match()`.
+
+        Parameters
+        ----------
+          * call: `str` - The call to match.
+          * tokens: `list[Token]` (optional) - The tokens left to be matched. By default,
+            the call is tokenized with the lexer of this command.
+        """
+
+        if tokens is None:
+            tokens = list(self.lexer.tokenize(call))
+
+        match = CallMatch(call, tokens)
+        match.budget = self.matcher.new_budget()
+        return match
+
+    def match(self, match: CallMatch, start: int = 0):
         """Tries to match the given call to this command's syntax and populates
         the given match instance.
 
         Parameters
         ----------
-          * call: `str` - The call to match.
           * match: `CallMatch` - The match to populate.
+          * start: `int` (optional) - The number of leading children of the root sequence
+            that have already been matched (by a `PrefixRouter`). Defaults to 0.
 
         Raises
         ------
@@ -60,8 +110,18 @@ class Command:
             exhausted at the end of the match.
         """
 
+        # Fast path for flat syntaxes, falling back to the interpreter on a miss
+        # so that fails are scored as usual
+        if self._flat is not None and match.tracer is None and self._match_flat(match, start):
+            return
+
         try:
-            self.syntax.match(match, self.matcher)
+            if start > 0:
+                self.syntax.match_remaining(start, match, self.matcher)
+            elif match.tracer is None:
+                self.syntax.match(match, self.matcher)
+            else:
+                match.tracer.match(self.syntax, match, self.matcher)
         except CallMatchFail as e:
             e.command = self
             raise e
@@ -80,6 +140,38 @@ class Command:
             e.command = self
             raise e
 
+    def _match_flat(self, match: CallMatch, start: int) -> bool:
+        """Matches the leftover tokens against the flat syntax of this command starting
+        at the given leaf. Returns False without modifying the match if they don't match."""
+
+        tokens = match.tokens
+        if len(tokens) != len(self._flat) - start:
+            return False
+
+        params = []
+        for leaf, token in zip(self._flat[start:], tokens):
+            if type(leaf) is Literal:
+                if leaf.case_sensitive:
+                    if token.value != leaf.value:
+                        return False
+                elif token.value.lower() != leaf.value.lower():
+                    return False
+
+            elif leaf.typename is None:
+                params.append((leaf.name, token.value))
+
+            else:
+                try:
+                    params.append((leaf.name, self.matcher.parse_arg(leaf.typename, token.value)))
+                except ValueError:
+                    return False
+
+        for name, value in params:
+            match[name] = value
+        match.score += self._flat_scores[start]
+        match.tokens = []
+        return True
+
     def execute(self, match: CallMatch, callback_args={}) -> object:
         """Executes the command callback with the given match. By default,
         the match must be the result of calling the `match()` method of this object.
@@ -119,30 +211,37 @@ class Command:
         if self.hidden:
             return []
 
-        max_width = kwargs.get('max_width', 100)
-        indent_width = kwargs.get('indent_width', 4)
+        return format_usage(str(self.syntax), self.description, **kwargs)
 
+
+def format_usage(syntax: str, description: Optional[str], **kwargs) -> Iterable[str]:
+    """Formats a usage help message of a command with the given syntax and description.
+    Refer to `Command.get_usage` for keyword arguments."""
+
+    max_width = kwargs.get('max_width', 100)
+    indent_width = kwargs.get('indent_width', 4)
+
+    if max_width != 0:
+        for line in textwrap.wrap(syntax, width=max_width):
+            yield line
+    else:
+        yield syntax
+
+    if description is not None:
         if max_width != 0:
-            for line in textwrap.wrap(str(self.syntax), width=max_width):
-                yield line
-        else:
-            yield str(self.syntax)
-
-        if self.description is not None:
-            if max_width != 0:
-                wrap_options = {
-                    'width': max_width,
-                    'initial_indent': ' ' * indent_width,
-                    'subsequent_indent': ' ' * indent_width,
-                    'expand_tabs': True,
-                }
-
-                for desc_line in self.description.splitlines():
-                    if desc_line == '':
-                        yield desc_line
-                    else:
-                        for line in textwrap.wrap(desc_line, **wrap_options):
-                            yield line
-            else:
-                for desc_line in self.description.splitlines():
+            wrap_options = {
+                'width': max_width,
+                'initial_indent': ' ' * indent_width,
+                'subsequent_indent': ' ' * indent_width,
+                'expand_tabs': True,
+            }
+
+            for desc_line in description.splitlines():
+                if desc_line == '':
                     yield desc_line
+                else:
+                    for line in textwrap.wrap(desc_line, **wrap_options):
+                        yield line
+        else:
+            for desc_line in description.splitlines():
+                yield desc_line
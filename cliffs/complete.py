@@ -0,0 +1,235 @@
+"""Completes partial calls by walking the syntax trees of commands.
+
+The position of a match in a syntax tree is represented by a continuation: the nodes
+left to be matched, in order. Optional sequences and variant groups branch into multiple
+continuations and unordered groups are tracked by the set of their children not matched yet,
+so every order of their children is covered. Continuations are expanded until they start
+with a leaf (the first set of the continuation); expansions are memoized per command,
+so each distinct continuation is expanded once.
+
+The set of continuations reached after the complete tokens of a partial call is kept
+in the returned `Completion`, so completing the call extended by more characters only
+steps over the tokens completed since. Completions are only resumed if the partial token
+starts after whitespace outside quotes, where lexing can safely restart.
+"""
+
+from typing import Optional
+from .call_lexer import CallLexer
+from .call_matcher import CallMatcher
+from .command import Command
+from .syntax_tree import *
+
+
+# A continuation is a tuple of node indices and unordered group states: (node index, remaining children bitmask)
+_Continuation = tuple
+
+
+class _CompletionTable:
+    """Memoized expansions of continuations of a single syntax tree"""
+
+    def __init__(self, syntax: Node, matcher: CallMatcher):
+        self.matcher = matcher
+
+        # Nodes by index and indices by node identity
+        self.nodes: list[Node] = []
+        self._indices: dict[int, int] = {}
+        self._index(syntax)
+
+        self._closures: dict[_Continuation, tuple[_Continuation, ...]] = {}
+        self.initial = frozenset(self.closure((0,)))
+
+    def _index(self, node: Node):
+        self._indices[id(node)] = len(self.nodes)
+        self.nodes.append(node)
+        for child in node.children:
+            self._index(child)
+
+    def _children(self, node: Node) -> _Continuation:
+        return tuple(self._indices[id(child)] for child in node.children)
+
+    def closure(self, continuation: _Continuation) -> tuple[_Continuation, ...]:
+        """Returns the continuations starting with a leaf (or empty) reachable from the given one
+        without consuming tokens"""
+
+        closure = self._closures.get(continuation)
+        if closure is not None:
+            return closure
+
+        result = []
+        seen = set()
+        stack = [continuation]
+
+        while stack != []:
+            c = stack.pop()
+            if c in seen:
+                continue
+            seen.add(c)
+
+            if c == ():
+                result.append(c)
+                continue
+
+            head, rest = c[0], c[1:]
+
+            if type(head) is tuple:
+                index, remaining = head
+                if remaining == 0:
+                    stack.append(rest)
+                children = self.nodes[index].children
+                for i in range(len(children)):
+                    if remaining >> i & 1:
+                        stack.append((self._indices[id(children[i])], (index, remaining & ~(1 << i))) + rest)
+                continue
+
+            node = self.nodes[head]
+            kind = type(node)
+
+            if kind in (Sequence, Variant):
+                stack.append(self._children(node) + rest)
+            elif kind is OptionalSequence:
+                stack.append(self._children(node) + rest)
+                stack.append(rest)
+            elif kind is VariantGroup:
+                stack += ((i,) + rest for i in self._children(node))
+            elif kind is UnorderedGroup:
+                stack.append(((head, (1 << len(node.children)) - 1),) + rest)
+            else:
+                # Leaves and nodes of unknown types, which are completed as slots taking a token
+                result.append(c)
+
+        closure = self._closures[continuation] = tuple(result)
+        return closure
+
+    def step(self, state: frozenset, value: str) -> frozenset:
+        """Returns the continuations reached by consuming a token with the given value"""
+
+        reached = []
+
+        for c in state:
+            if c == ():
+                continue
+
+            node = self.nodes[c[0]]
+            kind = type(node)
+
+            if kind in (VarArgs, Tail):
+                # Varargs and tails consume all remaining tokens
+                reached.append(c)
+                continue
+
+            if kind is Literal:
+                ratio = node.compare(value)
+                if ratio != 1.0 and not (node.tolerant and ratio >= self.matcher.literal_threshold):
+                    continue
+
+            elif kind is Parameter and node.typename is not None:
+                try:
+                    self.matcher.parse_arg(node.typename, value)
+                except ValueError:
+                    continue
+
+            reached += self.closure(c[1:])
+
+        return frozenset(reached)
+
+    def first(self, state: frozenset) -> list[Node]:
+        """Returns the leaves the given continuations start with"""
+        return [self.nodes[c[0]] for c in state if c != ()]
+
+
+class Completion:
+    """The possible continuations of a partial call, returned by `CommandDispatcher.complete()`."""
+
+    def __init__(self, text: str, start: int, prefix: str, literals: list[str], slots: list[str],
+                 states: dict[Command, frozenset], generation: int, mask: Optional[int], resumable: bool):
+        # The partial call up to the cursor
+        self.text = text
+        # The index and the text of the partially typed token (completions replace it)
+        self.start = start
+        self.prefix = prefix
+        # The literals starting with the prefix that can follow the complete tokens
+        self.literals = literals
+        # The parameters, varargs and tails that can follow the complete tokens
+        self.slots = slots
+
+        # The continuations reached by the complete tokens by command
+        self._states = states
+        self._generation = generation
+        self._mask = mask
+        # Whether the text can be lexed from the start of the partial token on its own
+        self._resumable = resumable
+
+    def __repr__(self) -> str:
+        return f'<Completion {repr(self.prefix)}: {self.literals + self.slots}>'
+
+
+class Completer:
+    """Completes partial calls against the commands of a dispatcher,
+    resuming from previous completions."""
+
+    def __init__(self, lexer: CallLexer):
+        self.lexer = lexer
+        self._tables: dict[Command, _CompletionTable] = {}
+
+    def table(self, command: Command) -> _CompletionTable:
+        table = self._tables.get(command)
+        if table is None:
+            table = self._tables[command] = _CompletionTable(command.syntax, command.matcher)
+        return table
+
+    def forget(self, command: Command):
+        self._tables.pop(command, None)
+
+    def complete(self, text: str, commands: list[Command], generation: int, mask: Optional[int],
+                 previous: Optional[Completion] = None) -> Completion:
+        """Completes the given text against the given commands. The previous completion
+        is resumed from if the text extends its complete tokens and the commands haven't changed
+        (as tracked by the generation and the mask)."""
+
+        if previous is not None and previous._resumable and previous._generation == generation \
+                and previous._mask == mask and text.startswith(previous.text[:previous.start]):
+            offset = previous.start
+            states = previous._states
+        else:
+            offset = 0
+            states = {command: self.table(command).initial for command in commands}
+
+        tokens = list(self.lexer.tokenize(text[offset:]))
+        all_tokens = tokens[:]
+
+        # The last token is partial unless followed by whitespace
+        start, prefix = len(text), ''
+        if tokens != [] and offset + tokens[-1].end == len(text) and not text[-1].isspace():
+            partial = tokens.pop()
+            start, prefix = offset + partial.start, partial.value
+            if partial.raw == partial.value and prefix[:1] in self.lexer.quotes:
+                # Unterminated quoted token
+                prefix = prefix[1:]
+
+        # The partial token can be lexed on its own only if it starts at a safe boundary
+        # (not after a quote or inside a quoted token, see `CallLexer.retokenize()`)
+        # after the complete tokens (a token directly following a quoted one starts before it)
+        resumable = type(self.lexer).tokenize is CallLexer.tokenize \
+            and (tokens == [] or offset + tokens[-1].end <= start) \
+            and self.lexer._safe_boundary(text[offset:], all_tokens, start - offset) == start - offset
+
+        for token in tokens:
+            stepped = {}
+            for command, state in states.items():
+                state = self.table(command).step(state, token.value)
+                if state:
+                    stepped[command] = state
+            states = stepped
+
+        literals, slots = set(), {}
+        lower = prefix.lower()
+
+        for command, state in states.items():
+            for node in self.table(command).first(state):
+                if type(node) is Literal:
+                    if node.value.startswith(prefix) or (not node.case_sensitive and node.value.lower().startswith(lower)):
+                        literals.add(node.value)
+                else:
+                    slots.setdefault(str(node), None)
+
+        return Completion(text, start, prefix, sorted(literals), list(slots), states, generation, mask, resumable)
@@ -0,0 +1,110 @@
+"""Estimates the worst-case matching cost of syntax trees.
+
+The cost is an upper bound on the number of node matches (`Node.match` calls)
+performed when matching a single call against a syntax tree. Variant groups try
+all of their variants and unordered groups retry all unused children on every
+iteration, so nesting them multiplies the cost.
+
+Upper bounds of match scores (`max_score()`) are provided as well, so that commands
+which cannot beat an already found match can be skipped.
+
+Usage: python -m cliffs.complexity <grammar file> [--budget N]
+(the grammar file contains one syntax specification per line)
+"""
+
+import sys
+from typing import Optional
+from .syntax_tree import *
+
+
+class SyntaxComplexityWarning(UserWarning):
+    """Issued when a syntax exceeds the configured complexity budget"""
+
+
+def estimate_cost(node: Node) -> int:
+    """Returns the worst-case number of node matches performed when matching
+    a call against the given syntax tree.
+
+    Parameters
+    ----------
+      * node: `Node` - The root of the syntax tree.
+
+    Returns
+    -------
+      * `int`: The estimated cost.
+    """
+
+    if isinstance(node, UnorderedGroup):
+        # Every iteration tries all unused children, in the worst case
+        # the most expensive children are matched last
+        costs = sorted((estimate_cost(child) for child in node.children), reverse=True)
+        return 1 + sum(sum(costs[:k]) for k in range(1, len(costs) + 1))
+
+    return 1 + sum(estimate_cost(child) for child in node.children)
+
+
+def max_score(node: Node) -> float:
+    """Returns an upper bound of the score of a successful match against the given
+    syntax tree (infinite if the tree contains nodes of unknown types).
+
+    Parameters
+    ----------
+      * node: `Node` - The root of the syntax tree.
+
+    Returns
+    -------
+      * `float`: The bound.
+    """
+
+    kind = type(node)
+
+    if kind is Literal:
+        # Tolerant literals score the similarity ratio
+        return 1.
+    elif kind is Parameter:
+        return 0.5
+    elif kind in (VarArgs, Tail):
+        return 0.
+    elif kind is VariantGroup:
+        return max((max_score(child) for child in node.children), default=0.)
+    elif kind in (Sequence, Variant, OptionalSequence, UnorderedGroup):
+        return sum(max_score(child) for child in node.children)
+
+    return float('inf')
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    import argparse
+    from .script import iter_script_lines
+    from .syntax_parser import SyntaxParser
+
+    parser = argparse.ArgumentParser(prog='python -m cliffs.complexity',
+                                     description='Estimate worst-case matching cost of command syntaxes')
+    parser.add_argument('grammar', help='file with one syntax specification per line (- for stdin)')
+    parser.add_argument('--budget', type=int, default=None, help='report syntaxes exceeding this cost')
+    args = parser.parse_args(argv)
+
+    syntax_parser = SyntaxParser()
+    over_budget = 0
+
+    with open(args.grammar, 'r') if args.grammar != '-' else sys.stdin as f:
+        for line_number, spec in iter_script_lines(f):
+            try:
+                cost = estimate_cost(syntax_parser.parse(spec))
+            except SyntaxError as e:
+                print(f'{line_number}: error: {e}')
+                over_budget += 1
+                continue
+
+            flag = ''
+            if args.budget is not None and cost > args.budget:
+                flag = ' OVER BUDGET'
+                over_budget += 1
+
+            print(f'{line_number}: {cost:>10}{flag}  {spec}')
+
+    return 1 if over_budget > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,258 @@
+import random
+import string
+from typing import Optional, Union
+from .call_match import CallMatchFail
+from .call_matcher import CallMatcher
+from .command import Command
+from .syntax_parser import SyntaxParser
+from .syntax_tree import *
+
+
+class CorpusGenerator:
+    """Generates random command syntaxes and calls matching them, nearly matching
+    them (with typos in literals) or not matching them at all. All output is
+    determined by the seed, so generated workloads are reproducible.
+    """
+
+    def __init__(self, seed: int = 0, **kwargs):
+        """Initializes a generator.
+
+        Parameters
+        ----------
+          * seed: `int` (optional) - The seed for the random number generator. Defaults to 0.
+
+        Keyword arguments
+        -----------------
+          * parser: `SyntaxParser` - The parser to use for syntaxes given as strings.
+          * matcher: `CallMatcher` - The matcher to verify generated calls with.
+          * max_attempts: `int` - How many times to retry generating a call that passes
+            verification. Defaults to 20.
+        """
+
+        self.random = random.Random(seed)
+        self.parser: SyntaxParser = kwargs.get('parser', None) or SyntaxParser()
+        self.matcher: CallMatcher = kwargs.get('matcher', None) or CallMatcher()
+        self.max_attempts: int = kwargs.get('max_attempts', 20)
+
+        self._names = 0
+
+    def word(self, min_len: int = 3, max_len: int = 8) -> str:
+        """Returns a random lowercase word."""
+
+        length = self.random.randint(min_len, max_len)
+        return ''.join(self.random.choice(string.ascii_lowercase) for _ in range(length))
+
+    def random_syntax(self, depth: int = 2, fanout: int = 3, unordered_size: int = 3,
+                      varargs: bool = False) -> str:
+        """Returns a random syntax specification of the given shape.
+
+        Parameters
+        ----------
+          * depth: `int` (optional) - The maximum nesting depth of groups. Defaults to 2.
+          * fanout: `int` (optional) - The maximum number of elements in sequences
+            and of variants in variant groups. Defaults to 3.
+          * unordered_size: `int` (optional) - The number of elements in unordered groups. Defaults to 3.
+          * varargs: `bool` (optional) - Whether to end the syntax with varargs. Defaults to False.
+
+        Returns
+        -------
+          * `str`: The syntax specification.
+        """
+
+        self._names = 0
+
+        elements = [self.word()] + [self._random_element(depth, fanout, unordered_size)
+                                    for _ in range(self.random.randint(1, fanout))]
+        if varargs:
+            elements.append(f'<{self._name()}*>')
+
+        return ' '.join(elements)
+
+    def _name(self) -> str:
+        self._names += 1
+        return f'p{self._names}'
+
+    def _random_element(self, depth: int, fanout: int, unordered_size: int) -> str:
+        if depth == 0:
+            r = self.random.random()
+            if r < 0.6:
+                return self.word()
+            elif r < 0.8:
+                return f'<{self._name()}>'
+            else:
+                return f'<{self._name()}: int>'
+
+        kind = self.random.choice(['sequence', 'optional', 'variants', 'unordered'])
+
+        def group(count: int) -> str:
+            # Groups start with a literal so they can be told apart
+            return ' '.join([self.word()] + [self._random_element(depth - 1, fanout, unordered_size)
+                                             for _ in range(count)])
+
+        if kind == 'sequence':
+            return f'({group(self.random.randint(1, fanout))})'
+        elif kind == 'optional':
+            return f'[{group(self.random.randint(0, fanout - 1))}]'
+        elif kind == 'variants':
+            return '(' + '|'.join(group(self.random.randint(0, fanout - 1)) for _ in range(max(fanout, 2))) + ')'
+        else:
+            return '{' + ' '.join(f'({group(1)})' for _ in range(unordered_size)) + '}'
+
+    def _tree(self, syntax: Union[str, Node]) -> Node:
+        return self.parser.parse(syntax) if isinstance(syntax, str) else syntax
+
+    def _walk(self, node: Node) -> list[tuple[str, bool]]:
+        """Generates tokens matching the given node as tuples: (token, is literal)"""
+
+        if isinstance(node, Literal):
+            return [(node.value, True)]
+
+        elif isinstance(node, Parameter):
+            return [(self._argument(node.typename), False)]
+
+        elif isinstance(node, VarArgs):
+            return [(self.word(), False) for _ in range(self.random.randint(0, 3))]
+
+        elif isinstance(node, Tail):
+            return [(self.word(), False) for _ in range(self.random.randint(1, 3))]
+
+        elif isinstance(node, OptionalSequence):
+            if self.random.random() < 0.5:
+                return []
+            return [token for child in node.children for token in self._walk(child)]
+
+        elif isinstance(node, VariantGroup):
+            return self._walk(self.random.choice(node.children))
+
+        elif isinstance(node, UnorderedGroup):
+            children = list(node.children)
+            self.random.shuffle(children)
+            return [token for child in children for token in self._walk(child)]
+
+        elif isinstance(node, Sequence):
+            return [token for child in node.children for token in self._walk(child)]
+
+        else:
+            raise TypeError(f"Cannot generate calls for {node.node_name}")
+
+    def _argument(self, typename: Optional[str]) -> str:
+        if typename == 'int':
+            return str(self.random.randint(0, 1000))
+        elif typename == 'float':
+            return f'{self.random.uniform(0, 1000):.2f}'
+        elif typename == 'bool':
+            return self.random.choice(['yes', 'no'])
+        else:
+            return self.word()
+
+    def _typo(self, word: str) -> str:
+        chars = list(word)
+        i = self.random.randrange(len(chars))
+
+        if len(chars) > 1 and self.random.random() < 0.5:
+            # Swap adjacent characters
+            j = i + 1 if i + 1 < len(chars) else i - 1
+            chars[i], chars[j] = chars[j], chars[i]
+        else:
+            # Replace a character
+            chars[i] = self.random.choice([c for c in string.ascii_lowercase if c != chars[i]])
+
+        return ''.join(chars)
+
+    def _matches(self, tree: Node, call: str) -> bool:
+        command = Command(tree, lambda: None, matcher=self.matcher)
+        try:
+            command.match(command.begin_match(call))
+            return True
+        except CallMatchFail:
+            return False
+
+    def _generate(self, tree: Node, mutate, should_match: bool, verify: bool) -> Optional[str]:
+        for _ in range(self.max_attempts):
+            tokens = mutate(self._walk(tree))
+            if tokens is None:
+                continue
+
+            call = ' '.join(token for token, _ in tokens)
+            if not verify or self._matches(tree, call) == should_match:
+                return call
+
+        return None
+
+    def call(self, syntax: Union[str, Node], verify: bool = True) -> Optional[str]:
+        """Returns a random call matching the given syntax.
+
+        Parameters
+        ----------
+          * syntax: `str` or `Node` - The syntax specification or syntax tree.
+          * verify: `bool` (optional) - Whether to check that the call actually matches
+            the syntax and retry otherwise. Defaults to True.
+
+        Returns
+        -------
+          * `str`: The call, or None if no verified call could be generated.
+        """
+
+        return self._generate(self._tree(syntax), lambda tokens: tokens, True, verify)
+
+    def typo(self, syntax: Union[str, Node], verify: bool = True) -> Optional[str]:
+        """Returns a random call matching the given syntax except for one misspelled literal.
+        Refer to `call()` for parameters."""
+
+        def mutate(tokens):
+            literals = [i for i, (_, is_literal) in enumerate(tokens) if is_literal]
+            if literals == []:
+                return None
+
+            i = self.random.choice(literals)
+            tokens[i] = (self._typo(tokens[i][0]), True)
+            return tokens
+
+        return self._generate(self._tree(syntax), mutate, False, verify)
+
+    def invalid(self, syntax: Union[str, Node], verify: bool = True) -> Optional[str]:
+        """Returns a random call that does not match the given syntax, with a token
+        removed, replaced or added. Refer to `call()` for parameters."""
+
+        def mutate(tokens):
+            action = self.random.choice(['remove', 'replace', 'add'])
+
+            if tokens == [] or action == 'add':
+                tokens.insert(self.random.randint(0, len(tokens)), (self.word(), False))
+            elif action == 'remove':
+                del tokens[self.random.randrange(len(tokens))]
+            else:
+                tokens[self.random.randrange(len(tokens))] = (self.word(), False)
+
+            return tokens
+
+        return self._generate(self._tree(syntax), mutate, False, verify)
+
+    def corpus(self, syntax: Union[str, Node], count: int, mix: tuple[float, float, float] = (1., 0., 0.),
+               verify: bool = True) -> list[str]:
+        """Returns a list of calls for the given syntax.
+
+        Parameters
+        ----------
+          * syntax: `str` or `Node` - The syntax specification or syntax tree.
+          * count: `int` - The number of calls to generate.
+          * mix: `tuple[float, float, float]` (optional) - The relative weights of matching calls,
+            typos and invalid calls. Defaults to matching calls only.
+          * verify: `bool` (optional) - See `call()`.
+
+        Returns
+        -------
+          * `list[str]`: The calls. Calls that could not be generated are omitted.
+        """
+
+        tree = self._tree(syntax)
+        generators = [self.call, self.typo, self.invalid]
+
+        calls = []
+        for _ in range(count):
+            generate = self.random.choices(generators, weights=mix)[0]
+            call = generate(tree, verify)
+            if call is not None:
+                calls.append(call)
+
+        return calls
@@ -1,11 +1,64 @@
 import inspect
-from typing import Any, Callable, Iterable, Optional
+from bisect import bisect_left
+from time import perf_counter, time
+from typing import IO, Any, Callable, Iterable, Optional
 from .utils import instance_or_kwargs, best
-from .call_match import CallMatch, CallMatchFail
+from .call_match import CallMatch, CallMatchFail, MatchBudget, MatchBudgetExceeded
+from .token import Token
+from .call_lexer import CallLexer
 from .command import Command
+from .cache import LRUCache
+from .single_flight import SingleFlight
+from .script import iter_script_lines, ScriptSummary
+from .stats import DispatchStats
+from .trace import MatchTracer
+from .slow_log import SlowDispatch, SlowDispatchLog
+from .recording import CallRecorder, outcome
+from .routing import PrefixRouter, Route
+from .ordering import AdaptiveOrder
+from .automaton import AutomatonRouter
+from .suggest import SuggestionIndex
 from .syntax_parser import SyntaxParser
 
 
+# Sentinel for cache misses
+_MISSING = object()
+
+# Returned by dispatch hooks to short-circuit the dispatch with a None result (see `add_hook()`)
+NO_RESULT = object()
+
+
+def _hook_result(result: Any) -> Any:
+    return None if result is NO_RESULT else result
+
+
+def _raise_exhausted(fail: CallMatchFail):
+    """Re-raises the given fail if it exhausted the budget shared by all commands of a dispatch.
+    Other fails, including commands exceeding their own step limit, are recorded by the caller."""
+
+    if isinstance(fail, MatchBudgetExceeded) and fail.exhausted:
+        raise fail
+
+
+class _CachedFail:
+    """A fail stored in the call cache. Every hit raises a fresh instance,
+    so that concurrent dispatches don't share its traceback and context."""
+
+    __slots__ = ('cls', 'args', 'state')
+
+    def __init__(self, fail: Exception):
+        self.cls = type(fail)
+        self.args = fail.args
+        self.state = dict(fail.__dict__)
+
+    def instance(self) -> Exception:
+        # Bypass __init__, whose signature can differ from the arguments of the exception
+        fail = self.cls.__new__(self.cls, *self.args)
+        fail.args = self.args
+        fail.__dict__.update(self.state)
+        return fail
+
+
 class CommandDispatchError(Exception):
     """Raised by the dispatcher when something goes wrong"""
 
@@ -13,6 +66,22 @@ class CommandDispatchError(Exception):
 class UnknownCommandError(CommandDispatchError):
     """Raised by the dispatcher when an unknown command is called"""
 
+    # The commands closest to the call, if suggestions are enabled
+    suggestions: list[Command] = []
+
+
+class ScriptLineError(CommandDispatchError):
+    """Raised by the dispatcher when a call in a dispatched script fails"""
+
+    def __init__(self, line_number: int, call: str, error: Exception):
+        super().__init__(f"Line {line_number}: {error}")
+        self.line_number = line_number
+        self.call = call
+        self.error = error
+
+
+HOOK_EVENTS = ('before_match', 'after_match', 'before_execute', 'after_execute', 'on_fail')
+
 
 class CommandDispatcher:
     """Manages registered commands, allows registering new commands.
@@ -28,12 +97,121 @@ class CommandDispatcher:
           * call_lexer: `CallLexer` or `dict` - The lexer to pass to new commands for tokenizing calls.
           * matcher: `CallMatcher` or `dict` - The matcher to pass to new commands for matching calls.
           * command_class: `type[Command]` - The class to construct for new commands.
+          * call_cache: `LRUCache`, `dict` or `bool` - Enables caching of match results (the matched
+            command or the raised fail) keyed by the raw call string. The cache is cleared whenever
+            a command is registered or a type is registered with a command's matcher.
+          * coalesce: `bool` - Whether identical calls to idempotent commands dispatched concurrently
+            from multiple threads should share a single execution of the callback. Calls are identical
+            if they match the same command with the same parameters, optionals and variants and are
+            dispatched with equal callback arguments. Calls with unhashable callback arguments are never shared.
+          * stats: `bool` - Whether to collect per-command dispatch statistics (see `stats()`).
+          * slow_threshold: `float` - Enables recording of dispatches slower than the given number
+            of milliseconds, explained with the commands tried, their scores and match times (see `slow_log`).
+            Only dispatches exceeding the threshold are explained, by matching the call again.
+          * slow_log_size: `int` - The number of slow dispatches to keep. Defaults to 100.
+          * slow_log_sample: `float` - The fraction of slow dispatches to also log as warnings
+            to the `cliffs.dispatcher` logger. Defaults to 1 (all of them).
+          * prefix_routing: `bool` - Whether to merge the leading literals and untyped parameters
+            of registered syntaxes into a prefix trie (see `cliffs.routing`), so that only commands
+            whose prefix matches the call are tried first and shared prefixes are matched once.
+            The other commands are only tried (to find the best fail) when no routed command matches.
+          * automaton: `bool` - Whether to route calls with a token automaton compiled from
+            the registered syntaxes (see `cliffs.automaton`), so that only commands whose syntax
+            can possibly accept the call are tried. Works like `prefix_routing`, which it supersedes.
+          * adaptive_order: `AdaptiveOrder`, `dict` or `bool` - Enables trying commands (or the commands
+            returned by the router) in order of decayed counts of dispatches they won and skipping commands
+            whose maximum possible score cannot beat the best match found so far. The selected command
+            is always the same as with all commands tried. See `export_order()` and `import_order()`.
+          * recorder: `CallRecorder` or `str` - Enables recording of dispatched calls with their
+            timestamps, outcomes and latencies to the given recorder or file (see `cliffs.recording`),
+            for replaying with `cliffs.replay`.
+          * suggestions: `SuggestionIndex`, `dict` or `bool` - Enables suggesting the commands closest
+            to calls no command can be determined for (see `cliffs.suggest`). The suggestions are
+            attached to the raised `UnknownCommandError`.
         """
 
         self.parser = instance_or_kwargs(kwargs.get('parser', {}), SyntaxParser)
         self.command_class: type[Command] = kwargs.get('command_class', Command)
 
+        # Registered commands ordered by their registration sequence numbers, which are kept
+        # by replaced and reloaded commands, so that they keep their position in the order
         self._commands: list[Command] = []
+        self._seqs: dict[Command, int] = {}
+        self._next_seq = 0
+        # Commands by namespace and by syntax
+        self._namespaces: dict[str, list[Command]] = {}
+        self._syntaxes: dict[str, list[Command]] = {}
+
+        # Bits of commands in visibility masks and commands by bit. Unlike sequence numbers,
+        # bits are never reused, so masks created before a command is replaced don't cover
+        # the new command. Masks of commands by tag and the visible commands of recently used masks.
+        self._bits: dict[Command, int] = {}
+        self._by_bit: dict[int, Command] = {}
+        self._next_bit = 0
+        self._tag_masks: dict[str, int] = {}
+        self._visible_cache = LRUCache(64)
+
+        # Parsed syntax trees shared by commands with the same specification,
+        # with the numbers of registered commands using them
+        self._parsed: dict[str, Any] = {}
+        self._parsed_refs: dict[str, int] = {}
+        self._specs: dict[Command, str] = {}
+
+        # The namespace being reloaded and the sequence numbers to reuse by syntax,
+        # while in `reload()`
+        self._reloading: Optional[tuple[str, dict[str, list[int]]]] = None
+
+        call_cache = kwargs.get('call_cache', None)
+        if call_cache is True:
+            call_cache = {}
+        self.call_cache: Optional[LRUCache] = None if call_cache in (None, False) \
+            else instance_or_kwargs(call_cache, LRUCache)
+
+        self._single_flight: Optional[SingleFlight] = SingleFlight() if kwargs.get('coalesce', False) else None
+        self._stats: Optional[DispatchStats] = DispatchStats() if kwargs.get('stats', False) else None
+
+        self.slow_log: Optional[SlowDispatchLog] = None
+        if kwargs.get('slow_threshold', None) is not None:
+            self.slow_log = SlowDispatchLog(
+                kwargs['slow_threshold'], kwargs.get('slow_log_size', 100), kwargs.get('slow_log_sample', 1.0))
+
+        recorder = kwargs.get('recorder', None)
+        self.recorder: Optional[CallRecorder] = CallRecorder(recorder) if isinstance(recorder, str) else recorder
+
+        order = kwargs.get('adaptive_order', None)
+        if order is True:
+            order = {}
+        self.order: Optional[AdaptiveOrder] = None if order in (None, False) \
+            else instance_or_kwargs(order, AdaptiveOrder)
+
+        suggestions = kwargs.get('suggestions', None)
+        if suggestions is True:
+            suggestions = {}
+        self.suggestions: Optional[SuggestionIndex] = None if suggestions in (None, False) \
+            else instance_or_kwargs(suggestions, SuggestionIndex)
+
+        # Routes of all commands without prefixes, for adaptive ordering without a router
+        self._routes: Optional[list[tuple[Route, None]]] = None
+
+        # Router narrowing down the commands to try, rebuilt lazily after commands are registered
+        self._router_class: Optional[type] = AutomatonRouter if kwargs.get('automaton', False) \
+            else PrefixRouter if kwargs.get('prefix_routing', False) else None
+        self._router: Optional[PrefixRouter | AutomatonRouter] = None
+
+        # Completion tables, the last completion to resume from and the number of changes
+        # to the registered commands, which invalidate completions
+        self._completer = None
+        self._last_completion = None
+        self._generation = 0
+
+        # Callbacks notified whenever the registered commands change
+        self._change_listeners: list[Callable[[], None]] = []
+
+        # Hook chains by event
+        self._hooks: dict[str, tuple[Callable, ...]] = {event: () for event in HOOK_EVENTS}
+
+        # Whether dispatch must take the path supporting hooks, the slow log and the recorder
+        self._instrumented = self.slow_log is not None or self.recorder is not None
 
         # Kwargs to be passed to commands constructed with @command
         self._command_kwargs = {}
@@ -48,8 +226,260 @@ class CommandDispatcher:
         Parameters
         ----------
           * command: `Command` - The command to register.
+
+        Raises
+        ------
+          * `ValueError` if the command is already registered.
+        """
+
+        if command in self._seqs:
+            raise ValueError(f"Command {command.syntax} is already registered")
+
+        seq = None
+        if self._reloading is not None:
+            namespace, seqs = self._reloading
+            if command.namespace is None:
+                command.namespace = namespace
+
+            # Commands reloaded with an unchanged syntax keep their position
+            if command.namespace == namespace and seqs.get(str(command.syntax)):
+                seq = seqs[str(command.syntax)].pop(0)
+
+        self._insert(command, seq)
+        self._add_listeners(command)
+
+    def _add_listeners(self, command: Command):
+        """Invalidates the call cache whenever the matches of the given command may change:
+        when a type is registered with its matcher or when the commands of a mounted group change."""
+
+        if self.call_cache is None:
+            return
+
+        command.matcher.add_type_listener(self._invalidate_call_cache)
+
+        from .mount import MountedGroup
+        if isinstance(command, MountedGroup):
+            command.add_change_listener(self._invalidate_call_cache)
+
+    def _insert(self, command: Command, seq: Optional[int] = None):
+        """Inserts a command at the position of the given sequence number
+        (by default, after all registered commands) and updates the indexes."""
+
+        if seq is None:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._commands.append(command)
+        else:
+            self._commands.insert(bisect_left(self._commands, seq, key=self._seqs.__getitem__), command)
+
+        bit = self._next_bit
+        self._next_bit += 1
+
+        self._seqs[command] = seq
+        self._bits[command] = bit
+        self._by_bit[bit] = command
+        self._syntaxes.setdefault(str(command.syntax), []).append(command)
+        for tag in command.tags:
+            self._tag_masks[tag] = self._tag_masks.get(tag, 0) | (1 << bit)
+        if command.namespace is not None:
+            self._namespaces.setdefault(command.namespace, []).append(command)
+
+        if self._router is not None:
+            self._router.add(seq, command)
+        if self.suggestions is not None:
+            self.suggestions.add(command)
+        self._changed()
+
+    def unregister(self, command: Command) -> None:
+        """Unregisters the given command. Routing indexes and caches are updated
+        in time proportional to the size of the command, not the number of registered commands.
+
+        Parameters
+        ----------
+          * command: `Command` - The command to unregister.
+
+        Raises
+        ------
+          * `ValueError` if the command is not registered.
+        """
+
+        seq = self._seqs.get(command)
+        if seq is None:
+            raise ValueError(f"Command {command.syntax} is not registered")
+
+        del self._commands[bisect_left(self._commands, seq, key=self._seqs.__getitem__)]
+        del self._seqs[command]
+        bit = self._bits.pop(command)
+        del self._by_bit[bit]
+        for tag in command.tags:
+            self._tag_masks[tag] &= ~(1 << bit)
+            if self._tag_masks[tag] == 0:
+                del self._tag_masks[tag]
+
+        syntax = str(command.syntax)
+        self._syntaxes[syntax].remove(command)
+        if self._syntaxes[syntax] == []:
+            del self._syntaxes[syntax]
+
+        if command.namespace is not None:
+            self._namespaces[command.namespace].remove(command)
+            if self._namespaces[command.namespace] == []:
+                del self._namespaces[command.namespace]
+
+        if self._router is not None:
+            self._router.remove(command)
+        if self.suggestions is not None:
+            self.suggestions.remove(command)
+        if self._completer is not None:
+            self._completer.forget(command)
+        if self.order is not None:
+            self.order.forget(command)
+        if self._stats is not None:
+            self._stats.forget(command)
+
+        self._release(command)
+        self._changed()
+
+    def replace(self, command: Command, old: Optional[Command] = None) -> Command:
+        """Registers the given command in place of a registered one, keeping its position
+        in the registration order.
+
+        Parameters
+        ----------
+          * command: `Command` - The command to register.
+          * old: `Command` (optional) - The command to replace. Defaults to the registered command
+            with the same syntax.
+
+        Returns
+        -------
+          * `Command`: The replaced command.
+
+        Raises
+        ------
+          * `ValueError` if the command to replace is not registered.
+        """
+
+        if old is None:
+            syntax = str(command.syntax)
+            if syntax not in self._syntaxes:
+                raise ValueError(f"No command with syntax {syntax} is registered")
+            old = min(self._syntaxes[syntax], key=self._seqs.__getitem__)
+
+        seq = self._seqs.get(old)
+        if seq is None:
+            raise ValueError(f"Command {old.syntax} is not registered")
+
+        self.unregister(old)
+        self._insert(command, seq)
+        self._add_listeners(command)
+
+        return old
+
+    def reload(self, namespace: str, loader: Callable[['CommandDispatcher'], Any]) -> list[Command]:
+        """Replaces the commands of the given namespace with the commands registered by the loader.
+        Reloaded commands with unchanged syntaxes keep their positions in the registration order
+        and share the syntax trees parsed for the previous commands. If the loader raises,
+        the previous commands are restored and the exception is propagated.
+
+        Parameters
+        ----------
+          * namespace: `str` - The namespace to reload.
+          * loader: `(CommandDispatcher) -> *` - Registers the new commands with the given dispatcher.
+            Commands registered without a namespace are put into the reloaded one.
+
+        Returns
+        -------
+          * `list[Command]`: The commands of the namespace after reloading.
+        """
+
+        if self._reloading is not None:
+            raise CommandDispatchError("Cannot reload a namespace while reloading")
+
+        old = list(self._namespaces.get(namespace, ()))
+        old_seqs = {command: self._seqs[command] for command in old}
+
+        seqs: dict[str, list[int]] = {}
+        for command in old:
+            seqs.setdefault(str(command.syntax), []).append(old_seqs[command])
+
+        # Keep the parsed trees of the old commands for the loader to reuse
+        specs = {command: self._specs[command] for command in old if command in self._specs}
+        for syntax in specs.values():
+            self._parsed_refs[syntax] += 1
+        for command in old:
+            self.unregister(command)
+
+        self._reloading = (namespace, seqs)
+        try:
+            loader(self)
+        except BaseException:
+            for command in list(self._namespaces.get(namespace, ())):
+                self.unregister(command)
+            for command in old:
+                self._insert(command, old_seqs[command])
+                self._retain(command, specs.get(command))
+            raise
+        finally:
+            self._reloading = None
+            for syntax in specs.values():
+                self._drop_parsed(syntax)
+
+        return list(self._namespaces.get(namespace, ()))
+
+    def _changed(self):
+        """Drops the state derived from the whole set of registered commands."""
+
+        self._routes = None
+        self._visible_cache.clear()
+        self._generation += 1
+        if self.order is not None:
+            self.order.invalidate()
+        self._invalidate_call_cache()
+
+        for listener in self._change_listeners:
+            listener()
+
+    def add_change_listener(self, listener: Callable[[], None]):
+        """Registers a callback to be called whenever a command is registered, unregistered
+        or replaced. Used to invalidate match results cached by outer dispatchers of mounted groups.
+
+        Parameters
+        ----------
+          * listener: `() -> None` - The callback.
         """
-        self._commands.append(command)
+
+        if listener not in self._change_listeners:
+            self._change_listeners.append(listener)
+
+    def _parse(self, syntax: str):
+        """Parses the given syntax specification with the parser of this dispatcher,
+        reusing the tree parsed for a registered command with the same specification."""
+
+        tree = self._parsed.get(syntax)
+        if tree is None:
+            tree = self.parser.parse(syntax)
+        return tree
+
+    def _retain(self, command: Command, syntax: Optional[str]):
+        if syntax is None:
+            return
+        self._specs[command] = syntax
+        self._parsed_refs[syntax] = self._parsed_refs.get(syntax, 0) + 1
+
+    def _release(self, command: Command):
+        syntax = self._specs.pop(command, None)
+        if syntax is not None:
+            self._drop_parsed(syntax)
+
+    def _drop_parsed(self, syntax: str):
+        self._parsed_refs[syntax] -= 1
+        if self._parsed_refs[syntax] == 0:
+            del self._parsed_refs[syntax]
+            self._parsed.pop(syntax, None)
+
+    def _invalidate_call_cache(self):
+        if self.call_cache is not None:
+            self.call_cache.clear()
 
     def command(self, syntax: str, **kwargs) -> Callable[[Callable], Command]:
         """(decorator)
@@ -72,9 +502,11 @@ class CommandDispatcher:
           * `Command`: The constructed, registered command.
         """
 
-        parser = instance_or_kwargs(kwargs.get('parser', self.parser), SyntaxParser)
+        if 'parser' in kwargs:
+            syntax_root = instance_or_kwargs(kwargs['parser'], SyntaxParser).parse(syntax)
+        else:
+            syntax_root = self._parse(syntax)
 
-        syntax_root = parser.parse(syntax)
         command_class: type[Command] = kwargs.pop('command_class', self.command_class)
 
         def decorator(f: Callable) -> Command:
@@ -85,23 +517,66 @@ class CommandDispatcher:
 
             cmd = command_class(syntax_root, f, **self._command_kwargs | kwargs)
             self.register(cmd)
+
+            if 'parser' not in kwargs:
+                self._parsed[syntax] = syntax_root
+                self._retain(cmd, syntax)
             return cmd
 
         return decorator
 
-    def dispatch(self, call: str, **callback_args) -> tuple[Any, Command]:
+    def mount(self, prefix_syntax: str, loader, **kwargs) -> Command:
+        """Registers a group of commands dispatched by a nested dispatcher for calls starting
+        with the given prefix. The nested dispatcher is loaded and its syntaxes are parsed
+        on the first call matching the prefix. Refer to `cliffs.mount`.
+
+        Parameters
+        ----------
+          * prefix_syntax: `str` - The syntax of the prefix.
+          * loader: `str` or `(CommandDispatcher) -> *` - Registers the commands of the group
+            with the given nested dispatcher, or `module:attribute` of such a function
+            or of the nested dispatcher, imported on first use.
+
+        Refer to `MountedGroup.__init__` for keyword arguments. The nested dispatcher
+        is by default configured with the parser, lexer and matcher of this dispatcher.
+
+        Returns
+        -------
+          * `MountedGroup`: The constructed, registered group.
+        """
+
+        from .mount import MountedGroup
+
+        if 'dispatcher' not in kwargs:
+            kwargs['dispatcher'] = {'parser': self.parser, 'command_class': self.command_class}
+            if 'lexer' in self._command_kwargs:
+                kwargs['dispatcher']['call_lexer'] = self._command_kwargs['lexer']
+            if 'matcher' in self._command_kwargs:
+                kwargs['dispatcher']['matcher'] = self._command_kwargs['matcher']
+
+        group = MountedGroup(self.parser.parse(prefix_syntax), loader, **self._command_kwargs | kwargs)
+        self.register(group)
+        return group
+
+    def dispatch(self, call: str, *, mask: Optional[int] = None, **callback_args) -> tuple[Any, Optional[Command]]:
         """Tries to dispatch the given command calls to the appropriate command.
 
-        All keyword arguments will be passed as additional arguments to the
+        All other keyword arguments will be passed as additional arguments to the
         appropriate callback.
 
         Parameters
         ----------
           * call: `str` - The call to process and dispatch.
+          * mask: `int` (optional) - The visibility mask selecting the commands the call
+            can be dispatched to (see `tag_mask()` and `command_mask()`). Other commands
+            are skipped as if they were not registered. By default, all commands are visible.
+            Being keyword-only, `mask` is never passed to callbacks.
 
         Returns
         -------
           * Whatever the callback of the matched command returns.
+          * `Command`: The matched command, or None if a `before_match` hook
+            short-circuited the dispatch (see `add_hook()`).
 
         Raises
         ------
@@ -109,36 +584,827 @@ class CommandDispatcher:
             matches the call.
           * `UnknownCommandError` when no appropriate command can be determined
             based on the tokens of the call.
+          * `MatchBudgetExceeded` when matching the call exceeds the budget configured
+            in the `CallMatcher` of the commands, shared by all commands tried.
+        """
+
+        if self._instrumented:
+            return self._dispatch_instrumented(call, callback_args, mask)
+
+        match, command = self._resolve(call, mask)
+        return self._execute(command, match, callback_args), command
+
+    def resolve(self, call: str, *, mask: Optional[int] = None) -> tuple[CallMatch, Command]:
+        """Finds the command the given call would be dispatched to, without running hooks
+        or executing the command. Used by mounted groups to match calls to nested dispatchers
+        (see `cliffs.mount`).
+
+        Parameters
+        ----------
+          * call: `str` - The call to match.
+          * mask: `int` (optional) - The visibility mask (see `dispatch()`).
+
+        Returns
+        -------
+          * `CallMatch`: The match of the call.
+          * `Command`: The matched command.
+
+        Raises
+        ------
+          * `CallMatchFail`, `UnknownCommandError` or `MatchBudgetExceeded` (see `dispatch()`).
+        """
+
+        return self._resolve(call, mask)
+
+    def dispatch_resolved(self, call: str, resolved: tuple[CallMatch, Command],
+                          **callback_args) -> tuple[Any, Optional[Command]]:
+        """Dispatches a call already matched with `resolve()` like `dispatch()`, running the hooks
+        and recording the dispatch, without matching the call again. The `before_match` hooks
+        run before the command is executed, since the call has already been matched.
+
+        All other keyword arguments will be passed as additional arguments to the
+        callback.
+
+        Parameters
+        ----------
+          * call: `str` - The dispatched call.
+          * resolved: `tuple[CallMatch, Command]` - The match and the command returned by `resolve()`.
+
+        Returns
+        -------
+          * Whatever the callback of the command returns.
+          * `Command`: The command, or None if a `before_match` hook short-circuited the dispatch.
+        """
+
+        if self._instrumented:
+            return self._dispatch_instrumented(call, callback_args, resolved=resolved)
+
+        match, command = resolved
+        return self._execute(command, match, callback_args), command
+
+    def _dispatch_instrumented(self, call: str, callback_args: dict, mask: Optional[int] = None,
+                               resolved: Optional[tuple[CallMatch, Command]] = None) \
+            -> tuple[Any, Optional[Command]]:
+        """Dispatches the given call (or the given resolved match) running the installed hooks,
+        recording the dispatch in the slow dispatch log if it exceeds the threshold
+        and in the recorder if there is one."""
+
+        timestamp = time()
+        start = perf_counter()
+        command = match = error = None
+        # Whether a before_match hook short-circuited the dispatch and whether the match
+        # result was served from the call cache
+        short_circuited = False
+        hits = []
+
+        try:
+            for hook in self._hooks['before_match']:
+                result = hook(call, callback_args)
+                if result is not None:
+                    short_circuited = True
+                    return _hook_result(result), None
+
+            try:
+                match, command = self._resolve(call, mask, hits) if resolved is None else resolved
+            except (CallMatchFail, CommandDispatchError) as fail:
+                for hook in self._hooks['on_fail']:
+                    hook(call, fail)
+                raise
+
+            for hook in self._hooks['after_match']:
+                hook(call, match, command)
+
+            for hook in self._hooks['before_execute']:
+                result = hook(match, command, callback_args)
+                if result is not None:
+                    return _hook_result(result), command
+
+            result = self._execute(command, match, callback_args)
+
+            for hook in self._hooks['after_execute']:
+                replaced = hook(match, command, result)
+                if replaced is not None:
+                    result = _hook_result(replaced)
+
+            return result, command
+
+        except Exception as e:
+            error = e
+            raise
+
+        finally:
+            duration = perf_counter() - start
+
+            if self.slow_log is not None and duration >= self.slow_log.threshold:
+                # Only slow dispatches are explained, by matching the call again with every attempt measured
+                explain = not short_circuited and hits == []
+                entry = SlowDispatch(call, duration, self._explain(call, mask) if explain else [])
+                entry.short_circuited = short_circuited
+                entry.cached = hits != []
+                entry.error = error
+                if command is not None:
+                    entry.command = str(command.syntax)
+                    entry.params = dict(match._params)
+
+                self.slow_log.record(entry)
+
+            if self.recorder is not None:
+                # Errors raised after a command was matched are not outcomes of matching the call
+                self.recorder.record(call, timestamp, duration, outcome(command, error),
+                                     outcome(command) if command is not None else None)
+
+    def add_hook(self, event: str, hook: Callable):
+        """Appends a hook to the chain of hooks run on the given dispatch event.
+        Hooks run in the order they were added.
+
+        Events and hook signatures
+        --------------------------
+          * `before_match(call, callback_args)` - Run before matching. Returning anything
+            other than None short-circuits the dispatch: the value is returned
+            by `dispatch()` along with None in place of the command.
+          * `after_match(call, match, command)` - Run after a command is matched.
+          * `before_execute(match, command, callback_args)` - Run before executing the matched
+            command. Returning anything other than None short-circuits the dispatch:
+            the value is returned by `dispatch()` in place of the callback result.
+          * `after_execute(match, command, result)` - Run after executing the command. Returning
+            anything other than None replaces the result.
+          * `on_fail(call, fail)` - Run when no command matches the call, before the
+            `CallMatchFail` or `UnknownCommandError` is raised.
+
+        To short-circuit the dispatch with (or replace the result with) None,
+        a hook can return `NO_RESULT`.
+
+        Parameters
+        ----------
+          * event: `str` - The event to run the hook on.
+          * hook: `(...) -> *` - The hook.
         """
 
+        if event not in self._hooks:
+            raise ValueError(f"Unknown dispatch event: {repr(event)}")
+
+        self._hooks[event] += (hook,)
+        self._instrumented = True
+
+    def remove_hook(self, event: str, hook: Callable):
+        """Removes a hook added with `add_hook()`.
+
+        Raises
+        ------
+          * `ValueError` if the hook is not installed for the given event.
+        """
+
+        if event not in self._hooks or hook not in self._hooks[event]:
+            raise ValueError(f"Hook {hook} is not installed for {repr(event)}")
+
+        hooks = list(self._hooks[event])
+        hooks.remove(hook)
+        self._hooks[event] = tuple(hooks)
+
+        self._instrumented = self.slow_log is not None or self.recorder is not None \
+            or any(self._hooks.values())
+
+    def hook(self, event: str) -> Callable[[Callable], Callable]:
+        """(decorator)
+        Adds the annotated function as a hook for the given event (see `add_hook()`).
+        """
+
+        def decorator(f: Callable) -> Callable:
+            self.add_hook(event, f)
+            return f
+
+        return decorator
+
+    def dispatch_stream(self, fileobj: IO, *, continue_on_error: bool = False,
+                        max_errors: int = 100, **callback_args) -> ScriptSummary:
+        """Dispatches the calls read from a newline-delimited script file one by one.
+        Lines are read lazily, so arbitrarily long scripts are handled in bounded memory.
+        Empty lines and lines starting with `#` are skipped, lines ending with a backslash
+        are continued on the next line. Callback return values are discarded.
+
+        All other keyword arguments will be passed as additional arguments to the
+        callbacks.
+
+        Parameters
+        ----------
+          * fileobj: `IO` - The text or binary file to read calls from.
+          * continue_on_error: `bool` (optional) - Whether to continue past failed calls
+            and report them in the summary. Defaults to False.
+          * max_errors: `int` (optional) - The maximum number of errors to keep in the summary.
+            Further errors are only counted. Defaults to 100.
+
+        Returns
+        -------
+          * `ScriptSummary`: The summary of the dispatched calls.
+
+        Raises
+        ------
+          * `ScriptLineError` wrapping the error raised by the first failed call,
+            unless `continue_on_error` is set.
+        """
+
+        summary = ScriptSummary(max_errors)
+
+        for line_number, call in iter_script_lines(fileobj):
+            summary.dispatched += 1
+
+            try:
+                self.dispatch(call, **callback_args)
+                summary.succeeded += 1
+
+            except Exception as e:
+                error = ScriptLineError(line_number, call, e)
+                if not continue_on_error:
+                    raise error from e
+                summary.add_error(error)
+
+        return summary
+
+    def serve(self, path: str, **kwargs):
+        """Serves this dispatcher over a Unix socket until interrupted.
+        Refer to `cliffs.serve` for the protocol.
+
+        Parameters
+        ----------
+          * path: `str` - The path of the Unix socket to listen on.
+
+        Refer to `CommandServer.__init__` for keyword arguments.
+        """
+
+        import asyncio
+        from .serve import CommandServer
+
+        asyncio.run(CommandServer(self, path, **kwargs).serve_forever())
+
+    def _resolve(self, call: str, mask: Optional[int] = None,
+                 hits: Optional[list] = None) -> tuple[CallMatch, Command]:
+        """Finds the best match for the given call among the commands visible with the given mask,
+        using the call cache if enabled. If a list of hits is given, the cache key is appended
+        to it when the result is served from the call cache.
+
+        Raises
+        ------
+          * `CallMatchFail` or `UnknownCommandError` (see `dispatch()`)
+        """
+
+        if self.call_cache is None:
+            return self._match(call, mask)
+
+        key = call if mask is None else (call, mask)
+        entry = self.call_cache.get(key, _MISSING)
+
+        if entry is _MISSING:
+            try:
+                match, command = self._match(call, mask)
+            except MatchBudgetExceeded:
+                raise
+            except (CallMatchFail, UnknownCommandError) as fail:
+                self.call_cache.put(key, _CachedFail(fail))
+                raise
+
+            self.call_cache.put(key, (command, dict(match._params), list(match._opts),
+                                       list(match._vars), match.score))
+            return match, command
+
+        if hits is not None:
+            hits.append(key)
+
+        if isinstance(entry, _CachedFail):
+            raise entry.instance()
+
+        # Rebuild the match from the cached entry
+        command, params, opts, vars, score = entry
+        match = CallMatch(call, [])
+        match._params = dict(params)
+        match._opts = list(opts)
+        match._vars = list(vars)
+        match.score = score
+
+        # Keep the adaptive order learning from the dispatches served from the cache
+        if self.order is not None:
+            self.order.record(command)
+
+        return match, command
+
+    def _match(self, call: str, mask: Optional[int] = None) -> tuple[CallMatch, Command]:
+        """Matches the given call against all registered commands visible with the given mask
+        and returns the best match, recording the attempts in the statistics if enabled.
+
+        Raises
+        ------
+          * `CallMatchFail` or `UnknownCommandError` (see `dispatch()`)
+        """
+
+        # Budgets shared by all attempts to match the call, by the limits of command matchers
+        budgets: dict[tuple, MatchBudget] = {}
+
+        if self._stats is None:
+            matches, fails = self._collect(call, mask, budgets)
+        else:
+            attempts = []
+            matches, fails = self._collect(call, mask, budgets, attempts)
+            self._stats.record_attempts(attempts)
+
+        try:
+            match, command = self._select(matches, fails)
+        except UnknownCommandError:
+            if self.suggestions is None:
+                raise
+            self._suggest(call, mask)
+
+        if self.order is not None:
+            self.order.record(command)
+
+        return match, command
+
+    def _explain(self, call: str, mask: Optional[int] = None) -> list[tuple[Command, float, bool, float]]:
+        """Matches the given call again, bypassing the call cache, and returns the measured
+        attempts (see `_collect()`) without recording them in the statistics or the adaptive order."""
+
+        attempts = []
+        try:
+            self._collect(call, mask, {}, attempts)
+        except CallMatchFail:
+            # The budget was exhausted, the attempts made so far explain the dispatch
+            pass
+        return attempts
+
+    def _suggest(self, call: str, mask: Optional[int] = None):
+        """Raises `UnknownCommandError` with the visible commands closest to the given call."""
+
+        accept = None if mask is None else lambda command: mask >> self._bits[command] & 1
+        suggestions = self.suggestions.suggest(call, accept=accept)
+
+        if suggestions == []:
+            raise UnknownCommandError('Unknown command')
+
+        error = UnknownCommandError(f"Unknown command, did you mean: {', '.join(str(c.syntax) for c in suggestions)}?")
+        error.suggestions = suggestions
+        raise error
+
+    def _select(self, matches: list[tuple[CallMatch, Command]],
+                fails: list[tuple[CallMatchFail, float]]) -> tuple[CallMatch, Command]:
+        """Selects the best match from the collected matches or raises the best fail."""
+
+        # Find the match with the highest score
+        if matches != []:
+            return best(matches, lambda m: m[0].score)
+
+        # If no command successfully matched, raise best scoring fail
+        elif fails != []:
+            best_fail, _ = best(fails, lambda f: f[1])
+            raise best_fail
+
+        # ...or unknown command if there are no fails scoring above 0
+        else:
+            raise UnknownCommandError('Unknown command')
+
+    def _collect(self, call: str, mask: Optional[int] = None, budgets: Optional[dict] = None,
+                 attempts: Optional[list[tuple[Command, float, bool, float]]] = None) \
+            -> tuple[list[tuple[CallMatch, Command]], list[tuple[CallMatchFail, float]]]:
+        """Matches the given call against all registered commands visible with the given mask,
+        sharing the given budgets between the commands (see `_begin_match()`). If a list
+        of attempts is given, every command tried is measured and appended to the list
+        as a tuple: (command, time in seconds, whether matched, score). With a router,
+        only the routed commands (and the fallback of `_complete()`) are tried.
+
+        Returns
+        -------
+          * `list[tuple[CallMatch, Command]]`: The successful matches.
+          * `list[tuple[CallMatchFail, float]]`: The fails with their scores (only those scoring above 0).
+        """
+
+        if budgets is None:
+            budgets = {}
+        if self._router_class is not None:
+            return self._collect_routed(call, mask, budgets, attempts)
+        if self.order is not None:
+            return self._collect_ordered(call, mask, budgets, attempts)
+
+        matches: list[tuple[CallMatch, Command]] = []
+        fails: list[tuple[CallMatchFail, float]] = []
+
+        for command in self._visible(mask):
+            start = perf_counter() if attempts is not None else 0.
+            match = self._begin_match(command, call, budgets)
+
+            try:
+                command.match(match)
+                matches.append((match, command))
+                matched = True
+
+            except CallMatchFail as fail:
+                _raise_exhausted(fail)
+                matched = False
+                if match.score > 0:
+                    fails.append((fail, match.score))
+
+            if attempts is not None:
+                attempts.append((command, perf_counter() - start, matched, match.score))
+
+        return matches, fails
+
+    def _collect_routed(self, call: str, mask: Optional[int], budgets: dict, attempts: Optional[list] = None) \
+            -> tuple[list[tuple[CallMatch, Command]], list[tuple[CallMatchFail, float]]]:
+        """Works like `_collect()`, but only tries the commands returned by the router
+        unless none of them matches. Returns the same matches and fails as `_collect()`
+        whenever any command matches."""
+
+        router = self._router
+        if router is None:
+            router = self._router = self._router_class((self._seqs[command], command) for command in self._commands)
+
+        routes = router.route(call)
+        if mask is not None:
+            routes = [route for route in routes if mask >> self._bits[route[0].command] & 1]
+
+        matches, results = self._try_routes(call, routes, budgets, attempts)
+        return self._complete(call, matches, results, mask, budgets, attempts)
+
+    def _collect_ordered(self, call: str, mask: Optional[int], budgets: dict, attempts: Optional[list] = None) \
+            -> tuple[list[tuple[CallMatch, Command]], list[tuple[CallMatchFail, float]]]:
+        """Works like `_collect()`, but tries the commands in adaptive order (see `_try_routes()`)."""
+
+        routes = self._routes
+        if routes is None:
+            routes = self._routes = [(Route(self._seqs[command], command, prefix=False), None)
+                                     for command in self._commands]
+
+        if mask is not None:
+            routes = [route for route in routes if mask >> self._bits[route[0].command] & 1]
+
+        matches, results = self._try_routes(call, routes, budgets, attempts)
+        return self._complete(call, matches, results, mask, budgets, attempts)
+
+    def _try_routes(self, call: str, routes: list[tuple[Route, Optional[list[Token]]]], budgets: dict,
+                    attempts: Optional[list] = None) \
+            -> tuple[list[tuple[CallMatch, Command]], dict[int, tuple[CallMatchFail, float]]]:
+        """Tries the commands of the given routes (as returned by `PrefixRouter.route()`),
+        appending the attempts to the given list if any (see `_collect()`).
+
+        With adaptive ordering, the hottest commands are tried first and commands
+        whose score bound cannot beat the best match found so far are skipped.
+
+        Returns
+        -------
+          * `list[tuple[CallMatch, Command]]`: The matches in registration order.
+          * `dict[int, tuple[CallMatchFail, float]]`: The fails with their scores
+            by registration sequence number of their commands.
+        """
+
+        order = self.order
+        if order is not None:
+            routes = order.arrange(routes, lambda r: r[0].command, 0 if routes is self._routes else None)
+
+        matched: list[tuple[int, CallMatch, Command]] = []
+        results: dict[int, tuple[CallMatchFail, float]] = {}
+        best_score, best_index = 0., -1
+
+        for route, tokens in routes:
+            command = route.command
+
+            # Skip commands that would lose to the best match even with their maximum score
+            if order is not None and best_index >= 0:
+                bound = order.bound(command)
+                if bound < best_score or (bound == best_score and route.index > best_index):
+                    continue
+
+            start = perf_counter() if attempts is not None else 0.
+            match = route.begin_match(call, tokens)
+            match.budget = self._budget(command, budgets)
+
+            try:
+                command.match(match, len(route))
+            except CallMatchFail as fail:
+                _raise_exhausted(fail)
+                results[route.index] = (fail, match.score)
+                if attempts is not None:
+                    attempts.append((command, perf_counter() - start, False, match.score))
+                continue
+
+            if attempts is not None:
+                attempts.append((command, perf_counter() - start, True, match.score))
+            matched.append((route.index, match, command))
+            if best_index < 0 or match.score > best_score or (match.score == best_score and route.index < best_index):
+                best_score, best_index = match.score, route.index
+
+        matched.sort(key=lambda m: m[0])
+        return [(match, command) for _, match, command in matched], results
+
+    def _complete(self, call: str, matches: list[tuple[CallMatch, Command]],
+                  results: dict[int, tuple[CallMatchFail, float]], mask: Optional[int], budgets: dict,
+                  attempts: Optional[list] = None) \
+            -> tuple[list[tuple[CallMatch, Command]], list[tuple[CallMatchFail, float]]]:
+        """Returns the given matches if there are any. Otherwise, tries the visible commands
+        not tried yet to find the best fail, keeping the fails in registration order
+        and appending the attempts to the given list if any (see `_collect()`)."""
+
+        if matches != []:
+            return matches, []
+
+        fails: list[tuple[CallMatchFail, float]] = []
+
+        for command in self._visible(mask):
+            index = self._seqs[command]
+            if index not in results:
+                start = perf_counter() if attempts is not None else 0.
+                match = self._begin_match(command, call, budgets)
+                try:
+                    command.match(match)
+                    matched = True
+                except CallMatchFail as fail:
+                    _raise_exhausted(fail)
+                    results[index] = (fail, match.score)
+                    matched = False
+
+                if attempts is not None:
+                    attempts.append((command, perf_counter() - start, matched, match.score))
+                if matched:
+                    matches.append((match, command))
+                    continue
+
+            fail, score = results[index]
+            if score > 0:
+                fails.append((fail, score))
+
+        return matches, fails
+
+    def _begin_match(self, command: Command, call: str, budgets: dict) -> CallMatch:
+        match = command.begin_match(call)
+        match.budget = self._budget(command, budgets)
+        return match
+
+    def _budget(self, command: Command, budgets: dict) -> Optional[MatchBudget]:
+        """Returns the budget for an attempt to match the given command, shared with the other
+        attempts of the same dispatch whose commands' matchers have the same limits."""
+
+        matcher = command.matcher
+        if matcher.max_steps is None and matcher.timeout is None and matcher.max_command_steps is None:
+            return None
+
+        key = (matcher.max_steps, matcher.timeout)
+        budget = budgets.get(key)
+        if budget is None:
+            budget = budgets[key] = MatchBudget(matcher.max_steps, matcher.timeout)
+
+        budget.begin_attempt(matcher.max_command_steps)
+        return budget
+
+    def _visible(self, mask: Optional[int]) -> list[Command]:
+        """Returns the commands visible with the given mask in registration order.
+        The commands are found by iterating the set bits of the mask, so the cost
+        depends on the number of visible commands rather than all registered commands."""
+
+        if mask is None:
+            return self._commands
+
+        visible = self._visible_cache.get(mask)
+        if visible is None:
+            bits, offset = [], 0
+            # The complement of a mask (a negative mask) covers all commands except those
+            # in the mask, including commands registered later
+            word_bits = mask if mask >= 0 else mask & ((1 << self._next_bit) - 1)
+            while word_bits:
+                # Skip 64 bits at a time where none is set
+                word = word_bits & 0xFFFF_FFFF_FFFF_FFFF
+                while word:
+                    low = word & -word
+                    bits.append(offset + low.bit_length() - 1)
+                    word ^= low
+                word_bits >>= 64
+                offset += 64
+
+            visible = [self._by_bit[bit] for bit in bits if bit in self._by_bit]
+            # Bits of replaced commands are not in registration order
+            visible.sort(key=self._seqs.__getitem__)
+            self._visible_cache.put(mask, visible)
+
+        return visible
+
+    def tag_mask(self, *tags: str) -> int:
+        """Returns the visibility mask of the registered commands having any of the given tags.
+        Masks can be combined with bitwise operators and passed to `dispatch()`. A mask only covers
+        the commands registered when it was created: commands registered later, including commands
+        replacing or reloading covered ones, are not covered. The complement of a mask (`~mask`)
+        covers all commands except those covered by the mask."""
+
+        mask = 0
+        for tag in tags:
+            mask |= self._tag_masks.get(tag, 0)
+        return mask
+
+    def command_mask(self, *commands: Command) -> int:
+        """Returns the visibility mask of the given registered commands (see `tag_mask()`).
+
+        Raises
+        ------
+          * `ValueError` if any of the commands is not registered.
+        """
+
+        mask = 0
+        for command in commands:
+            if command not in self._seqs:
+                raise ValueError(f"Command {command.syntax} is not registered")
+            mask |= 1 << self._bits[command]
+        return mask
+
+    def complete(self, partial_call: str, cursor: Optional[int] = None, *,
+                 mask: Optional[int] = None, previous=None):
+        """Returns the literals and parameter slots that can follow the text of the given partial call
+        before the cursor, walking the syntax trees of the visible commands. Refer to `cliffs.complete`.
+
+        Completing a call extended by more characters resumes from the previous completion
+        instead of matching the call from scratch.
+
+        Parameters
+        ----------
+          * partial_call: `str` - The partial call.
+          * cursor: `int` (optional) - The position of the cursor in the call. Defaults to the end of the call.
+          * mask: `int` (optional) - The visibility mask of the commands to complete (see `dispatch()`).
+          * previous: `Completion` (optional) - The completion to resume from. Defaults to the last
+            completion returned by this dispatcher.
+
+        Returns
+        -------
+          * `Completion`: The completion. Literals starting with the partially typed token are in
+            `literals` and the parameters, varargs and tails that can follow are in `slots`.
+        """
+
+        from .complete import Completer
+
+        if self._completer is None:
+            self._completer = Completer(instance_or_kwargs(self._command_kwargs.get('lexer', {}), CallLexer))
+
+        text = partial_call if cursor is None else partial_call[:cursor]
+        completion = self._completer.complete(text, self._visible(mask), self._generation, mask,
+                                              previous if previous is not None else self._last_completion)
+
+        self._last_completion = completion
+        return completion
+
+    def trace(self, call: str) -> MatchTracer:
+        """Matches the given call against all registered commands (without executing
+        any callback) while recording every node match in a tracer.
+
+        Parameters
+        ----------
+          * call: `str` - The call to trace.
+
+        Returns
+        -------
+          * `MatchTracer`: The tracer. Its `result` is the matched command
+            or the raised fail. Use `export()` to write the trace to a file.
+        """
+
+        tracer = MatchTracer()
         matches: list[tuple[CallMatch, Command]] = []
         fails: list[tuple[CallMatchFail, float]] = []
 
-        # Collect matches and fails from commands
         for command in self._commands:
             match = command.begin_match(call)
+            match.tracer = tracer
+            span = tracer.begin_command(command, match)
 
             try:
                 command.match(match)
+                tracer.end_command(span, match)
                 matches.append((match, command))
 
             except CallMatchFail as fail:
+                tracer.end_command(span, match, fail)
                 if match.score > 0:
                     fails.append((fail, match.score))
 
-        # Find the match with the highest score and execute it
-        if matches != []:
-            best_match, matched_command = best(matches, lambda m: m[0].score)
-            return matched_command.execute(best_match, callback_args), matched_command
+        try:
+            _, tracer.result = self._select(matches, fails)
+        except (CallMatchFail, UnknownCommandError) as fail:
+            tracer.result = fail
 
-        # If no command successfully matched, raise best scoring fail
-        elif fails != []:
-            best_fail, _ = best(fails, lambda f: f[1])
-            raise best_fail
+        return tracer
 
-        # ...or unknown command if there are no fails scoring above 0
-        else:
-            raise UnknownCommandError('Unknown command')
+    def _execute(self, command: Command, match: CallMatch, callback_args: dict) -> Any:
+        """Executes the given command with the given match, sharing the execution
+        with identical in-flight calls if coalescing is enabled."""
+
+        if self._single_flight is not None and command.idempotent:
+            try:
+                # Calls with different callback arguments (e.g. from different sessions) are not shared
+                key = (command, match.key(), frozenset(callback_args.items()))
+            except TypeError:
+                # Unhashable parameter values or callback arguments can't be coalesced
+                pass
+            else:
+                return self._single_flight.do(
+                    key, lambda: self._execute_cached(command, match, callback_args))
+
+        return self._execute_cached(command, match, callback_args)
+
+    def _execute_cached(self, command: Command, match: CallMatch, callback_args: dict) -> Any:
+        """Executes the given command with the given match, serving the result
+        from the command's result cache if it has one."""
+
+        if command.cache is None:
+            return self._call(command, match, callback_args)
+
+        try:
+            key = match.key()
+        except TypeError:
+            # Unhashable parameter values can't be cached
+            return self._call(command, match, callback_args)
+
+        result = command.cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = self._call(command, match, callback_args)
+            command.cache.put(key, result)
+
+        return result
+
+    def _call(self, command: Command, match: CallMatch, callback_args: dict) -> Any:
+        """Executes the given command with the given match, recording statistics if enabled."""
+
+        if self._stats is None:
+            return command.execute(match, callback_args)
+
+        start = perf_counter()
+        try:
+            return command.execute(match, callback_args)
+        finally:
+            self._stats.record_execution(command, perf_counter() - start)
+
+    def stats(self) -> Optional[dict[str, dict[str, Any]]]:
+        """Returns the collected per-command dispatch statistics keyed by command syntax,
+        or None if statistics are not enabled. Statistics of commands with the same syntax
+        are aggregated.
+
+        For every command, the statistics include the number of match attempts,
+        successful matches and executions, as well as latency histograms of successful
+        matches, failed matches and callback executions.
+        """
+
+        return self._stats.to_dict() if self._stats is not None else None
+
+    def export_stats(self, path: str, format: str = 'prometheus'):
+        """Writes the collected dispatch statistics to the given file.
+
+        Parameters
+        ----------
+          * path: `str` - The path of the file to write.
+          * format: `str` (optional) - Either 'prometheus' (text exposition format, default) or 'json'.
+
+        Raises
+        ------
+          * `CommandDispatchError` if statistics are not enabled.
+        """
+
+        if self._stats is None:
+            raise CommandDispatchError("Statistics are not enabled for this dispatcher")
+
+        self._stats.export(path, format)
+
+    def find_ambiguities(self, samples: int = 20, seed: int = 0) -> list:
+        """Analyzes the registered commands for overlapping commands, shadowed variants
+        and varargs or tails swallowing later nodes. Refer to `cliffs.ambiguity`.
+
+        Parameters
+        ----------
+          * samples: `int` (optional) - The number of random calls to generate
+            per command and per variant. Defaults to 20.
+          * seed: `int` (optional) - The seed for generating calls. Defaults to 0.
+
+        Returns
+        -------
+          * `list[Ambiguity]`: The problems found.
+        """
+
+        from .ambiguity import find_ambiguities
+        return find_ambiguities(self._commands, samples, seed)
+
+    def export_order(self, path: str):
+        """Writes the adaptive command ordering to the given JSON file.
+
+        Raises
+        ------
+          * `CommandDispatchError` if adaptive ordering is not enabled.
+        """
+
+        if self.order is None:
+            raise CommandDispatchError("Adaptive ordering is not enabled for this dispatcher")
+
+        self.order.export(path)
+
+    def import_order(self, path: str):
+        """Merges the adaptive command ordering from the given JSON file
+        written by `export_order()`, e.g. by another process.
+
+        Raises
+        ------
+          * `CommandDispatchError` if adaptive ordering is not enabled.
+        """
+
+        if self.order is None:
+            raise CommandDispatchError("Adaptive ordering is not enabled for this dispatcher")
+
+        self.order.load(path)
 
     def get_usage(self, separator: Optional[str] = None, **kwargs) -> Iterable[str]:
         """Returns the message composed of usage help messages of registered commands
@@ -159,15 +1425,21 @@ class CommandDispatcher:
           * `Iterable[str]`: The individual lines of the usage help message.
         """
 
+        from .mount import MountedGroup
+
         lines = []
 
         for i, command in enumerate(self._commands):
-            command_usage = list(command.get_usage(**kwargs))
+            if isinstance(command, MountedGroup):
+                blocks = command.usage_blocks(**kwargs)
+            else:
+                blocks = [list(command.get_usage(**kwargs))]
 
-            if command_usage != []:
-                if separator is not None and i > 0:
-                    lines.append(separator)
+            for j, command_usage in enumerate(blocks):
+                if command_usage != []:
+                    if separator is not None and (i > 0 or j > 0):
+                        lines.append(separator)
 
-                lines += command_usage
+                    lines += command_usage
 
         return lines
@@ -0,0 +1,190 @@
+"""Mounts nested dispatchers under a prefix syntax.
+
+A mounted group is a command matching its prefix followed by the rest of the call,
+which is dispatched to a nested dispatcher. The nested dispatcher is populated by
+a loader (e.g. a function in a module that is only imported when it is needed)
+on the first call matching the prefix, so the commands of rarely used groups are
+neither imported nor parsed at startup. Calls dispatched to a nested dispatcher
+run its hooks and are recorded by its slow log and recorder.
+"""
+
+from threading import Lock
+from typing import Any, Callable, Iterable, Optional, Union
+from .call_match import CallMatch, CallMatchFail
+from .command import Command, format_usage
+from .dispatcher import CommandDispatcher, CommandDispatchError, UnknownCommandError
+from .syntax_tree import Node, Sequence, Tail
+
+
+# Name of the tail parameter holding the call to the nested dispatcher
+TAIL = 'command'
+
+
+class UnknownMountedCommand(CallMatchFail):
+    """Raised when the nested dispatcher of a mounted group cannot determine a command"""
+
+
+class MountedGroup(Command):
+    """A command delegating calls starting with its prefix to a nested dispatcher
+    loaded on the first matching call."""
+
+    routable = True
+
+    def __init__(self, prefix: Node, loader: Union[str, Callable[[CommandDispatcher], Any]], **kwargs):
+        """Initializes a mounted group.
+
+        Parameters
+        ----------
+          * prefix: `Node` - The syntax tree of the prefix.
+          * loader: `str` or `(CommandDispatcher) -> *` - Registers the commands of the group
+            with the given nested dispatcher. Can be specified as `module:attribute` to be
+            imported on first use, in which case the attribute can also be the nested
+            `CommandDispatcher` itself.
+
+        Keyword arguments
+        -----------------
+          * dispatcher: `dict` - Keyword arguments for the nested `CommandDispatcher`.
+          * metadata: `Iterable[tuple[str, Optional[str]]]` - The syntaxes and descriptions
+            of the commands of the group (e.g. `metadata` of a previously loaded group),
+            used for usage help messages without loading the group.
+
+        Refer to `Command.__init__` for additional keyword arguments.
+        """
+
+        self.prefix = str(prefix)
+
+        syntax = Sequence()
+        for child in list(prefix.children) if type(prefix) is Sequence else [prefix]:
+            syntax.append_child(child)
+        syntax.append_child(Tail(TAIL))
+
+        super().__init__(syntax, self._dispatch, **kwargs)
+
+        self.loader = loader
+        self._dispatcher_kwargs = kwargs.get('dispatcher', {})
+        self._dispatcher: Optional[CommandDispatcher] = None
+        self._lock = Lock()
+        # Listeners to register with the nested dispatcher once loaded
+        self._change_listeners: list[Callable[[], None]] = []
+
+        metadata = kwargs.get('metadata', None)
+        self._metadata: Optional[list[tuple[str, Optional[str]]]] = \
+            list(metadata) if metadata is not None else None
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the nested dispatcher has been loaded"""
+        return self._dispatcher is not None
+
+    @property
+    def dispatcher(self) -> CommandDispatcher:
+        """The nested dispatcher, loaded on first access.
+
+        Raises
+        ------
+          * `CommandDispatchError` if the loader is neither callable nor a `CommandDispatcher`.
+        """
+
+        if self._dispatcher is None:
+            with self._lock:
+                if self._dispatcher is None:
+                    dispatcher = self._load()
+                    for listener in self._change_listeners:
+                        dispatcher.add_change_listener(listener)
+                    self._dispatcher = dispatcher
+                    self._metadata = None
+        return self._dispatcher
+
+    def add_change_listener(self, listener: Callable[[], None]):
+        """Registers a callback to be called whenever the commands of the nested dispatcher change
+        (see `CommandDispatcher.add_change_listener()`)."""
+
+        with self._lock:
+            self._change_listeners.append(listener)
+            if self._dispatcher is not None:
+                self._dispatcher.add_change_listener(listener)
+
+    def _load(self) -> CommandDispatcher:
+        loader = self.loader
+        if isinstance(loader, str):
+            from .serve import load_object
+            loader = load_object(loader)
+
+        if isinstance(loader, CommandDispatcher):
+            return loader
+        if not callable(loader):
+            raise CommandDispatchError(f"Cannot load {self.prefix} commands from {repr(self.loader)}")
+
+        dispatcher = CommandDispatcher(**self._dispatcher_kwargs)
+        loader(dispatcher)
+        return dispatcher
+
+    @property
+    def metadata(self) -> Optional[list[tuple[str, Optional[str]]]]:
+        """The syntaxes and descriptions of the visible commands of the group,
+        or None if the group is not loaded and no metadata was given. Never loads the group."""
+
+        if self._metadata is not None or self._dispatcher is None:
+            return self._metadata
+
+        return [(str(command.syntax), command.description)
+                for command in self._dispatcher._commands if not command.hidden]
+
+    def match(self, match: CallMatch, start: int = 0):
+        """Matches the prefix and resolves the rest of the call with the nested dispatcher,
+        loading it if needed. The score of the nested match is added to the score of the prefix
+        and the nested match and command are stored in `match.nested`.
+
+        Raises
+        ------
+          * `CallMatchFail` raised by the nested dispatcher or `UnknownMountedCommand`.
+        """
+
+        super().match(match, start)
+
+        try:
+            nested_match, nested_command = self.dispatcher.resolve(match[TAIL])
+        except UnknownCommandError as e:
+            fail = UnknownMountedCommand(f"Unknown {self.prefix} command")
+            fail.command = self
+            raise fail from e
+
+        match.score += nested_match.score
+        match.nested = (nested_match, nested_command)
+
+    def _dispatch(self, match: CallMatch, **callback_args) -> Any:
+        # Matches rebuilt from the call cache of the outer dispatcher are resolved again
+        resolved = match.nested or self.dispatcher.resolve(match[TAIL])
+        # Run the hooks of the nested dispatcher and record the nested dispatch
+        result, _ = self.dispatcher.dispatch_resolved(match[TAIL], resolved, **callback_args)
+        return result
+
+    def execute(self, match: CallMatch, callback_args={}) -> object:
+        return self._dispatch(match, **callback_args)
+
+    def get_usage(self, **kwargs) -> Iterable[str]:
+        """Returns the usage help messages of the commands of the group prefixed
+        with the prefix of the group (see `usage_blocks()`)."""
+
+        return [line for block in self.usage_blocks(**kwargs) for line in block]
+
+    def usage_blocks(self, **kwargs) -> list[list[str]]:
+        """Returns the usage help messages of the commands of the group as separate blocks
+        of lines. Uses the metadata the group was mounted with if it is not loaded yet.
+        Without metadata, only the prefix and the description of the group are returned
+        until it is loaded. Refer to `Command.get_usage` for keyword arguments."""
+
+        if self.hidden:
+            return []
+
+        metadata = self.metadata
+        if metadata is None:
+            return [list(format_usage(self.prefix, self.description, **kwargs))]
+
+        blocks = [list(format_usage(self.prefix, self.description, **kwargs))] \
+            if self.description is not None else []
+
+        for syntax, description in metadata:
+            blocks.append(list(format_usage(f'{self.prefix} {syntax}', description, **kwargs)))
+
+        return blocks
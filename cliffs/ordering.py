@@ -0,0 +1,145 @@
+import json
+import os
+from threading import Lock
+from typing import TypeVar
+from .command import Command
+from .complexity import max_score
+
+
+_T = TypeVar('_T')
+
+
+class AdaptiveOrder:
+    """Orders commands by decayed counts of the dispatches they won, so that hot
+    commands are tried first. Together with score bounds (see `bound()`), this lets
+    the dispatcher skip commands that cannot beat a match found earlier.
+
+    Counts are keyed by command syntax, so orderings can be exported from one
+    process and imported into another.
+    """
+
+    def __init__(self, decay: float = 0.5, interval: int = 1000):
+        """Initializes an empty ordering.
+
+        Parameters
+        ----------
+          * decay: `float` (optional) - The factor to multiply all counts by every `interval`
+            recorded dispatches. Defaults to 0.5.
+          * interval: `int` (optional) - The number of recorded dispatches after which counts
+            are decayed and commands are reordered. Defaults to 1000.
+        """
+
+        self.decay = decay
+        self.interval = interval
+
+        self._hits: dict[str, float] = {}
+        self._recorded = 0
+        self._lock = Lock()
+
+        # Ranks of syntaxes (0 for the hottest) and caches derived from them
+        self._ranks: dict[str, int] = {}
+        self._command_ranks: dict[Command, int] = {}
+        self._bounds: dict[Command, float] = {}
+        self._arranged: dict[int, list] = {}
+
+    def _key(self, command: Command) -> str:
+        return str(command.syntax)
+
+    def record(self, command: Command):
+        """Records a dispatch won by the given command."""
+
+        with self._lock:
+            key = self._key(command)
+            self._hits[key] = self._hits.get(key, 0.) + 1.
+            self._recorded += 1
+
+            if self._recorded % self.interval == 0:
+                for key in self._hits:
+                    self._hits[key] *= self.decay
+                self._rerank()
+
+    def _rerank(self):
+        hot = sorted(self._hits, key=lambda key: self._hits[key], reverse=True)
+        self._ranks = {key: rank for rank, key in enumerate(hot)}
+        self._command_ranks = {}
+        self._arranged = {}
+
+    def rank(self, command: Command) -> int:
+        """Returns the position of the given command in the ordering (lower is hotter)."""
+
+        rank = self._command_ranks.get(command)
+        if rank is None:
+            rank = self._command_ranks[command] = self._ranks.get(self._key(command), len(self._ranks))
+        return rank
+
+    def bound(self, command: Command) -> float:
+        """Returns an upper bound of the score of a successful match of the given command."""
+
+        bound = self._bounds.get(command)
+        if bound is None:
+            bound = max_score(command.syntax) if type(command).match is Command.match else float('inf')
+            self._bounds[command] = bound
+        return bound
+
+    def arrange(self, candidates: list[_T], command_of=lambda c: c[1], cache_key=None) -> list[_T]:
+        """Returns the given candidates sorted by rank, ties broken by their original order.
+
+        Parameters
+        ----------
+          * candidates: `list` - The candidates in registration order.
+          * command_of: `(candidate) -> Command` (optional) - Returns the command of a candidate.
+            Defaults to returning the second element.
+          * cache_key: `int` (optional) - If given, the arrangement is cached under this key
+            until the commands are reordered or `invalidate()` is called.
+        """
+
+        if cache_key is not None:
+            arranged = self._arranged.get(cache_key)
+            if arranged is not None:
+                return arranged
+
+        arranged = [c for _, c in sorted(enumerate(candidates), key=lambda ic: (self.rank(command_of(ic[1])), ic[0]))]
+
+        if cache_key is not None:
+            self._arranged[cache_key] = arranged
+        return arranged
+
+    def invalidate(self):
+        """Drops cached arrangements, e.g. after commands are registered."""
+
+        self._arranged = {}
+
+    def forget(self, command: Command):
+        """Drops the cached rank and bound of the given command, e.g. after it is unregistered."""
+
+        self._command_ranks.pop(command, None)
+        self._bounds.pop(command, None)
+        self._arranged = {}
+
+    def to_dict(self) -> dict[str, float]:
+        """Returns the decayed counts keyed by command syntax."""
+
+        with self._lock:
+            return dict(self._hits)
+
+    def update(self, hits: dict[str, float]):
+        """Adds the given counts keyed by command syntax and reorders the commands."""
+
+        with self._lock:
+            for key, count in hits.items():
+                self._hits[key] = self._hits.get(key, 0.) + float(count)
+            self._rerank()
+
+    def export(self, path: str):
+        """Writes the ordering to the given JSON file, replacing it atomically."""
+
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(temp_path, path)
+
+    def load(self, path: str):
+        """Merges the ordering from the given JSON file written by `export()`."""
+
+        with open(path, 'r') as f:
+            self.update(json.load(f))
@@ -0,0 +1,84 @@
+"""Records dispatched calls for replaying with `cliffs.replay`.
+
+Recordings are append-only files with one compact JSON array per line:
+`[timestamp, latency in microseconds, outcome, call]`, where the outcome is
+`'match <syntax>'` for calls matched by a command, `'hook'` for calls
+short-circuited by a `before_match` hook and `'fail <exception class>'` for
+calls that raised. When the outcome of matching the call differs from the outcome
+of the dispatch (e.g. the callback of the matched command raised), it is appended
+to the array, so that replays matching calls without executing them can compare it.
+"""
+
+import json
+from threading import Lock
+from typing import IO, Optional, Union
+
+
+def outcome(command, error: Optional[Exception] = None) -> str:
+    """Returns the outcome string of a dispatch that matched the given command
+    (None if short-circuited by a hook) or raised the given error."""
+
+    if error is not None:
+        return f'fail {error.__class__.__name__}'
+    if command is None:
+        return 'hook'
+    return f'match {command.syntax}'
+
+
+class CallRecorder:
+    """Appends dispatched calls to a recording file (see `CommandDispatcher`'s `recorder` option)."""
+
+    def __init__(self, file: Union[str, IO[str]]):
+        """Initializes a recorder.
+
+        Parameters
+        ----------
+          * file: `str` or `IO[str]` - The path of the file to append to or an open text file.
+        """
+
+        self._owned = isinstance(file, str)
+        self._file = open(file, 'a', encoding='utf-8') if self._owned else file
+        self._lock = Lock()
+
+        # Number of recorded calls
+        self.recorded = 0
+
+    def record(self, call: str, timestamp: float, latency: float, outcome: str, matched: Optional[str] = None):
+        """Appends a call to the recording.
+
+        Parameters
+        ----------
+          * call: `str` - The dispatched call.
+          * timestamp: `float` - The Unix time of the dispatch.
+          * latency: `float` - The duration of the dispatch in seconds.
+          * outcome: `str` - The outcome as returned by `outcome()`.
+          * matched: `str` (optional) - The outcome of matching the call alone. Defaults to the outcome.
+        """
+
+        record = [round(timestamp, 6), round(latency * 1e6), outcome, call]
+        if matched is not None and matched != outcome:
+            record.append(matched)
+
+        line = json.dumps(record, separators=(',', ':'), ensure_ascii=False)
+
+        with self._lock:
+            self._file.write(line + '\n')
+            self.recorded += 1
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        """Flushes the recording and closes the file if it was opened by the recorder."""
+
+        with self._lock:
+            self._file.flush()
+            if self._owned:
+                self._file.close()
+
+    def __enter__(self) -> 'CallRecorder':
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -0,0 +1,212 @@
+"""Replays recorded calls (see `cliffs.recording`) against a dispatcher and reports
+throughput, latency percentiles and outcome differences.
+
+Usage: python -m cliffs.replay <recording> <module:dispatcher> [--speed X] [--execute]
+"""
+
+import json
+import sys
+import time
+from time import perf_counter
+from typing import IO, Any, Iterable, Iterator, Optional, Union
+from .recording import outcome
+
+
+class RecordedCall:
+    """A single call read from a recording."""
+
+    def __init__(self, timestamp: float, latency: float, outcome: str, call: str, matched: Optional[str] = None):
+        # Unix time of the dispatch
+        self.timestamp = timestamp
+        # Duration of the dispatch in seconds
+        self.latency = latency
+        self.outcome = outcome
+        self.call = call
+        # The outcome of matching the call alone
+        self.matched = matched if matched is not None else outcome
+
+    def __repr__(self) -> str:
+        return f'<RecordedCall {repr(self.call)} {self.outcome}>'
+
+
+def read_recording(file: Union[str, IO[str]]) -> Iterator[RecordedCall]:
+    """Lazily reads calls from a recording.
+
+    Parameters
+    ----------
+      * file: `str` or `IO[str]` - The path of the recording or an open text file.
+
+    Raises
+    ------
+      * `ValueError` when a line is malformed.
+    """
+
+    if isinstance(file, str):
+        with open(file, 'r', encoding='utf-8') as f:
+            yield from read_recording(f)
+        return
+
+    for line_number, line in enumerate(file, 1):
+        if line.strip() == '':
+            continue
+
+        try:
+            timestamp, latency, result, call, *matched = json.loads(line)
+            if len(matched) > 1:
+                raise ValueError(f"too many values ({4 + len(matched)})")
+        except ValueError as e:
+            raise ValueError(f"Malformed recording line {line_number}: {e}") from e
+
+        yield RecordedCall(timestamp, latency / 1e6, result, call, *matched)
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Returns the p-th percentile (0-100) of the given sorted values using the nearest-rank method."""
+
+    if values == []:
+        return 0.
+    rank = max(1, -(-len(values) * p // 100))
+    return values[int(rank) - 1]
+
+
+class ReplayReport:
+    """The result of `replay()`."""
+
+    PERCENTILES = (50, 90, 99, 99.9)
+
+    def __init__(self):
+        # Number of replayed calls
+        self.count = 0
+        # Wall-clock duration of the replay in seconds
+        self.duration = 0.
+        # Latencies of replayed and recorded dispatches in seconds
+        self.latencies: list[float] = []
+        self.recorded_latencies: list[float] = []
+        # Calls whose outcome differs from the recording as tuples: (call, recorded outcome, replayed outcome)
+        self.differences: list[tuple[str, str, str]] = []
+
+    @property
+    def throughput(self) -> float:
+        """Replayed calls per second"""
+        return self.count / self.duration if self.duration > 0 else 0.
+
+    def percentiles(self, recorded: bool = False) -> dict[float, float]:
+        """Returns the latency percentiles in seconds of the replayed (or recorded) dispatches."""
+
+        values = sorted(self.recorded_latencies if recorded else self.latencies)
+        return {p: percentile(values, p) for p in self.PERCENTILES}
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'count': self.count,
+            'duration': self.duration,
+            'throughput': self.throughput,
+            'percentiles': {str(p): v for p, v in self.percentiles().items()},
+            'recorded_percentiles': {str(p): v for p, v in self.percentiles(recorded=True).items()},
+            'differences': [list(d) for d in self.differences],
+        }
+
+    def summary(self) -> str:
+        """Returns a human-readable summary of the replay."""
+
+        lines = [f'{self.count} calls in {self.duration:.3f} s ({self.throughput:.0f} calls/s)',
+                 f"{'':>8} {'replayed':>12} {'recorded':>12}"]
+
+        recorded = self.percentiles(recorded=True)
+        for p, value in self.percentiles().items():
+            lines.append(f'{"p" + format(p, "g"):>8} {value * 1e6:>9.1f} us {recorded[p] * 1e6:>9.1f} us')
+
+        lines.append(f'{len(self.differences)} outcome differences')
+        for call, before, after in self.differences[:20]:
+            lines.append(f'  {repr(call)}: {before} -> {after}')
+        if len(self.differences) > 20:
+            lines.append(f'  ... and {len(self.differences) - 20} more')
+
+        return '\n'.join(lines)
+
+
+def replay(dispatcher, recording: Union[str, IO[str], Iterable[RecordedCall]], *,
+           speed: Optional[float] = None, execute: bool = False, **callback_args) -> ReplayReport:
+    """Replays recorded calls against the given dispatcher.
+
+    Parameters
+    ----------
+      * dispatcher: `CommandDispatcher` - The dispatcher to replay the calls against.
+      * recording: `str`, `IO[str]` or `Iterable[RecordedCall]` - The recording.
+      * speed: `float` (optional) - Replays the calls with their original timing sped up
+        by the given factor (1 for the original speed). By default, calls are replayed
+        as fast as possible.
+      * execute: `bool` (optional) - Whether to execute the callbacks of matched commands.
+        By default, calls are only matched, so callbacks with side effects are not run
+        (recorded latencies include callback execution, so they are only directly
+        comparable when executing). Calls are then compared with the recorded outcome
+        of matching them, and calls short-circuited by `before_match` hooks are not compared.
+
+    All other keyword arguments are passed to callbacks.
+
+    Returns
+    -------
+      * `ReplayReport`: The report.
+    """
+
+    if isinstance(recording, str) or hasattr(recording, 'read'):
+        recording = read_recording(recording)
+
+    report = ReplayReport()
+    origin = None
+    start = perf_counter()
+
+    for record in recording:
+        if speed is not None:
+            if origin is None:
+                origin = record.timestamp
+            delay = (record.timestamp - origin) / speed - (perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+
+        command, error = None, None
+        call_start = perf_counter()
+
+        try:
+            if execute:
+                _, command = dispatcher.dispatch(record.call, **callback_args)
+            else:
+                _, command = dispatcher.resolve(record.call)
+        except Exception as e:
+            error = e
+
+        report.latencies.append(perf_counter() - call_start)
+        report.recorded_latencies.append(record.latency)
+        report.count += 1
+
+        expected = record.outcome if execute else record.matched
+        replayed = outcome(command, error)
+        if replayed != expected and (execute or expected != 'hook'):
+            report.differences.append((record.call, expected, replayed))
+
+    report.duration = perf_counter() - start
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    import argparse
+    from .serve import load_object
+
+    parser = argparse.ArgumentParser(prog='python -m cliffs.replay',
+                                     description='Replay recorded calls against a dispatcher')
+    parser.add_argument('recording', help='the recording file')
+    parser.add_argument('dispatcher', help='the dispatcher to replay against as module:attribute')
+    parser.add_argument('--speed', type=float, default=None,
+                        help='replay with original timing sped up by this factor (default: as fast as possible)')
+    parser.add_argument('--execute', action='store_true', help='execute the callbacks of matched commands')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args(argv)
+
+    report = replay(load_object(args.dispatcher), args.recording, speed=args.speed, execute=args.execute)
+    print(json.dumps(report.to_dict(), indent=2) if args.json else report.summary())
+
+    return 1 if report.differences != [] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+from typing import Iterable, Optional
+from .call_lexer import CallLexer
+from .call_match import CallMatch
+from .command import Command
+from .syntax_tree import Literal, Parameter, Sequence
+from .token import Token
+
+
+class Route:
+    """The leading nodes of a command's syntax that can be matched by the router
+    instead of the command itself: case-sensitive, non-tolerant literals and
+    untyped parameters that are direct children of the root sequence."""
+
+    def __init__(self, index: int, command: Command, prefix: bool = True):
+        """Initializes a route of the given command.
+
+        Parameters
+        ----------
+          * index: `int` - The registration sequence number of the command.
+          * command: `Command` - The command.
+          * prefix: `bool` (optional) - Whether the leading nodes are matched by the router.
+            If False, the route has no edges and the command matches the whole call. Defaults to True.
+        """
+
+        # Registration sequence number of the command
+        self.index = index
+        self.command = command
+
+        # The edges of the route in the trie: literal values or None for parameters
+        self.edges: list[Optional[str]] = []
+        # The score the edges add to a match and parameters as tuples: (token position, name)
+        self.score = 0.
+        self.params: list[tuple[int, str]] = []
+
+        # The quote characters of the command's lexer or None if its tokens
+        # cannot be shared with other commands
+        self.quotes: Optional[str] = None
+
+        if (type(command).match is not Command.match and not command.routable) \
+                or type(command).begin_match is not Command.begin_match \
+                or type(command.lexer) is not CallLexer or type(command.syntax) is not Sequence:
+            return
+
+        self.quotes = command.lexer.quotes
+
+        if not prefix:
+            return
+
+        for child in command.syntax.children:
+            if type(child) is Literal and child.case_sensitive and not child.tolerant:
+                self.edges.append(child.value)
+                self.score += 1
+            elif type(child) is Parameter and child.typename is None:
+                self.params.append((len(self.edges), child.name))
+                self.edges.append(None)
+                self.score += 0.5
+            else:
+                break
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+    def begin_match(self, call: str, tokens: Optional[list[Token]]) -> CallMatch:
+        """Begins a match of the command with the leading nodes already matched
+        against the given tokens. Continue it with `Command.match(match, len(route))`."""
+
+        if tokens is None:
+            return self.command.begin_match(call)
+
+        match = self.command.begin_match(call, tokens[len(self.edges):])
+        match.score = self.score
+        for position, name in self.params:
+            match[name] = tokens[position].value
+
+        return match
+
+
+class _TrieNode:
+    __slots__ = ('literals', 'param', 'routes')
+
+    def __init__(self):
+        self.literals: dict[str, _TrieNode] = {}
+        self.param: Optional[_TrieNode] = None
+        # Routes ending at this node
+        self.routes: list[Route] = []
+
+
+class PrefixRouter:
+    """Merges the leading literals and parameters of command syntaxes into a prefix trie
+    (one per lexer configuration), so that a call can be routed to the commands that
+    can possibly match it in a single pass over its leading tokens.
+    """
+
+    def __init__(self, commands: Iterable[tuple[int, Command]]):
+        """Builds a router for the given commands.
+
+        Parameters
+        ----------
+          * commands: `Iterable[tuple[int, Command]]` - The commands with their registration
+            sequence numbers, which determine the order of routed commands.
+        """
+
+        self._tries: dict[str, _TrieNode] = {}
+        self._lexers: dict[str, CallLexer] = {}
+        # Routes of commands whose calls must be tokenized by the commands themselves
+        self._unrouted: list[Route] = []
+        # Routes of commands and the lists they are stored in, for removal
+        self._routes: dict[Command, tuple[Route, list[Route]]] = {}
+
+        for index, command in commands:
+            self.add(index, command)
+
+    def add(self, index: int, command: Command):
+        """Adds a command to the trie in time proportional to the length of its prefix."""
+
+        route = Route(index, command)
+
+        if route.quotes is None:
+            self._unrouted.append(route)
+            self._routes[command] = (route, self._unrouted)
+            return
+
+        if route.quotes not in self._tries:
+            self._tries[route.quotes] = _TrieNode()
+            self._lexers[route.quotes] = CallLexer(route.quotes)
+
+        node = self._tries[route.quotes]
+        for edge in route.edges:
+            if edge is None:
+                node.param = node.param or _TrieNode()
+                node = node.param
+            else:
+                node = node.literals.setdefault(edge, _TrieNode())
+
+        node.routes.append(route)
+        self._routes[command] = (route, node.routes)
+
+    def remove(self, command: Command):
+        """Removes a command from the trie in time proportional to the number
+        of commands sharing its prefix."""
+
+        route, routes = self._routes.pop(command)
+        routes.remove(route)
+
+    def route(self, call: str) -> list[tuple[Route, Optional[list[Token]]]]:
+        """Returns the routes of commands that can possibly match the given call,
+        in registration order, with the tokens of the call to begin their matches with.
+        Commands not returned are guaranteed to fail matching the call.
+        """
+
+        candidates: list[tuple[Route, Optional[list[Token]]]] = [(route, None) for route in self._unrouted]
+
+        for quotes, root in self._tries.items():
+            tokens = list(self._lexers[quotes].tokenize(call))
+            candidates += ((route, tokens) for route in root.routes)
+
+            nodes = [root]
+            for token in tokens:
+                next_nodes = []
+                for node in nodes:
+                    child = node.literals.get(token.value)
+                    if child is not None:
+                        next_nodes.append(child)
+                    if node.param is not None:
+                        next_nodes.append(node.param)
+
+                if next_nodes == []:
+                    break
+
+                for node in next_nodes:
+                    candidates += ((route, tokens) for route in node.routes)
+                nodes = next_nodes
+
+        candidates.sort(key=lambda c: c[0].index)
+        return candidates
@@ -0,0 +1,94 @@
+from typing import IO, Iterator
+
+
+def iter_script_lines(fileobj: IO, comment: str = '#', encoding: str = 'utf-8') -> Iterator[tuple[int, str]]:
+    """Lazily reads command calls from a newline-delimited script. Lines are read
+    one at a time through the file's own buffer, so memory use is bounded by
+    the longest logical line.
+
+    Empty lines and lines starting with the comment prefix (after leading whitespace)
+    are skipped. A line ending with an unescaped backslash is continued on the next line.
+
+    Parameters
+    ----------
+      * fileobj: `IO` - The text or binary file to read.
+      * comment: `str` (optional) - The comment prefix. Defaults to `#`.
+      * encoding: `str` (optional) - The encoding used to decode binary files. Defaults to UTF-8.
+
+    Returns
+    -------
+      * `Iterator[tuple[int, str]]`: The calls with the numbers of the lines they start on (1-based).
+    """
+
+    parts: list[str] = []
+    start = 0
+
+    for number, line in enumerate(fileobj, 1):
+        if isinstance(line, bytes):
+            line = line.decode(encoding)
+
+        line = line.rstrip('\r\n')
+
+        if parts == []:
+            start = number
+
+            stripped = line.lstrip()
+            if stripped == '' or comment and stripped.startswith(comment):
+                continue
+
+        # An odd number of trailing backslashes means the newline is escaped
+        if _trailing_backslashes(line) % 2 == 1:
+            parts.append(line[:-1])
+            continue
+
+        parts.append(line)
+        call = ''.join(parts)
+        parts = []
+
+        if call.strip() != '':
+            yield start, call
+
+    # Continuation on the last line
+    if parts != []:
+        call = ''.join(parts)
+        if call.strip() != '':
+            yield start, call
+
+
+def _trailing_backslashes(line: str) -> int:
+    count = 0
+    for c in reversed(line):
+        if c != '\\':
+            break
+        count += 1
+    return count
+
+
+class ScriptSummary:
+    """Summarizes the execution of a script."""
+
+    def __init__(self, max_errors: int = 100):
+        # Number of dispatched calls
+        self.dispatched = 0
+        # Number of calls that succeeded
+        self.succeeded = 0
+        # Number of calls that failed
+        self.failed = 0
+        # The first failures, up to `max_errors`
+        self.errors: list[Exception] = []
+        self.max_errors = max_errors
+
+    def __repr__(self) -> str:
+        return f'<ScriptSummary dispatched={self.dispatched}, succeeded={self.succeeded}, failed={self.failed}>'
+
+    def __str__(self) -> str:
+        lines = [f'{self.dispatched} calls dispatched, {self.succeeded} succeeded, {self.failed} failed']
+        lines += [str(error) for error in self.errors]
+        if self.failed > len(self.errors):
+            lines.append(f'... and {self.failed - len(self.errors)} more')
+        return '\n'.join(lines)
+
+    def add_error(self, error: Exception):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(error)
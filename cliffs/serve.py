@@ -0,0 +1,226 @@
+"""Serves a command dispatcher over a Unix socket.
+
+Each request is a single line containing a command call. Each response is a single
+line containing a JSON object: `{"ok": true, "result": ...}` for successful calls or
+`{"ok": false, "error": "<exception class>", "message": "..."}` for failed ones.
+Requests may be pipelined; responses are sent in request order. Requests that are not
+valid UTF-8 are answered with an error. Requests longer than the configured limit
+are answered with an error and the connection is closed.
+
+Usage: python -m cliffs.serve <module>:<dispatcher> <socket path> [--workers N]
+"""
+
+import asyncio
+import importlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from .dispatcher import CommandDispatcher
+
+
+class CommandServer:
+    """An asyncio server dispatching calls received over a Unix socket.
+    Callbacks are executed in a bounded pool of worker threads."""
+
+    def __init__(self, dispatcher: CommandDispatcher, path: str, **kwargs):
+        """Initializes a server.
+
+        Parameters
+        ----------
+          * dispatcher: `CommandDispatcher` - The dispatcher to dispatch received calls to.
+          * path: `str` - The path of the Unix socket to listen on.
+
+        Keyword arguments
+        -----------------
+          * max_workers: `int` - The maximum number of calls executed concurrently. Defaults to 8.
+          * max_pipeline: `int` - The maximum number of pending requests per connection
+            before reading from it is paused. Defaults to 64.
+          * max_request: `int` - The maximum length of a request line in bytes. Defaults to 65536.
+          * session_factory: `() -> dict` - Called for every new connection, the returned
+            dictionary is passed as callback arguments for all calls on that connection
+            (together with the dictionary itself as the `session` argument).
+        """
+
+        self.dispatcher = dispatcher
+        self.path = path
+
+        self.max_workers: int = kwargs.get('max_workers', 8)
+        self.max_pipeline: int = kwargs.get('max_pipeline', 64)
+        self.max_request: int = kwargs.get('max_request', 65536)
+        self.session_factory: Callable[[], dict] = kwargs.get('session_factory', dict)
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        """Starts listening on the socket."""
+
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='cliffs-serve')
+        self._server = await asyncio.start_unix_server(self._handle_connection, self.path, limit=self.max_request)
+
+    async def serve_forever(self):
+        """Starts listening on the socket (if not yet started) and serves until cancelled."""
+
+        if self._server is None:
+            await self.start()
+
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Stops listening and removes the socket file."""
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        session = self.session_factory()
+        callback_args = session | {'session': session}
+
+        # Pending responses in request order
+        pending: asyncio.Queue = asyncio.Queue(self.max_pipeline)
+        responder = asyncio.ensure_future(self._respond(pending, writer))
+
+        try:
+            while True:
+                try:
+                    line = await _unless_done(reader.readline(), responder)
+                except ValueError:
+                    # The rest of the request cannot be told apart from the next request
+                    error = ValueError(f"Request longer than {self.max_request} bytes")
+                    await _unless_done(pending.put(_completed(_error(error))), responder)
+                    break
+
+                if line is _DONE or line == b'':
+                    break
+
+                try:
+                    call = line.decode('utf-8').rstrip('\r\n')
+                except UnicodeDecodeError as e:
+                    response = _completed(_error(e))
+                else:
+                    response = asyncio.ensure_future(self._dispatch(call, callback_args))
+
+                if await _unless_done(pending.put(response), responder) is _DONE:
+                    response.cancel()
+                    break
+
+        except ConnectionError:
+            pass
+
+        finally:
+            # Let the responder send the remaining responses unless the client disconnected
+            if await _unless_done(pending.put(None), responder) is not _DONE:
+                await responder
+            _cancel_pending(pending)
+
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _respond(self, pending: asyncio.Queue, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                response = await pending.get()
+                if response is None:
+                    break
+
+                writer.write(json.dumps(await response, default=repr).encode('utf-8') + b'\n')
+                await writer.drain()
+
+        except ConnectionError:
+            # The client disconnected, the remaining responses are discarded
+            _cancel_pending(pending)
+
+    async def _dispatch(self, call: str, callback_args: dict) -> dict[str, Any]:
+        loop = asyncio.get_running_loop()
+
+        try:
+            result, _ = await loop.run_in_executor(
+                self._executor, lambda: self.dispatcher.dispatch(call, **callback_args))
+            return {'ok': True, 'result': result}
+
+        except Exception as e:
+            return _error(e)
+
+
+def _error(error: Exception) -> dict[str, Any]:
+    return {'ok': False, 'error': error.__class__.__name__, 'message': str(error)}
+
+
+def _completed(response: dict[str, Any]) -> asyncio.Future:
+    future = asyncio.get_running_loop().create_future()
+    future.set_result(response)
+    return future
+
+
+# Returned by `_unless_done()` when the responder of a connection finished first
+_DONE = object()
+
+
+async def _unless_done(awaitable, responder: asyncio.Future) -> Any:
+    """Awaits the given awaitable unless the given responder finishes first,
+    in which case the awaitable is cancelled and `_DONE` is returned."""
+
+    task = asyncio.ensure_future(awaitable)
+    await asyncio.wait([task, responder], return_when=asyncio.FIRST_COMPLETED)
+
+    if task.done():
+        return task.result()
+
+    task.cancel()
+    return _DONE
+
+
+def _cancel_pending(pending: asyncio.Queue):
+    while not pending.empty():
+        response = pending.get_nowait()
+        if response is not None:
+            response.cancel()
+
+
+def load_object(spec: str) -> Any:
+    """Imports an object specified as `module:attribute`."""
+
+    module_name, _, attribute = spec.partition(':')
+    obj = importlib.import_module(module_name)
+    for name in attribute.split('.') if attribute else []:
+        obj = getattr(obj, name)
+    return obj
+
+
+def main(argv: Optional[list[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m cliffs.serve', description='Serve a command dispatcher over a Unix socket')
+    parser.add_argument('dispatcher', help='the dispatcher to serve, as module:attribute')
+    parser.add_argument('path', help='the path of the Unix socket')
+    parser.add_argument('--workers', type=int, default=8, help='the maximum number of concurrently executed calls')
+    args = parser.parse_args(argv)
+
+    dispatcher = load_object(args.dispatcher)
+    if not isinstance(dispatcher, CommandDispatcher):
+        parser.error(f"{args.dispatcher} is not a CommandDispatcher")
+
+    try:
+        dispatcher.serve(args.path, max_workers=args.workers)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
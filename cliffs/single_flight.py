@@ -0,0 +1,70 @@
+from threading import Event, Lock
+from typing import Any, Callable, Hashable, Optional
+
+
+class _Flight:
+    """An execution in progress, awaited by coalesced callers."""
+
+    def __init__(self):
+        self.done = Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesces concurrent executions with identical keys, so that only one
+    of them runs while the others wait for and share its outcome."""
+
+    def __init__(self):
+        # Executions in progress by key
+        self._flights: dict[Hashable, _Flight] = {}
+        self._lock = Lock()
+
+        # Number of calls that shared another call's execution
+        self.coalesced = 0
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        """Runs the given function unless an execution with the same key is
+        already in progress, in which case waits for it to finish instead.
+
+        Parameters
+        ----------
+          * key: `Hashable` - The key identifying the execution.
+          * function: `() -> *` - The function to run.
+
+        Returns
+        -------
+          * Whatever the function returns (in either this or the coalesced call).
+
+        Raises
+        ------
+          * Whatever the function raises (in either this or the coalesced call).
+        """
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = function()
+            return flight.result
+
+        except BaseException as e:
+            flight.error = e
+            raise
+
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
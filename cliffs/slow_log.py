@@ -0,0 +1,99 @@
+import logging
+import random
+from collections import deque
+from threading import Lock
+from typing import Any, Optional
+
+
+class SlowDispatch:
+    """Explains a single dispatch that took longer than the configured threshold."""
+
+    def __init__(self, call: str, duration: float, attempts: list[tuple[Any, float, bool, float]]):
+        # The dispatched call
+        self.call = call
+        # Total time of the dispatch in seconds
+        self.duration = duration
+        # Commands tried as tuples: (syntax, time in seconds, whether matched, score),
+        # measured by matching the call again once the dispatch turned out to be slow
+        # (empty if the match was served from the call cache or short-circuited by a hook)
+        self.attempts = [(str(command.syntax), elapsed, matched, score)
+                         for command, elapsed, matched, score in attempts]
+        # Whether the match was served from the call cache
+        self.cached = False
+        # Whether a before_match hook short-circuited the dispatch
+        self.short_circuited = False
+        # Syntax of the winning command and its parameters
+        self.command: Optional[str] = None
+        self.params: Optional[dict[str, Any]] = None
+        # The raised exception if the dispatch failed
+        self.error: Optional[Exception] = None
+
+    def __repr__(self) -> str:
+        return f'<SlowDispatch {repr(self.call)} {self.duration * 1e3:.3f} ms>'
+
+    def explain(self) -> str:
+        """Returns a multi-line description of the dispatch."""
+
+        lines = [f'Slow dispatch of {repr(self.call)}: {self.duration * 1e3:.3f} ms']
+
+        if self.command is not None:
+            lines.append(f'  matched: {self.command} {self.params}')
+        if self.error is not None:
+            lines.append(f'  failed: {self.error.__class__.__name__}: {self.error}')
+        if self.short_circuited:
+            lines.append('  (short-circuited by a before_match hook)')
+        elif self.cached:
+            lines.append('  (match served from cache)')
+
+        for syntax, elapsed, matched, score in sorted(self.attempts, key=lambda a: a[1], reverse=True):
+            status = 'match' if matched else 'fail'
+            lines.append(f'  {elapsed * 1e3:9.3f} ms  {status:<5} score={score:<6g} {syntax}')
+
+        return '\n'.join(lines)
+
+
+class SlowDispatchLog:
+    """Keeps the most recent slow dispatches in a ring buffer and optionally
+    logs a sample of them."""
+
+    def __init__(self, threshold: float, size: int = 100, sample_rate: float = 1.0,
+                 logger: Optional[logging.Logger] = None):
+        """Initializes a slow dispatch log.
+
+        Parameters
+        ----------
+          * threshold: `float` - The dispatch duration in milliseconds above which
+            dispatches are recorded.
+          * size: `int` (optional) - The number of slow dispatches to keep. Defaults to 100.
+          * sample_rate: `float` (optional) - The fraction of slow dispatches to also log
+            as warnings (0 to disable logging). Defaults to 1.
+          * logger: `logging.Logger` (optional) - The logger to use. Defaults to `cliffs.dispatcher`.
+        """
+
+        self.threshold = threshold / 1e3
+        self.sample_rate = sample_rate
+        self.logger = logger or logging.getLogger('cliffs.dispatcher')
+
+        self._entries: deque[SlowDispatch] = deque(maxlen=size)
+        self._lock = Lock()
+        self._random = random.Random()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(self, entry: SlowDispatch):
+        with self._lock:
+            self._entries.append(entry)
+
+        if self.sample_rate > 0 and self._random.random() < self.sample_rate:
+            self.logger.warning('%s', entry.explain())
+
+    def entries(self) -> list[SlowDispatch]:
+        """Returns the recorded slow dispatches, oldest first."""
+
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,201 @@
+import json
+import os
+from bisect import bisect_left
+from threading import Lock
+from typing import Any, Iterable
+
+
+# Upper bounds (in seconds) of latency histogram buckets
+LATENCY_BUCKETS = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1., 2.5, 5., 10.)
+
+
+class Histogram:
+    """A latency histogram with fixed buckets."""
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        # The last bucket counts values above all bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other: 'Histogram'):
+        """Adds the observations of another histogram with the same bounds."""
+
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'buckets': dict(zip([str(b) for b in self.bounds] + ['+Inf'], self.counts)),
+        }
+
+
+class CommandStats:
+    """Dispatch statistics of a single command."""
+
+    def __init__(self):
+        # Number of times the command was matched against a call
+        self.attempts = 0
+        # Number of times the command matched a call
+        self.matches = 0
+        # Number of times the command was selected and executed
+        self.executions = 0
+
+        # Time spent on successful and failed matches and on executing the callback
+        self.match_time = Histogram()
+        self.fail_time = Histogram()
+        self.execute_time = Histogram()
+
+    def merge(self, other: 'CommandStats'):
+        """Adds the statistics of another command."""
+
+        self.attempts += other.attempts
+        self.matches += other.matches
+        self.executions += other.executions
+        self.match_time.merge(other.match_time)
+        self.fail_time.merge(other.fail_time)
+        self.execute_time.merge(other.execute_time)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'attempts': self.attempts,
+            'matches': self.matches,
+            'executions': self.executions,
+            'match_time': self.match_time.to_dict(),
+            'fail_time': self.fail_time.to_dict(),
+            'execute_time': self.execute_time.to_dict(),
+        }
+
+
+class DispatchStats:
+    """Collects dispatch statistics of commands."""
+
+    def __init__(self):
+        self._commands: dict[Any, CommandStats] = {}
+        self._lock = Lock()
+
+    def __getitem__(self, command) -> CommandStats:
+        try:
+            return self._commands[command]
+        except KeyError:
+            return self._commands.setdefault(command, CommandStats())
+
+    def record_attempts(self, attempts: Iterable[tuple[Any, float, bool, float]]):
+        """Records match attempts given as tuples: (command, time in seconds, whether matched, score)"""
+
+        with self._lock:
+            for command, elapsed, matched, _ in attempts:
+                stats = self[command]
+                stats.attempts += 1
+                if matched:
+                    stats.matches += 1
+                    stats.match_time.observe(elapsed)
+                else:
+                    stats.fail_time.observe(elapsed)
+
+    def record_execution(self, command, elapsed: float):
+        """Records an execution of the given command taking the given time in seconds"""
+
+        with self._lock:
+            stats = self[command]
+            stats.executions += 1
+            stats.execute_time.observe(elapsed)
+
+    def forget(self, command):
+        """Drops the statistics of the given command"""
+
+        with self._lock:
+            self._commands.pop(command, None)
+
+    def by_syntax(self) -> dict[str, CommandStats]:
+        """Returns the statistics of commands aggregated by command syntax,
+        so commands with the same syntax (e.g. overloads) are reported together."""
+
+        aggregated: dict[str, CommandStats] = {}
+
+        with self._lock:
+            for command, stats in self._commands.items():
+                syntax = str(command.syntax)
+                if syntax not in aggregated:
+                    aggregated[syntax] = CommandStats()
+                aggregated[syntax].merge(stats)
+
+        return aggregated
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        """Returns the statistics keyed by command syntax (see `by_syntax()`)."""
+
+        return {syntax: stats.to_dict() for syntax, stats in self.by_syntax().items()}
+
+    def to_prometheus(self, prefix: str = 'cliffs_command') -> str:
+        """Returns the statistics in the Prometheus text exposition format,
+        with a series per command syntax (see `by_syntax()`)."""
+
+        lines = []
+        commands = [(_escape_label(syntax), stats) for syntax, stats in self.by_syntax().items()]
+
+        for name, attr, description in [
+                ('attempts_total', 'attempts', 'Number of attempts to match a call'),
+                ('matches_total', 'matches', 'Number of matched calls'),
+                ('executions_total', 'executions', 'Number of executed calls')]:
+
+            lines.append(f'# HELP {prefix}_{name} {description}')
+            lines.append(f'# TYPE {prefix}_{name} counter')
+            for label, stats in commands:
+                lines.append(f'{prefix}_{name}{{command="{label}"}} {getattr(stats, attr)}')
+
+        for name, attr, description in [
+                ('match_seconds', 'match_time', 'Time spent on successful matches'),
+                ('fail_seconds', 'fail_time', 'Time spent on failed matches'),
+                ('execute_seconds', 'execute_time', 'Time spent executing callbacks')]:
+
+            lines.append(f'# HELP {prefix}_{name} {description}')
+            lines.append(f'# TYPE {prefix}_{name} histogram')
+            for label, stats in commands:
+                histogram: Histogram = getattr(stats, attr)
+
+                cumulative = 0
+                for bound, count in zip(list(histogram.bounds) + ['+Inf'], histogram.counts):
+                    cumulative += count
+                    lines.append(f'{prefix}_{name}_bucket{{command="{label}",le="{bound}"}} {cumulative}')
+
+                lines.append(f'{prefix}_{name}_sum{{command="{label}"}} {histogram.sum}')
+                lines.append(f'{prefix}_{name}_count{{command="{label}"}} {histogram.count}')
+
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path: str, format: str = 'prometheus'):
+        """Writes the statistics to the given file, replacing it atomically.
+
+        Parameters
+        ----------
+          * path: `str` - The path of the file to write.
+          * format: `str` (optional) - Either 'prometheus' (default) or 'json'.
+        """
+
+        if format == 'prometheus':
+            content = self.to_prometheus()
+        elif format == 'json':
+            content = json.dumps(self.to_dict(), indent=2)
+        else:
+            raise ValueError(f"Unknown stats format: {format}")
+
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
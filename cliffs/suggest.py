@@ -0,0 +1,240 @@
+"""Suggests commands for calls no command can be determined for ("did you mean").
+
+Commands are indexed by their signatures: the literals their syntaxes start with.
+Signatures are stored in a trie of lowercased literals, where the literals following each
+node are stored in a BK-tree over their edit distance. The distance of a signature is the sum
+of the distances of its literals from the leading tokens of a call, so the commands closest
+to a call are found by descending only into the literals within the distance not spent yet
+and, within each BK-tree, only into the subtrees that can be close enough, without comparing
+the call against every command.
+"""
+
+from time import perf_counter
+from typing import Callable, Optional
+from .call_lexer import CallLexer
+from .command import Command
+from .syntax_tree import Literal, Sequence
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Returns the Levenshtein distance between the given strings."""
+
+    return _distance(_pattern(a), len(a), b)
+
+
+def _pattern(a: str) -> dict[str, int]:
+    """Returns the bitmasks of the positions of the characters of the given string"""
+
+    pattern = {}
+    for i, c in enumerate(a):
+        pattern[c] = pattern.get(c, 0) | (1 << i)
+    return pattern
+
+
+def _distance(pattern: dict[str, int], length: int, b: str) -> int:
+    """Returns the Levenshtein distance between the string of the given pattern and length
+    and the given string, computing a column of the distance matrix per character of `b`
+    with bitwise operations (Myers' algorithm)"""
+
+    if length == 0:
+        return len(b)
+
+    mask = (1 << length) - 1
+    last = 1 << (length - 1)
+    # Vertical positive and negative deltas of the current column
+    pv, mv, distance = mask, 0, length
+
+    for c in b:
+        eq = pattern.get(c, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+
+        if ph & last:
+            distance += 1
+        elif mh & last:
+            distance -= 1
+
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+
+    return distance
+
+
+def signature(command: Command) -> tuple[str, ...]:
+    """Returns the values of the literals the syntax of the given command starts with."""
+
+    syntax = command.syntax
+    nodes = syntax.children if type(syntax) is Sequence else [syntax]
+
+    literals = []
+    for node in nodes:
+        if type(node) is not Literal:
+            break
+        literals.append(node.value)
+
+    return tuple(literals)
+
+
+class _BKNode:
+    """A node of a BK-tree over the literals following a trie node"""
+
+    __slots__ = ('word', 'next', 'children')
+
+    def __init__(self, word: str, next: '_TrieNode'):
+        self.word = word
+        # The trie node reached with this word
+        self.next = next
+        self.children: dict[int, _BKNode] = {}
+
+
+class _TrieNode:
+    __slots__ = ('words', 'commands', 'length')
+
+    def __init__(self, length: int):
+        self.words: Optional[_BKNode] = None
+        # Commands whose signatures end at this node, empty if all of them were removed
+        self.commands: list[Command] = []
+        # The total length of the literals on the path to this node
+        self.length = length
+
+    def child(self, word: str) -> '_TrieNode':
+        """Returns the child reached with the given word, adding it if needed"""
+
+        if self.words is None:
+            self.words = _BKNode(word, _TrieNode(self.length + len(word)))
+            return self.words.next
+
+        node = self.words
+        while node.word != word:
+            distance = edit_distance(word, node.word)
+            child = node.children.get(distance)
+            if child is None:
+                child = node.children[distance] = _BKNode(word, _TrieNode(self.length + len(word)))
+            node = child
+
+        return node.next
+
+
+class SuggestionIndex:
+    """Finds the registered commands closest to unknown calls."""
+
+    def __init__(self, max_distance: int = 2, timeout: float = 0.005, count: int = 3):
+        """Initializes an empty index.
+
+        Parameters
+        ----------
+          * max_distance: `int` (optional) - The maximum edit distance between the leading tokens
+            of a call and the signature of a suggested command. Defaults to 2.
+          * timeout: `float` (optional) - The number of seconds after which a search returns the
+            closest commands found so far. Defaults to 0.005.
+          * count: `int` (optional) - The default number of commands to suggest. Defaults to 3.
+        """
+
+        self.max_distance = max_distance
+        self.timeout = timeout
+        self.count = count
+
+        # Tries of signatures by lexer quotes
+        self._tries: dict[str, _TrieNode] = {}
+        self._lexers: dict[str, CallLexer] = {}
+        # Trie nodes of indexed commands and the order they were added in
+        self._nodes: dict[Command, _TrieNode] = {}
+        self._order: dict[Command, int] = {}
+        self._added = 0
+
+    def add(self, command: Command):
+        """Indexes the given command in time proportional to the number of literals
+        in its signature times the depth of the BK-trees (logarithmic for balanced trees).
+        Commands not starting with a literal are not indexed."""
+
+        literals = signature(command)
+        if literals == () or not isinstance(command.lexer, CallLexer):
+            return
+
+        quotes = command.lexer.quotes
+        if quotes not in self._tries:
+            self._tries[quotes] = _TrieNode(0)
+            self._lexers[quotes] = CallLexer(quotes)
+
+        node = self._tries[quotes]
+        for literal in literals:
+            node = node.child(literal.lower())
+
+        node.commands.append(command)
+        self._nodes[command] = node
+        self._order[command] = self._added
+        self._added += 1
+
+    def remove(self, command: Command):
+        """Removes the given command from the index, if it is indexed. The nodes
+        of its signature stay in the trie to keep the BK-trees searchable."""
+
+        node = self._nodes.pop(command, None)
+        if node is not None:
+            node.commands.remove(command)
+            del self._order[command]
+
+    def suggest(self, call: str, count: Optional[int] = None,
+                accept: Optional[Callable[[Command], bool]] = None) -> list[Command]:
+        """Returns the indexed commands closest to the given call, ordered by the total
+        edit distance of their signatures and then by the order they were indexed in.
+
+        Parameters
+        ----------
+          * call: `str` - The call.
+          * count: `int` (optional) - The maximum number of commands to return.
+            Defaults to the count the index was initialized with.
+          * accept: `(Command) -> bool` (optional) - Filters the suggested commands.
+        """
+
+        count = self.count if count is None else count
+        deadline = perf_counter() + self.timeout
+        found: list[tuple[int, int, Command]] = []
+
+        for quotes, root in self._tries.items():
+            values = [token.value.lower() for token in self._lexers[quotes].tokenize(call)]
+            patterns = [_pattern(value) for value in values]
+            # Distances between the tokens of the call and the literals, by position
+            memo: dict[tuple[int, str], int] = {}
+
+            # Trie nodes to visit with their depths and the distance accumulated so far
+            stack = [(root, 0, 0)]
+
+            while stack != []:
+                if perf_counter() > deadline:
+                    break
+
+                node, depth, spent = stack.pop()
+
+                # Signatures that would have to be rewritten entirely are not suggested
+                if spent < node.length:
+                    found += ((spent, self._order[command], command) for command in node.commands
+                              if accept is None or accept(command))
+
+                if depth == len(values) or node.words is None:
+                    continue
+
+                # Find the literals within the remaining distance in the BK-tree. By the triangle
+                # inequality, only children at these distances from a node can be close enough.
+                pattern, length, budget = patterns[depth], len(values[depth]), self.max_distance - spent
+                words = [node.words]
+
+                while words != []:
+                    word = words.pop()
+                    distance = memo.get((depth, word.word))
+                    if distance is None:
+                        distance = memo[(depth, word.word)] = _distance(pattern, length, word.word)
+
+                    if distance <= budget:
+                        stack.append((word.next, depth + 1, spent + distance))
+
+                    for child_distance, child in word.children.items():
+                        if abs(child_distance - distance) <= budget:
+                            words.append(child)
+
+        found.sort(key=lambda f: f[:2])
+        return [command for _, _, command in found[:count]]
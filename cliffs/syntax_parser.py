@@ -1,4 +1,6 @@
 import logging
+import warnings
+from typing import Optional
 from .syntax_lexer import SyntaxLexer
 from .syntax_tree import *
 from .utils import instance_or_kwargs
@@ -57,6 +59,14 @@ class SyntaxParser:
           * symbol_list_class: `Type[SymbolList]` - The symbol list class to use when parsing.
             Defaults to SymbolList.
           * all_case_insensitive: `bool` - Whether to parse literals as case-insensitive by default.
+
+          * complexity_budget: `int` - The maximum worst-case matching cost of parsed trees,
+            as estimated by `cliffs.complexity.estimate_cost`. Defaults to None (no limit).
+          * complexity_mode: `str`:
+            - 'log': Trees exceeding the budget will be logged to the `cliffs.syntax_parser`
+                logger as a warning.
+            - 'warn' (default): A `SyntaxComplexityWarning` will be issued for trees exceeding the budget.
+            - 'reject': A `SyntaxError` will be raised for trees exceeding the budget.
         """
 
         self.simplify = kwargs['simplify_mode'] if 'simplify_mode' in kwargs\
@@ -67,6 +77,11 @@ class SyntaxParser:
         self.symbol_list_class: type[SymbolList] = kwargs.get('symbol_list_class', SymbolList)
         self.all_case_insensitive: bool = kwargs.get('all_case_insensitive', False)
 
+        self.complexity_budget: Optional[int] = kwargs.get('complexity_budget', None)
+        self.complexity_mode: str = kwargs.get('complexity_mode', 'warn')
+        if self.complexity_mode not in ('log', 'warn', 'reject'):
+            raise ValueError(f"Unknown complexity mode: {self.complexity_mode}")
+
     def parse(self, string: str) -> Node:
         """Parses the given sequence of tokens into a syntax tree.
 
@@ -80,9 +95,35 @@ class SyntaxParser:
 
         Raises
         ------
-          * `SyntaxError` when there is an error in the specification.
+          * `SyntaxError` when there is an error in the specification or when
+            the syntax exceeds the complexity budget in the 'reject' mode.
         """
 
+        root = self._parse(string)
+
+        if self.complexity_budget is not None:
+            self._check_complexity(root)
+
+        return root
+
+    def _check_complexity(self, root: Node):
+        from .complexity import estimate_cost, SyntaxComplexityWarning
+
+        cost = estimate_cost(root)
+        if cost <= self.complexity_budget:
+            return
+
+        message = f'Syntax "{root}" has an estimated worst-case matching cost of {cost} '\
+            f'exceeding the budget of {self.complexity_budget}'
+
+        if self.complexity_mode == 'reject':
+            raise SyntaxError(message)
+        elif self.complexity_mode == 'warn':
+            warnings.warn(message, SyntaxComplexityWarning, stacklevel=3)
+        else:
+            logging.getLogger('cliffs.syntax_parser').warning(message)
+
+    def _parse(self, string: str) -> Node:
         tokens = self.lexer.tokenize(string)
 
         root = Sequence()
@@ -100,11 +100,31 @@ class Node:
         ------
           * `SyntaxError` when matching fails because of malformed command syntax.
           * `CallMatchFail` when matching fails and should be terminated.
+          * `MatchBudgetExceeded` when the budget of the match is exhausted.
         """
 
+        if match.budget is not None:
+            match.budget.step()
+
         if match.terminated:
             raise SyntaxError(f"Tried matching {self.node_name} after match was terminated")
 
+    def match_child(self, child: 'Node', match: CallMatch, matcher: CallMatcher):
+        """Matches the given child node, reporting to the tracer of the match
+        if there is one. Composite nodes should match their children through this method.
+
+        Parameters
+        ----------
+          * child: `Node` - The child to match.
+          * match: `CallMatch` - The match to continue.
+          * matcher: `CallMatcher` - The matcher providing context for the match.
+        """
+
+        if match.tracer is None:
+            child.match(match, matcher)
+        else:
+            match.tracer.match(child, match, matcher)
+
     def expected_info(self) -> str:
         return str(self)
 
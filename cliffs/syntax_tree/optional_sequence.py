@@ -24,8 +24,10 @@ class OptionalSequence(Identifiable, Node):
 
         for child in self.children:
             try:
-                child.match(fork, matcher)
+                self.match_child(child, fork, matcher)
 
+            except MatchBudgetExceeded:
+                raise
             except CallMatchFail as fail:
                 if self.identifier is not None:
                     match[self.identifier] = False
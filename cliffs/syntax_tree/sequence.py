@@ -35,7 +35,21 @@ class Sequence(Node):
         super().match(match, matcher)
 
         for child in self.children:
-            child.match(match, matcher)
+            self.match_child(child, match, matcher)
+
+    def match_remaining(self, start: int, match: CallMatch, matcher: CallMatcher):
+        """Matches the children of this sequence starting at the given index,
+        assuming the preceding children have already been matched.
+
+        Parameters
+        ----------
+          * start: `int` - The index of the first child to match.
+          * match: `CallMatch` - The match to continue.
+          * matcher: `CallMatcher` - The matcher providing context for the match.
+        """
+
+        for child in self.children[start:]:
+            self.match_child(child, match, matcher)
 
     def expected_info(self) -> str:
         return self.nth_child(0).expected_info()
@@ -49,8 +49,10 @@ class UnorderedGroup(Node):
             for child in unused:
                 fork = match.fork()
                 try:
-                    child.match(fork, matcher)
+                    self.match_child(child, fork, matcher)
                     matches.append((child, fork))
+                except MatchBudgetExceeded:
+                    raise
                 except CallMatchFail as fail:
                     fails.append((fail, fork.score))
 
@@ -96,9 +96,11 @@ class VariantGroup(Identifiable, Node):
             fork = match.fork()
 
             try:
-                variant.match(fork, matcher)
+                self.match_child(variant, fork, matcher)
                 matches.append((index, fork))
 
+            except MatchBudgetExceeded:
+                raise
             except CallMatchFail as fail:
                 if fork.score > 0:
                     fails.append((fail, fork.score))
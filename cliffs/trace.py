@@ -0,0 +1,181 @@
+import json
+from time import perf_counter
+from typing import Any, Optional
+from .call_match import CallMatch, CallMatchFail
+from .call_matcher import CallMatcher
+
+
+class TraceSpan:
+    """A single node match (or command match) recorded by a tracer."""
+
+    def __init__(self, label: str, parent: Optional['TraceSpan'], start: float, position: int):
+        self.label = label
+        self.parent = parent
+        self.children: list[TraceSpan] = []
+
+        # Start and end times in seconds
+        self.start = start
+        self.end = start
+        # Token index at the start and end of the match
+        self.position = position
+        self.end_position = position
+        # Number of forks created directly within this span
+        self.forks = 0
+        # 'match', 'fail: <fail class name>' or 'error: <exception class name>'
+        self.outcome: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    @property
+    def self_time(self) -> float:
+        return self.duration - sum(child.duration for child in self.children)
+
+    def stack(self) -> list[str]:
+        span, stack = self, []
+        while span is not None:
+            stack.append(span.label)
+            span = span.parent
+        return stack[::-1]
+
+
+class MatchTracer:
+    """Records entries into and exits from `Node.match` during matching, together
+    with token positions, forks and outcomes. Attach to a match by setting
+    `CallMatch.tracer` (see `CommandDispatcher.trace()`).
+
+    Traces can be exported as collapsed stacks (input for flamegraph tools)
+    or as Chrome trace-event JSON (for chrome://tracing, Perfetto, speedscope, etc.).
+    """
+
+    def __init__(self, max_label_width: int = 80):
+        self.max_label_width = max_label_width
+
+        # Top-level spans (one per command)
+        self.spans: list[TraceSpan] = []
+
+        # The result of the traced dispatch: the matched command or the raised fail
+        self.result: Any = None
+
+        self._stack: list[TraceSpan] = []
+        self._num_tokens = 0
+        self._origin = perf_counter()
+
+    def _label(self, obj) -> str:
+        label = str(obj).replace(';', ',').replace('\n', ' ')
+        if len(label) > self.max_label_width:
+            label = label[:self.max_label_width - 3] + '...'
+        return label
+
+    def _enter(self, label: str, match: CallMatch) -> TraceSpan:
+        parent = self._stack[-1] if self._stack != [] else None
+        span = TraceSpan(label, parent, perf_counter(), self._num_tokens - len(match.tokens))
+
+        if parent is not None:
+            parent.children.append(span)
+        else:
+            self.spans.append(span)
+
+        self._stack.append(span)
+        return span
+
+    def _exit(self, span: TraceSpan, match: CallMatch, outcome: str):
+        span.end = perf_counter()
+        span.end_position = self._num_tokens - len(match.tokens)
+        span.outcome = outcome
+        self._stack.pop()
+
+    def begin_command(self, command, match: CallMatch) -> TraceSpan:
+        """Records the beginning of matching a call against the given command."""
+
+        self._num_tokens = len(match.tokens)
+        return self._enter(f'command {self._label(command.syntax)}', match)
+
+    def end_command(self, span: TraceSpan, match: CallMatch, fail: Optional[CallMatchFail] = None):
+        """Records the end of matching a call against a command."""
+
+        self._exit(span, match, 'match' if fail is None else f'fail: {fail.__class__.__name__}')
+
+    def match(self, node, match: CallMatch, matcher: CallMatcher):
+        """Matches the given node, recording the match in the trace."""
+
+        span = self._enter(f'{node.node_name} {self._label(node)}', match)
+        outcome = 'match'
+
+        try:
+            node.match(match, matcher)
+        except CallMatchFail as fail:
+            outcome = f'fail: {fail.__class__.__name__}'
+            raise
+        except BaseException as e:
+            outcome = f'error: {e.__class__.__name__}'
+            raise
+        finally:
+            self._exit(span, match, outcome)
+
+    def fork(self, match: CallMatch):
+        """Records a fork of the given match."""
+
+        if self._stack != []:
+            self._stack[-1].forks += 1
+
+    def _walk(self):
+        stack = list(reversed(self.spans))
+        while stack != []:
+            span = stack.pop()
+            yield span
+            stack += reversed(span.children)
+
+    def collapsed(self) -> str:
+        """Returns the trace in the collapsed stack format (one `frame;frame;... <weight>`
+        line per unique stack) weighted by self time in microseconds."""
+
+        weights: dict[str, int] = {}
+        for span in self._walk():
+            stack = ';'.join(span.stack())
+            weights[stack] = weights.get(stack, 0) + round(span.self_time * 1e6)
+
+        return ''.join(f'{stack} {weight}\n' for stack, weight in weights.items())
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """Returns the trace in the Chrome trace-event format."""
+
+        events = []
+        for span in self._walk():
+            events.append({
+                'name': span.label,
+                'cat': 'match',
+                'ph': 'X',
+                'ts': (span.start - self._origin) * 1e6,
+                'dur': span.duration * 1e6,
+                'pid': 0,
+                'tid': 0,
+                'args': {
+                    'position': span.position,
+                    'end_position': span.end_position,
+                    'forks': span.forks,
+                    'outcome': span.outcome,
+                },
+            })
+
+        return {'traceEvents': events, 'displayTimeUnit': 'ns'}
+
+    def export(self, path: str, format: str = 'collapsed'):
+        """Writes the trace to the given file.
+
+        Parameters
+        ----------
+          * path: `str` - The path of the file to write.
+          * format: `str` (optional) - Either 'collapsed' (default) or 'chrome'.
+        """
+
+        if format == 'collapsed':
+            content = self.collapsed()
+        elif format == 'chrome':
+            content = json.dumps(self.chrome_trace())
+        else:
+            raise ValueError(f"Unknown trace format: {format}")
+
+        with open(path, 'w') as f:
+            f.write(content)
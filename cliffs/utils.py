@@ -1,3 +1,4 @@
+import sys
 from typing import TypeVar, Optional, Callable, Iterable
 
 
@@ -136,3 +137,35 @@ def best(iterable: Iterable[_T], score: Callable[[_T], float] = lambda i: i) ->
 
     s = sorted(iterable, key=score, reverse=True)
     return None if s == [] else s[0]
+
+
+def deep_sizeof(obj, seen: Optional[set[int]] = None) -> int:
+    """Returns the approximate memory footprint of the given object in bytes,
+    including the contents of built-in containers (tuples, lists, sets and dicts).
+    Other objects are measured shallowly and every object is counted once.
+
+    Parameters
+    ----------
+      * obj - The object to measure.
+      * seen: `set[int]` (optional) - Ids of objects already counted.
+
+    Returns
+    -------
+      * `int`: The approximate size in bytes.
+    """
+
+    if seen is None:
+        seen = set()
+
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (tuple, list, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+
+    return size
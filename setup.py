@@ -12,5 +12,5 @@ setup(
     author='michalwa',
     author_email='michalwa2003@gmail.com',
     url='https://github.com/michalwa/py-cliffs',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*', 'test', 'test.*']),
 )
@@ -0,0 +1,41 @@
+from unittest import TestCase
+from cliffs import CommandDispatcher
+
+
+class TestAmbiguity(TestCase):
+
+    def setUp(self):
+        self.dispatcher = CommandDispatcher()
+
+    def register(self, *syntaxes):
+        for syntax in syntaxes:
+            self.dispatcher.command(syntax)(lambda: None)
+
+    def kinds(self):
+        return [ambiguity.kind for ambiguity in self.dispatcher.find_ambiguities()]
+
+    def test_overlap(self):
+        self.register('get <key>', 'get <key: int>', 'set <key> <value>')
+        ambiguities = self.dispatcher.find_ambiguities()
+
+        self.assertEqual(len(ambiguities), 1)
+        self.assertEqual(ambiguities[0].kind, 'overlap')
+        self.assertEqual(len(self.dispatcher._collect(ambiguities[0].example)[0]), 2)
+
+    def test_shadowedVariant(self):
+        self.register('show (<name>|<count: int>)')
+        ambiguities = self.dispatcher.find_ambiguities()
+
+        self.assertListEqual([a.kind for a in ambiguities], ['shadowed_variant'])
+        self.assertIn('is shadowed', ambiguities[0].message)
+
+    def test_swallowing(self):
+        self.register('run <args*> now', 'exec <cmd...>')
+        ambiguities = self.dispatcher.find_ambiguities()
+
+        self.assertListEqual([a.kind for a in ambiguities], ['swallowing'])
+        self.assertIsNotNone(ambiguities[0].example)
+
+    def test_noAmbiguities(self):
+        self.register('get <key>', 'set <key> <value>', 'list [all]')
+        self.assertListEqual(self.kinds(), [])
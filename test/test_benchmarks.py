@@ -0,0 +1,27 @@
+from unittest import TestCase
+from benchmarks.runner import compare
+
+
+def results(**seconds_per_op):
+    return {'results': {name: {'seconds_per_op': seconds, 'loops': 1} for name, seconds in seconds_per_op.items()}}
+
+
+class TestCompare(TestCase):
+
+    def test_regressions(self):
+        lines = []
+        regressions = compare(results(a=1.0, b=1.0, c=1.0, d=1.0), results(a=1.2, b=1.05, c=0.5, e=1.0),
+                              threshold=0.1, log=lines.append)
+
+        self.assertListEqual(regressions, ['a'])
+        self.assertEqual(len(lines), 4)
+        self.assertIn('REGRESSION', lines[0])
+        self.assertNotIn('REGRESSION', lines[1])
+        self.assertIn('improvement', lines[2])
+        self.assertIn('(new)', lines[3])
+
+    def test_threshold(self):
+        baseline, current = results(a=1.0), results(a=1.3)
+
+        self.assertListEqual(compare(baseline, current, threshold=0.5, log=lambda _: None), [])
+        self.assertListEqual(compare(baseline, current, threshold=0.2, log=lambda _: None), ['a'])
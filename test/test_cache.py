@@ -0,0 +1,124 @@
+from unittest import TestCase
+from unittest.mock import patch
+from cliffs import CommandDispatcher, CallMatchFail, UnknownCommandError
+from cliffs.cache import LRUCache
+
+
+class TestLRUCache(TestCase):
+
+    def test_hitAndMiss(self):
+        cache = LRUCache(max_size=2)
+        cache.put('a', 1)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_eviction(self):
+        """The least recently used entry should be evicted first"""
+
+        cache = LRUCache(max_size=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_expiry(self):
+        cache = LRUCache(ttl=10)
+
+        with patch('cliffs.cache.monotonic', return_value=100.0):
+            cache.put('a', 1)
+        with patch('cliffs.cache.monotonic', return_value=105.0):
+            self.assertEqual(cache.get('a'), 1)
+        with patch('cliffs.cache.monotonic', return_value=110.0):
+            self.assertIsNone(cache.get('a'))
+
+        self.assertEqual(cache.evictions, 1)
+
+
+class TestCommandCache(TestCase):
+
+    def setUp(self):
+        self.dispatcher = CommandDispatcher()
+        self.calls = []
+
+        @self.dispatcher.command('lookup <id: int> [verbose]', cache={'max_size': 4})
+        def lookup(id: int):
+            self.calls.append(id)
+            return id * 2
+
+        self.command = lookup
+
+    def test_hitSkipsCallback(self):
+        self.assertEqual(self.dispatcher.dispatch('lookup 2')[0], 4)
+        self.assertEqual(self.dispatcher.dispatch('lookup 2')[0], 4)
+
+        self.assertListEqual(self.calls, [2])
+        self.assertEqual((self.command.cache.hits, self.command.cache.misses), (1, 1))
+
+    def test_keyIncludesOptionals(self):
+        self.dispatcher.dispatch('lookup 2')
+        self.dispatcher.dispatch('lookup 2 verbose')
+
+        self.assertListEqual(self.calls, [2, 2])
+
+
+class TestCallCache(TestCase):
+
+    def setUp(self):
+        self.dispatcher = CommandDispatcher(call_cache={'max_size': 8})
+
+        @self.dispatcher.command('get <key> [loud]')
+        def get(key, match):
+            return key, match.optional(0)
+
+    def test_cachedMatch(self):
+        self.assertEqual(self.dispatcher.dispatch('get a loud')[0], ('a', True))
+        self.assertEqual(self.dispatcher.dispatch('get a loud')[0], ('a', True))
+        self.assertEqual(self.dispatcher.call_cache.hits, 1)
+        self.assertGreater(self.dispatcher.call_cache.footprint(), 0)
+
+    def test_cachedFail(self):
+        for _ in range(2):
+            with self.assertRaises(CallMatchFail):
+                self.dispatcher.dispatch('get')
+
+        self.assertEqual(self.dispatcher.call_cache.hits, 1)
+
+    def test_invalidation(self):
+        with self.assertRaises(UnknownCommandError):
+            self.dispatcher.dispatch('put a')
+
+        @self.dispatcher.command('put <key: int>')
+        def put(key):
+            return key
+
+        # The cached fail must not survive registering a command, nor a type
+        with self.assertRaises(CallMatchFail):
+            self.dispatcher.dispatch('put a')
+
+        put.matcher.register_type(lambda s: int(s, 16), 'int')
+        self.assertEqual(self.dispatcher.dispatch('put a')[0], 10)
+
+    def test_freshFails(self):
+        fails = []
+        for _ in range(2):
+            with self.assertRaises(CallMatchFail) as context:
+                self.dispatcher.dispatch('get')
+            fails.append(context.exception)
+
+        self.assertIsNot(fails[0], fails[1])
+        self.assertEqual((type(fails[1]), str(fails[1]), fails[1].command),
+                         (type(fails[0]), str(fails[0]), fails[0].command))
+
+    def test_adaptiveOrder(self):
+        dispatcher = CommandDispatcher(call_cache=True, adaptive_order=True)
+        dispatcher.command('get <key>')(lambda key: key)
+        for _ in range(3):
+            dispatcher.dispatch('get a')
+
+        self.assertEqual(dispatcher.order.to_dict(), {'get <key>': 3})
@@ -1,3 +1,4 @@
+import random
 from unittest import TestCase
 from cliffs.call_lexer import CallLexer
 
@@ -88,3 +89,34 @@ class TestCallLexer(TestCase):
         """Unsupported escape characters should be left as they are keeping the backslash."""
 
         self.assertLexerYields('\\a', [('\\a', 0, 2)])
+
+    def test_retokenize(self):
+        rng = random.Random(5)
+        alphabet = 'ab  "\'\\'
+
+        for _ in range(5000):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 20)))
+            tokens = list(self.lexer.tokenize(text))
+
+            offset = rng.randint(0, len(text))
+            deleted = rng.randint(0, len(text) - offset)
+            inserted = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 3)))
+
+            new_text, new_tokens = self.lexer.retokenize(text, tokens, offset, deleted, inserted)
+            self.assertEqual(new_text, text[:offset] + inserted + text[offset + deleted:])
+            self.assertListEqual([(t.raw, t.value, t.start, t.end) for t in new_tokens],
+                                 [(t.raw, t.value, t.start, t.end) for t in self.lexer.tokenize(new_text)],
+                                 (text, offset, deleted, inserted))
+
+    def test_retokenizeReusesTokens(self):
+        text = 'foo "bar baz" qux ' * 100
+        tokens = list(self.lexer.tokenize(text))
+
+        # Tokens after the edit are reused if the edit keeps the length of the call
+        text, updated = self.lexer.retokenize(text, tokens, 1, 1, 'x')
+        self.assertEqual(updated[0].value, 'fxo')
+        self.assertTrue(all(a is b for a, b in zip(tokens[1:], updated[1:])))
+
+        text, updated = self.lexer.retokenize(text, updated, len(text) - 4, 0, '"')
+        self.assertTrue(all(a is b for a, b in zip(tokens[1:-1], updated[1:-1])))
+        self.assertEqual([t.value for t in updated[-2:]], ['bar baz', '"qux '])
@@ -0,0 +1,90 @@
+import random
+from unittest import TestCase
+from cliffs import CommandDispatcher
+from cliffs.corpus import CorpusGenerator
+
+
+class TestComplete(TestCase):
+
+    def setUp(self):
+        self.dispatcher = CommandDispatcher()
+        self.dispatcher.command('set [loud] alarm at <hour: int> [am|pm] {[saying <message>] [repeat <n: int>]}')(lambda: None)
+        self.dispatcher.command('get <key> {a b}', tags=['read'])(lambda: None)
+        self.dispatcher.command('git (push|pull) [--force] <args*>')(lambda: None)
+
+    def complete(self, text, **kwargs):
+        completion = self.dispatcher.complete(text, **kwargs)
+        return completion.literals, completion.slots
+
+    def test_completions(self):
+        self.assertEqual(self.complete(''), (['get', 'git', 'set'], []))
+        self.assertEqual(self.complete('g'), (['get', 'git'], []))
+        self.assertEqual(self.complete('set '), (['alarm', 'loud'], []))
+        self.assertEqual(self.complete('set alarm at '), ([], ['<hour: int>']))
+        self.assertEqual(self.complete('set alarm at x '), ([], []))
+        self.assertEqual(self.complete('set alarm at 7 '), (['am', 'pm', 'repeat', 'saying'], []))
+        self.assertEqual(self.complete('set alarm at 7 repeat 3 '), (['saying'], []))
+        self.assertEqual(self.complete('get k b '), (['a'], []))
+        self.assertEqual(self.complete('git push '), (['--force'], ['<args*>']))
+        self.assertEqual(self.complete('git push a b '), ([], ['<args*>']))
+        self.assertEqual(self.complete('g', mask=self.dispatcher.tag_mask('read')), (['get'], []))
+
+    def test_cursor(self):
+        completion = self.dispatcher.complete('set lo alarm', 6)
+        self.assertEqual((completion.start, completion.prefix, completion.literals), (4, 'lo', ['loud']))
+
+        completion = self.dispatcher.complete('set alarm at 7 "hi th')
+        self.assertEqual((completion.start, completion.prefix), (15, 'hi th'))
+
+    def test_resume(self):
+        generator = CorpusGenerator(seed=2)
+        syntaxes = [generator.random_syntax(depth=2) for _ in range(20)]
+        for syntax in syntaxes:
+            self.dispatcher.command(syntax)(lambda: None)
+
+        fresh = CommandDispatcher()
+        for command in self.dispatcher._commands:
+            fresh.register(command)
+
+        for syntax in syntaxes:
+            call = generator.call(self.dispatcher.parser.parse(syntax))
+            previous = None
+
+            # Type the call character by character, resuming from the previous completion
+            for end in range(len(call) + 1):
+                completion = self.dispatcher.complete(call[:end])
+                fresh._last_completion = None
+                expected = fresh.complete(call[:end])
+
+                self.assertEqual((completion.start, completion.literals, completion.slots),
+                                 (expected.start, expected.literals, expected.slots), call[:end])
+
+                if previous is not None and completion.start == previous.start:
+                    self.assertIs(completion._states, previous._states)
+                previous = completion
+
+        # Edit the calls at the end, deleting characters and typing quotes and escapes
+        rng = random.Random(4)
+        for _ in range(40):
+            text = ''
+            for _ in range(40):
+                if text != '' and rng.random() < 0.3:
+                    text = text[:-rng.randint(1, min(3, len(text)))]
+                else:
+                    text += rng.choice(['"', "'", '\\', ' ', 'git', 'g', 'i', 't', 'set ', 'push'])
+
+                completion = self.dispatcher.complete(text)
+                fresh._last_completion = None
+                expected = fresh.complete(text)
+
+                self.assertEqual((completion.start, completion.prefix, completion.literals, completion.slots),
+                                 (expected.start, expected.prefix, expected.literals, expected.slots), text)
+
+        self.dispatcher._last_completion = None
+        self.dispatcher.complete('gi"')
+        self.assertEqual(self.complete('git'), (['git'], []))
+
+        # Registering a command invalidates the previous completion
+        self.dispatcher.complete('gat')
+        self.dispatcher.command('gather')(lambda: None)
+        self.assertEqual(self.complete('gath'), (['gather'], []))
@@ -0,0 +1,39 @@
+import warnings
+from unittest import TestCase
+from cliffs.complexity import estimate_cost, SyntaxComplexityWarning
+from cliffs.syntax_parser import SyntaxParser
+
+
+class TestComplexity(TestCase):
+
+    def cost(self, syntax):
+        return estimate_cost(SyntaxParser(simplify_mode='silently').parse(syntax))
+
+    def test_sequence(self):
+        self.assertEqual(self.cost('a <b> [c]'), 5)
+
+    def test_variants(self):
+        self.assertEqual(self.cost('(a|b|c d)'), 8)
+
+    def test_unorderedNesting(self):
+        flat = self.cost('{a b c}')
+        nested = self.cost('{a b {c d e}}')
+
+        self.assertEqual(flat, 1 + 1 + 2 + 3)
+        self.assertGreater(nested, flat * 2)
+
+    def test_budget(self):
+        syntax = '{a b {c d e}}'
+
+        with self.assertRaises(SyntaxError):
+            SyntaxParser(complexity_budget=10, complexity_mode='reject').parse(syntax)
+
+        with self.assertWarns(SyntaxComplexityWarning):
+            SyntaxParser(complexity_budget=10).parse(syntax)
+
+        with self.assertLogs('cliffs.syntax_parser', 'WARNING'):
+            SyntaxParser(complexity_budget=10, complexity_mode='log').parse(syntax)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            SyntaxParser(complexity_budget=1000).parse(syntax)
@@ -0,0 +1,48 @@
+from unittest import TestCase
+from cliffs.command import Command
+from cliffs.corpus import CorpusGenerator
+from cliffs.call_match import CallMatchFail
+
+
+class TestCorpusGenerator(TestCase):
+
+    def assertMatches(self, syntax, call, matches=True):
+        generator = CorpusGenerator()
+        command = Command(generator.parser.parse(syntax), lambda: None)
+        try:
+            command.match(command.begin_match(call))
+            self.assertTrue(matches, f'{call!r} matched {syntax!r}')
+        except CallMatchFail:
+            self.assertFalse(matches, f'{call!r} did not match {syntax!r}')
+
+    def test_reproducible(self):
+        a, b = CorpusGenerator(42), CorpusGenerator(42)
+
+        syntax = a.random_syntax(depth=3, varargs=True)
+        self.assertEqual(syntax, b.random_syntax(depth=3, varargs=True))
+        self.assertListEqual(a.corpus(syntax, 20, (1, 1, 1)), b.corpus(syntax, 20, (1, 1, 1)))
+
+    def test_generatedCalls(self):
+        generator = CorpusGenerator(7)
+
+        for _ in range(10):
+            syntax = generator.random_syntax(depth=2, unordered_size=2)
+
+            call = generator.call(syntax)
+            if call is not None:
+                self.assertMatches(syntax, call)
+
+            typo = generator.typo(syntax)
+            if typo is not None:
+                self.assertMatches(syntax, typo, matches=False)
+
+            invalid = generator.invalid(syntax)
+            if invalid is not None:
+                self.assertMatches(syntax, invalid, matches=False)
+
+    def test_existingSyntax(self):
+        generator = CorpusGenerator()
+        syntax = 'set [loud] alarm at <hour: int> [am|pm] {[every <days>] [saying <message>]}'
+
+        for call in generator.corpus(syntax, 20):
+            self.assertMatches(syntax, call)
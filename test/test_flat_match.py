@@ -0,0 +1,42 @@
+from unittest import TestCase
+from cliffs import Command, CallMatchFail
+from cliffs.corpus import CorpusGenerator
+from cliffs.syntax_parser import SyntaxParser
+
+
+class TestFlatMatch(TestCase):
+
+    def outcome(self, command, call):
+        match = command.begin_match(call)
+        try:
+            command.match(match)
+            return match._params, match.score, match.tokens
+        except CallMatchFail as fail:
+            return fail.__class__, str(fail), match.score
+
+    def assertSameOutcomes(self, syntax, calls):
+        fast = Command(SyntaxParser().parse(syntax), lambda: None)
+        slow = Command(SyntaxParser().parse(syntax), lambda: None)
+        slow._flat = None
+
+        self.assertIsNotNone(fast._flat)
+        for call in calls:
+            self.assertEqual(self.outcome(fast, call), self.outcome(slow, call), call)
+
+    def test_flat(self):
+        self.assertSameOutcomes('set <key> <value: int>', [
+            'set a 1', 'set a b', 'set a', 'sett a 1', 'set a 1 2', '', 'set "a b" 0x1'])
+
+    def test_literalModifiers(self):
+        self.assertSameOutcomes('get Key^ <key>', ['get key a', 'get KEY a', 'GET key a', 'get kee a'])
+        self.assertSameOutcomes('get key~ <key>', ['get key a', 'get kye a', 'get KEY a'])
+
+    def test_notFlat(self):
+        command = Command(SyntaxParser().parse('get [<key>]'), lambda: None)
+        self.assertIsNone(command._flat)
+
+    def test_randomCalls(self):
+        generator = CorpusGenerator(seed=3)
+        for _ in range(20):
+            syntax = generator.random_syntax(depth=0, fanout=5)
+            self.assertSameOutcomes(syntax, generator.corpus(syntax, 10, mix=(1., 1., 1.)))
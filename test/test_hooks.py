@@ -0,0 +1,76 @@
+from unittest import TestCase
+from cliffs import CommandDispatcher, UnknownCommandError, NO_RESULT
+
+
+class TestDispatchHooks(TestCase):
+
+    def setUp(self):
+        self.dispatcher = CommandDispatcher()
+        self.events = []
+
+        @self.dispatcher.command('get <key>')
+        def get(key):
+            self.events.append('execute')
+            return key
+
+    def test_order(self):
+        for event in ['before_match', 'after_match', 'before_execute', 'after_execute']:
+            self.dispatcher.add_hook(event, lambda *args, event=event: self.events.append(event))
+
+        self.assertEqual(self.dispatcher.dispatch('get a')[0], 'a')
+        self.assertListEqual(self.events, [
+            'before_match', 'after_match', 'before_execute', 'execute', 'after_execute'])
+
+    def test_shortCircuit(self):
+        cache = {'get a': 'cached'}
+
+        @self.dispatcher.hook('before_match')
+        def serve_cached(call, callback_args):
+            return cache.get(call)
+
+        self.assertEqual(self.dispatcher.dispatch('get a'), ('cached', None))
+        self.assertEqual(self.dispatcher.dispatch('get b')[0], 'b')
+        self.assertListEqual(self.events, ['execute'])
+
+    def test_noResult(self):
+        self.dispatcher.add_hook('before_match', lambda call, callback_args: NO_RESULT if call == 'get a' else None)
+        self.dispatcher.add_hook('after_execute', lambda match, command, result: NO_RESULT)
+
+        self.assertEqual(self.dispatcher.dispatch('get a'), (None, None))
+        self.assertEqual(self.dispatcher.dispatch('get b'), (None, self.dispatcher._commands[0]))
+        self.assertListEqual(self.events, ['execute'])
+
+    def test_authorization(self):
+        @self.dispatcher.hook('before_execute')
+        def authorize(match, command, callback_args):
+            if callback_args.get('user') != 'admin':
+                raise PermissionError(str(command.syntax))
+
+        with self.assertRaises(PermissionError):
+            self.dispatcher.dispatch('get a', user='guest')
+
+        self.assertEqual(self.dispatcher.dispatch('get a', user='admin')[0], 'a')
+
+    def test_resultReplacement(self):
+        self.dispatcher.add_hook('after_execute', lambda match, command, result: result.upper())
+        self.assertEqual(self.dispatcher.dispatch('get a')[0], 'A')
+
+    def test_onFail(self):
+        fails = []
+        self.dispatcher.add_hook('on_fail', lambda call, fail: fails.append((call, fail)))
+
+        with self.assertRaises(UnknownCommandError):
+            self.dispatcher.dispatch('put a')
+
+        self.assertEqual(fails[0][0], 'put a')
+
+    def test_remove(self):
+        hook = self.dispatcher.hook('before_match')(lambda call, callback_args: 'hooked')
+        self.dispatcher.remove_hook('before_match', hook)
+
+        self.assertEqual(self.dispatcher.dispatch('get a')[0], 'a')
+        self.assertFalse(self.dispatcher._instrumented)
+
+    def test_unknownEvent(self):
+        with self.assertRaises(ValueError):
+            self.dispatcher.add_hook('before_lunch', print)
@@ -0,0 +1,58 @@
+from unittest import TestCase
+from cliffs import CommandDispatcher, CallMatcher, MatchBudgetExceeded
+
+
+class TestMatchBudget(TestCase):
+
+    def setUp(self):
+        self.dispatcher = CommandDispatcher()
+
+    def register(self, matcher):
+        self.dispatcher.command('{a b c d e f g h}', matcher=matcher)(lambda: 'ok')
+
+    def test_stepBudget(self):
+        self.register(CallMatcher(max_steps=20))
+
+        with self.assertRaises(MatchBudgetExceeded) as context:
+            self.dispatcher.dispatch('h g f e d c b a')
+
+        self.assertFalse(context.exception.timed_out)
+        self.assertEqual(context.exception.steps, 21)
+
+    def test_timeout(self):
+        # A negative timeout sets a deadline that has already passed regardless of the clock resolution
+        self.register(CallMatcher(timeout=-1))
+
+        with self.assertRaises(MatchBudgetExceeded) as context:
+            self.dispatcher.dispatch('h g f e d c b a')
+
+        self.assertTrue(context.exception.timed_out)
+
+    def test_withinBudget(self):
+        self.register(CallMatcher(max_steps=100, timeout=10))
+        self.assertEqual(self.dispatcher.dispatch('h g f e d c b a')[0], 'ok')
+
+    def test_sharedBetweenCommands(self):
+        dispatcher = CommandDispatcher(matcher=CallMatcher(max_steps=100))
+        for i in range(2):
+            dispatcher.command(f'{{a b c d e f g h}} x{i}')(lambda: 'ok')
+        self.assertEqual(dispatcher.dispatch('h g f e d c b a x1')[0], 'ok')
+
+        # Every command fits into the budget on its own, but not all of them together
+        dispatcher.command('{a b c d e f g h} x2')(lambda: 'ok')
+        with self.assertRaises(MatchBudgetExceeded) as context:
+            dispatcher.dispatch('h g f e d c b a x1')
+        self.assertTrue(context.exception.exhausted)
+
+    def test_commandBudget(self):
+        for options in [{}, {'prefix_routing': True}, {'adaptive_order': True}, {'stats': True}]:
+            dispatcher = CommandDispatcher(matcher=CallMatcher(max_steps=1000, max_command_steps=20), **options)
+            dispatcher.command('{a b c d e f g h}')(lambda: 'slow')
+            dispatcher.command('h g f e d c b a')(lambda: 'fast')
+
+            # The command exceeding its limit fails without aborting the dispatch
+            self.assertEqual(dispatcher.dispatch('h g f e d c b a')[0], 'fast', options)
+
+            with self.assertRaises(MatchBudgetExceeded) as context:
+                dispatcher.dispatch('a b c d e f g h')
+            self.assertFalse(context.exception.exhausted)
@@ -0,0 +1,108 @@
+from unittest import TestCase
+from cliffs import CommandDispatcher, CallMatchFail, MissingParameter, UnknownMountedCommand
+
+
+loaded = []
+
+
+def load_net(dispatcher):
+    loaded.append(dispatcher)
+    dispatcher.command('add <ip>')(lambda ip: ('add', ip))
+    dispatcher.command('del <ip>', description='Deletes an address')(lambda ip: ('del', ip))
+
+
+class TestMount(TestCase):
+
+    def setUp(self):
+        loaded.clear()
+
+    def test_lazyLoading(self):
+        for options in [{}, {'prefix_routing': True}, {'automaton': True}, {'call_cache': True}]:
+            loaded.clear()
+            dispatcher = CommandDispatcher(**options)
+            dispatcher.command('ping')(lambda: 'pong')
+            group = dispatcher.mount('net', f'{__name__}:load_net')
+
+            self.assertEqual(dispatcher.dispatch('ping')[0], 'pong')
+            with self.assertRaises(CallMatchFail):
+                dispatcher.dispatch('pin')
+            self.assertFalse(group.loaded)
+
+            self.assertEqual(dispatcher.dispatch('net add 10.0.0.1'), (('add', '10.0.0.1'), group))
+            self.assertEqual(dispatcher.dispatch('net del 10.0.0.1')[0], ('del', '10.0.0.1'))
+            self.assertEqual(len(loaded), 1, options)
+
+            with self.assertRaises(UnknownMountedCommand):
+                dispatcher.dispatch('net foo')
+            with self.assertRaises(MissingParameter):
+                dispatcher.dispatch('net add')
+
+    def test_bestMatch(self):
+        dispatcher = CommandDispatcher()
+        dispatcher.command('net add <ip> <mask>')(lambda ip, mask: 'outer')
+        dispatcher.mount('net', load_net)
+
+        # The nested score is added to the score of the prefix
+        self.assertEqual(dispatcher.dispatch('net add 10.0.0.1')[0], ('add', '10.0.0.1'))
+        self.assertEqual(dispatcher.dispatch('net add 10.0.0.1 8')[0], 'outer')
+
+    def test_usage(self):
+        dispatcher = CommandDispatcher()
+        dispatcher.command('ping')(lambda: None)
+        group = dispatcher.mount('net', load_net, metadata=[('add <ip>', None)])
+
+        self.assertEqual(list(dispatcher.get_usage()), ['ping', 'net add <ip>'])
+        self.assertEqual(loaded, [])
+
+        dispatcher.dispatch('net add 10.0.0.1')
+        self.assertEqual(list(dispatcher.get_usage('')),
+                         ['ping', '', 'net add <ip>', '', 'net del <ip>', '    Deletes an address'])
+        self.assertEqual(group.metadata, [('add <ip>', None), ('del <ip>', 'Deletes an address')])
+
+    def test_nestedChangesInvalidateCache(self):
+        for loader in [load_net, f'{__name__}:load_net']:
+            dispatcher = CommandDispatcher(call_cache=True)
+            group = dispatcher.mount('net', loader)
+            self.assertEqual(dispatcher.dispatch('net add 10.0.0.1')[0], ('add', '10.0.0.1'))
+
+            group.dispatcher.unregister(group.dispatcher._commands[0])
+            group.dispatcher.command('add <ip>')(lambda ip: ('added', ip))
+            self.assertEqual(dispatcher.dispatch('net add 10.0.0.1')[0], ('added', '10.0.0.1'))
+
+    def test_paramsOfGroups(self):
+        for options in [{}, {'call_cache': True}]:
+            dispatcher = CommandDispatcher(slow_threshold=0, slow_log_sample=0, **options)
+            dispatcher.mount('net', load_net)
+            matched = []
+            dispatcher.add_hook('after_match', lambda call, match, command: matched.append(dict(match._params)))
+
+            for _ in range(2):
+                self.assertEqual(dispatcher.dispatch('net add 10.0.0.1')[0], ('add', '10.0.0.1'))
+
+            self.assertEqual(matched, [{'command': 'add 10.0.0.1'}] * 2)
+            self.assertEqual([entry.params for entry in dispatcher.slow_log.entries()],
+                             [{'command': 'add 10.0.0.1'}] * 2)
+
+    def test_nestedHooks(self):
+        nested = CommandDispatcher(slow_threshold=0, slow_log_sample=0)
+        load_net(nested)
+        events = []
+        nested.add_hook('before_match', lambda call, args: 'denied' if args.get('user') != 'root' else None)
+        nested.add_hook('before_execute', lambda match, command, args: events.append(str(command.syntax)))
+
+        dispatcher = CommandDispatcher()
+        dispatcher.mount('net', nested)
+
+        self.assertEqual(dispatcher.dispatch('net add 10.0.0.1', user='guest')[0], 'denied')
+        self.assertEqual(dispatcher.dispatch('net add 10.0.0.1', user='root')[0], ('add', '10.0.0.1'))
+        self.assertEqual(events, ['add <ip>'])
+        self.assertEqual([entry.call for entry in nested.slow_log.entries()], ['add 10.0.0.1'] * 2)
+
+    def test_usageWithoutMetadata(self):
+        dispatcher = CommandDispatcher()
+        dispatcher.command('ping')(lambda: None)
+        group = dispatcher.mount('net', f'{__name__}:load_net', description='Network commands')
+
+        self.assertEqual(list(dispatcher.get_usage()), ['ping', 'net', '    Network commands'])
+        self.assertIsNone(group.metadata)
+        self.assertEqual(loaded, [])
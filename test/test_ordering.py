@@ -0,0 +1,59 @@
+import os
+import tempfile
+from unittest import TestCase
+from cliffs import CommandDispatcher, CallMatchFail, CommandDispatchError, UnknownCommandError
+from cliffs.corpus import CorpusGenerator
+
+
+class TestAdaptiveOrder(TestCase):
+
+    def setUp(self):
+        generator = CorpusGenerator(seed=11)
+        self.syntaxes = ['get <key>', 'get <key: int>', 'get <a> [<b>]', 'get {x y}']
+        self.syntaxes += [generator.random_syntax(depth=1) for _ in range(15)]
+
+        # Skewed traffic: most calls hit the last commands
+        self.calls = ['get 1', 'get a', 'get a b', 'get y x', 'foo']
+        for syntax in self.syntaxes[-3:] * 5 + self.syntaxes:
+            self.calls += generator.corpus(syntax, 3, mix=(3., 1., 1.))
+
+    def make_dispatcher(self, **kwargs):
+        dispatcher = CommandDispatcher(**kwargs)
+        for syntax in self.syntaxes:
+            dispatcher.command(syntax)(lambda: None)
+        return dispatcher
+
+    def outcome(self, dispatcher, call):
+        try:
+            match, command = dispatcher._match(call)
+            return str(command.syntax), match._params, match.score
+        except (CallMatchFail, UnknownCommandError) as fail:
+            return fail.__class__, str(fail)
+
+    def test_sameWinner(self):
+        for options in [{'adaptive_order': {'interval': 10}},
+                        {'adaptive_order': {'interval': 10}, 'prefix_routing': True}]:
+            plain, adaptive = self.make_dispatcher(), self.make_dispatcher(**options)
+
+            # Twice, so the second pass runs with the adapted ordering
+            for call in self.calls * 2:
+                self.assertEqual(self.outcome(adaptive, call), self.outcome(plain, call), call)
+
+    def test_exportImport(self):
+        dispatcher = self.make_dispatcher(adaptive_order={'interval': 10})
+        for call in self.calls:
+            self.outcome(dispatcher, call)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'order.json')
+            dispatcher.export_order(path)
+
+            warm = self.make_dispatcher(adaptive_order=True)
+            warm.import_order(path)
+
+        self.assertDictEqual(warm.order.to_dict(), dispatcher.order.to_dict())
+        hottest = warm.order.arrange(list(enumerate(warm._commands)))[0][1]
+        self.assertEqual(str(hottest.syntax), max(dispatcher.order.to_dict().items(), key=lambda i: i[1])[0])
+
+        with self.assertRaises(CommandDispatchError):
+            self.make_dispatcher().export_order(path)
@@ -0,0 +1,122 @@
+from unittest import TestCase
+from cliffs import CommandDispatcher, CallMatchFail, UnknownCommandError
+from cliffs.corpus import CorpusGenerator
+
+
+class TestReload(TestCase):
+
+    def setUp(self):
+        generator = CorpusGenerator(seed=5)
+        self.syntaxes = ['get <key>', 'get <key: int>', 'get <a> [<b>]', 'set <key> <value>']
+        self.syntaxes += [generator.random_syntax(depth=1) for _ in range(10)]
+
+        self.calls = ['get 1', 'get a', 'get a b', 'set a b', 'foo']
+        for syntax in self.syntaxes:
+            self.calls += generator.corpus(syntax, 3, mix=(3., 1., 1.))
+
+    def outcome(self, dispatcher, call):
+        try:
+            match, command = dispatcher._resolve(call)
+            return str(command.syntax), match._params, match.score
+        except (CallMatchFail, UnknownCommandError) as fail:
+            return fail.__class__, str(fail)
+
+    def test_unregister(self):
+        for options in [{}, {'prefix_routing': True}, {'automaton': True},
+                        {'adaptive_order': True, 'call_cache': True, 'stats': True}]:
+            dispatcher = CommandDispatcher(**options)
+            commands = [dispatcher.command(syntax)(lambda: None) for syntax in self.syntaxes]
+
+            # Build the routing indexes and fill the caches before unregistering
+            for call in self.calls:
+                self.outcome(dispatcher, call)
+
+            for command in commands[::2]:
+                dispatcher.unregister(command)
+
+            expected = CommandDispatcher()
+            for syntax in self.syntaxes[1::2]:
+                expected.command(syntax)(lambda: None)
+
+            for call in self.calls:
+                self.assertEqual(self.outcome(dispatcher, call), self.outcome(expected, call), (options, call))
+
+            with self.assertRaises(ValueError):
+                dispatcher.unregister(commands[0])
+
+    def test_replace(self):
+        dispatcher = CommandDispatcher(automaton=True, call_cache=True)
+        dispatcher.command('ping')(lambda: 'old')
+        dispatcher.command('ping <host>')(lambda host: host)
+        self.assertEqual(dispatcher.dispatch('ping')[0], 'old')
+
+        new = dispatcher.command_class(dispatcher.parser.parse('ping'), lambda: 'new')
+        old = dispatcher.replace(new)
+
+        self.assertEqual(str(old.syntax), 'ping')
+        self.assertEqual(dispatcher.dispatch('ping'), ('new', new))
+        self.assertEqual(dispatcher._commands[0], new)
+
+        with self.assertRaises(ValueError):
+            dispatcher.replace(dispatcher.command_class(dispatcher.parser.parse('pong'), lambda: None))
+
+    def test_reload(self):
+        dispatcher = CommandDispatcher(prefix_routing=True)
+        dispatcher.command('first')(lambda: None)
+
+        def load_v1(d):
+            d.command('get <key>')(lambda key: ('v1', key))
+            d.command('set <key> <value>')(lambda key, value: None)
+
+        def load_v2(d):
+            d.command('get <key>')(lambda key: ('v2', key))
+            d.command('del <key>')(lambda key: None)
+
+        v1 = dispatcher.reload('store', load_v1)
+        dispatcher.command('last')(lambda: None)
+        tree = v1[0].syntax
+
+        v2 = dispatcher.reload('store', load_v2)
+        self.assertEqual([str(c.syntax) for c in v2], ['get <key>', 'del <key>'])
+        self.assertEqual(dispatcher.dispatch('get a')[0], ('v2', 'a'))
+        with self.assertRaises(UnknownCommandError):
+            dispatcher.dispatch('set a b')
+
+        # The unchanged command keeps its position and its parsed syntax tree
+        self.assertEqual([str(c.syntax) for c in dispatcher._commands],
+                         ['first', 'get <key>', 'last', 'del <key>'])
+        self.assertIs(v2[0].syntax, tree)
+
+        def load_broken(d):
+            d.command('get <key>')(lambda key: ('broken', key))
+            raise RuntimeError('broken')
+
+        with self.assertRaises(RuntimeError):
+            dispatcher.reload('store', load_broken)
+
+        self.assertEqual(dispatcher.dispatch('get a')[0], ('v2', 'a'))
+        self.assertEqual([str(c.syntax) for c in dispatcher._commands],
+                         ['first', 'get <key>', 'last', 'del <key>'])
+
+        dispatcher.reload('store', lambda d: None)
+        self.assertEqual([str(c.syntax) for c in dispatcher._commands], ['first', 'last'])
+        self.assertDictEqual(dispatcher._parsed_refs, {'first': 1, 'last': 1})
+
+    def test_automatonBounded(self):
+        dispatcher = CommandDispatcher(automaton=True)
+        syntaxes = [f'cmd{i} [--flag] (a|b <x>) <rest*>' for i in range(20)]
+
+        def load(d):
+            for syntax in syntaxes:
+                d.command(syntax)(lambda **_: None)
+
+        sizes = []
+        for _ in range(30):
+            dispatcher.reload('ns', load)
+            self.assertEqual(str(dispatcher.dispatch('cmd7 b y z')[1].syntax), syntaxes[7])
+
+            automaton, = dispatcher._router._automata.values()
+            sizes.append(len(automaton._nfa))
+            self.assertEqual(len(automaton._nfa[0].epsilon), len(syntaxes))
+
+        self.assertLessEqual(max(sizes), 3 * sizes[0])
@@ -0,0 +1,74 @@
+from io import StringIO
+from unittest import TestCase
+from cliffs import CommandDispatcher, CallMatchFail, UnknownCommandError
+from cliffs.recording import CallRecorder
+from cliffs.replay import read_recording, replay
+
+
+class TestReplay(TestCase):
+
+    def make_dispatcher(self, **kwargs):
+        dispatcher = CommandDispatcher(**kwargs)
+        dispatcher.command('get <key>')(lambda key: key)
+        dispatcher.command('set <key> <value>')(lambda key, value: None)
+        return dispatcher
+
+    def record(self, calls):
+        f = StringIO()
+        dispatcher = self.make_dispatcher(recorder=CallRecorder(f))
+
+        for call in calls:
+            try:
+                dispatcher.dispatch(call)
+            except (CallMatchFail, UnknownCommandError):
+                pass
+
+        return f.getvalue()
+
+    def test_record(self):
+        recording = self.record(['get a', 'set "a b" c', 'foo'])
+        records = list(read_recording(StringIO(recording)))
+
+        self.assertListEqual([r.call for r in records], ['get a', 'set "a b" c', 'foo'])
+        self.assertListEqual([r.outcome for r in records], [
+            'match get <key>', 'match set <key> <value>', 'fail UnknownCommandError'])
+        self.assertTrue(all(r.latency >= 0 for r in records))
+
+    def test_replay(self):
+        recording = self.record(['get a', 'set a b', 'get a b'] * 10)
+
+        report = replay(self.make_dispatcher(), StringIO(recording))
+        self.assertEqual(report.count, 30)
+        self.assertListEqual(report.differences, [])
+        self.assertGreater(report.throughput, 0)
+
+        changed = CommandDispatcher()
+        changed.command('get <key...>')(lambda key: key)
+
+        report = replay(changed, StringIO(recording), execute=True)
+        self.assertEqual(len(report.differences), 30)
+        self.assertIn(('get a b', 'fail TooManyArguments', 'match get <key...>'), report.differences)
+
+    def test_matchOnly(self):
+        f = StringIO()
+        dispatcher = self.make_dispatcher(recorder=CallRecorder(f))
+        dispatcher.command('fail')(lambda: 1 / 0)
+        dispatcher.add_hook('before_match', lambda call, args: 'denied' if call == 'get secret' else None)
+
+        for call in ['fail', 'get secret', 'get a']:
+            try:
+                dispatcher.dispatch(call)
+            except ZeroDivisionError:
+                pass
+
+        records = list(read_recording(StringIO(f.getvalue())))
+        self.assertListEqual([(r.outcome, r.matched) for r in records], [
+            ('fail ZeroDivisionError', 'match fail'), ('hook', 'hook'), ('match get <key>', 'match get <key>')])
+
+        replayed = self.make_dispatcher()
+        replayed.command('fail')(lambda: 1 / 0)
+
+        # Without executing, the calls are compared with the recorded outcomes of matching them
+        self.assertListEqual(replay(replayed, StringIO(f.getvalue())).differences, [])
+        self.assertListEqual(replay(replayed, StringIO(f.getvalue()), execute=True).differences,
+                             [('get secret', 'hook', 'match get <key>')])
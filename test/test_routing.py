@@ -0,0 +1,122 @@
+from unittest import TestCase
+from cliffs import CommandDispatcher, CallMatchFail, UnknownCommandError
+from cliffs.automaton import TokenAutomaton
+from cliffs.syntax_parser import SyntaxParser
+from cliffs.corpus import CorpusGenerator
+
+
+class TestPrefixRouting(TestCase):
+
+    def outcome(self, dispatcher, call):
+        try:
+            match, command = dispatcher._match(call)
+            return command.syntax, match._params, match._opts, match._vars, match.score
+        except (CallMatchFail, UnknownCommandError) as fail:
+            return fail.__class__, str(fail), getattr(fail, 'command', None)
+
+    options = {'prefix_routing': True}
+    drain_candidates = ['cluster node drain <id>', 'cluster {a b}', 'cluster [x] (y|z <w>) <rest*>']
+
+    def make_dispatchers(self, syntaxes):
+        dispatchers = CommandDispatcher(), CommandDispatcher(**self.options)
+        for dispatcher in dispatchers:
+            for syntax in syntaxes:
+                dispatcher.register(dispatcher.command_class(dispatcher.parser.parse(syntax), lambda: None))
+        return dispatchers
+
+    def assertSameOutcomes(self, syntaxes, calls):
+        plain, routed = self.make_dispatchers(syntaxes)
+        for call in calls:
+            expected = self.outcome(plain, call)
+            actual = self.outcome(routed, call)
+
+            # Commands are different objects, compare their syntaxes
+            if isinstance(expected[0], type):
+                expected = expected[:2] + (str(expected[2].syntax) if expected[2] else None,)
+                actual = actual[:2] + (str(actual[2].syntax) if actual[2] else None,)
+
+            self.assertEqual(actual, expected, call)
+
+    def test_sharedPrefixes(self):
+        syntaxes = [
+            'cluster node drain <id>', 'cluster node cordon <id> [--force]',
+            'cluster pool (create|delete) <name>', '<anything> else', 'CLUSTER status',
+            'cluster {a b}', 'cluster [x] (y|z <w>) <rest*>', 'Cluster (node|pool) list']
+        calls = [
+            'cluster node drain n1', 'cluster node cordon n1 --force', 'cluster pool create p',
+            'cluster node drian n1', 'cluster node', 'cluster', 'x else', 'cluster else',
+            'cluster status', 'CLUSTER status', 'cluster b a', 'clustr node drain n1', '',
+            'cluster x y', 'cluster z w r1 r2', 'cluster x', 'Cluster pool list', 'Cluster pool lst']
+
+        self.assertSameOutcomes(syntaxes, calls)
+
+        _, routed = self.make_dispatchers(syntaxes)
+        routed.dispatch('cluster node drain n1')
+        candidates = [str(route.command.syntax) for route, _ in routed._router.route('cluster node drain n1')]
+        self.assertListEqual(candidates, self.drain_candidates)
+
+    def test_statsKeepRouting(self):
+        dispatcher = CommandDispatcher(stats=True, **self.options)
+        for syntax in ['cluster node drain <id>', 'pool create <name>', 'node status']:
+            dispatcher.command(syntax)(lambda **_: None)
+
+        dispatcher.dispatch('cluster node drain n1')
+        with self.assertRaises(CallMatchFail):
+            dispatcher.dispatch('cluster node drain')
+
+        stats = dispatcher.stats()
+        self.assertEqual(stats['cluster node drain <id>']['attempts'], 2)
+        # Only the failed call falls back to trying the other commands
+        for syntax in ['pool create <name>', 'node status']:
+            self.assertEqual(stats.get(syntax, {}).get('attempts', 0), 1)
+
+    def test_randomCorpus(self):
+        generator = CorpusGenerator(seed=7)
+        syntaxes = [generator.random_syntax(depth=1) for _ in range(20)]
+        # Share prefixes between some of the commands
+        syntaxes += [f'{syntax.split()[0]} {generator.random_syntax(depth=1)}' for syntax in syntaxes[:10]]
+
+        calls = []
+        for syntax in syntaxes:
+            calls += generator.corpus(syntax, 5, mix=(1., 1., 1.))
+
+        self.assertSameOutcomes(syntaxes, calls)
+
+
+class TestAutomatonRouting(TestPrefixRouting):
+
+    options = {'automaton': True}
+    # Unordered groups are always tried
+    drain_candidates = ['cluster node drain <id>', 'cluster {a b}']
+
+    def test_boundedStates(self):
+        parser = SyntaxParser()
+        automaton = TokenAutomaton(max_states=5)
+        automaton.add(parser.parse('get <key> [<a> [<b> [<c>]]]'), 0)
+        automaton.add(parser.parse('x0 x1 x2 x3 x4 x5 x6 x7 x8 x9'), 1)
+
+        def reachable():
+            seen, stack = set(), [automaton._start]
+            while stack != []:
+                state = stack.pop()
+                if state is None or id(state) in seen:
+                    continue
+                seen.add(id(state))
+                stack += state.next.values()
+                stack.append(state.next_any)
+            return len(seen)
+
+        for i in range(200):
+            self.assertEqual(automaton.run([f'x{j}' for j in range(i % 11)]), (1,) if i % 11 == 10 else ())
+            self.assertEqual(automaton.run(['get', str(i)]), (0,))
+            self.assertLessEqual(reachable(), 5)
+
+    def test_slowLogKeepsRouting(self):
+        dispatcher = CommandDispatcher(automaton=True, slow_threshold=0)
+        for syntax in ['cluster node drain <id>', 'pool create <name>', 'node status']:
+            dispatcher.command(syntax)(lambda **_: None)
+
+        dispatcher.dispatch('cluster node drain n1')
+
+        entry, = dispatcher.slow_log.entries()
+        self.assertListEqual([attempt[0] for attempt in entry.attempts], ['cluster node drain <id>'])
@@ -0,0 +1,58 @@
+from io import BytesIO, StringIO
+from unittest import TestCase
+from cliffs import CommandDispatcher, ScriptLineError
+from cliffs.script import iter_script_lines
+
+
+class TestScriptLines(TestCase):
+
+    def assertScriptYields(self, script, expected):
+        self.assertListEqual(expected, list(iter_script_lines(StringIO(script))))
+
+    def test_commentsAndBlankLines(self):
+        self.assertScriptYields(
+            '# header\n\nfoo\n  # indented\nbar baz\n', [
+                (3, 'foo'),
+                (5, 'bar baz'),
+            ])
+
+    def test_continuation(self):
+        self.assertScriptYields(
+            'foo \\\n  bar \\\nbaz\nqux\n', [
+                (1, 'foo   bar baz'),
+                (4, 'qux'),
+            ])
+
+    def test_escapedBackslash(self):
+        """An escaped backslash at the end of a line should not continue it"""
+
+        self.assertScriptYields('foo \\\\\nbar', [(1, 'foo \\\\'), (2, 'bar')])
+
+    def test_binary(self):
+        self.assertListEqual([(1, 'foo'), (2, 'bar')], list(iter_script_lines(BytesIO(b'foo\r\nbar'))))
+
+
+class TestDispatchStream(TestCase):
+
+    def setUp(self):
+        self.dispatcher = CommandDispatcher()
+        self.values = []
+
+        @self.dispatcher.command('add <n: int>')
+        def add(n: int):
+            self.values.append(n)
+
+    def test_stopOnError(self):
+        with self.assertRaises(ScriptLineError) as ctx:
+            self.dispatcher.dispatch_stream(StringIO('add 1\nadd x\nadd 3\n'))
+
+        self.assertEqual(ctx.exception.line_number, 2)
+        self.assertListEqual(self.values, [1])
+
+    def test_continueOnError(self):
+        summary = self.dispatcher.dispatch_stream(
+            StringIO('add 1\nadd x\n# skipped\nfoo\nadd 3\n'), continue_on_error=True)
+
+        self.assertListEqual(self.values, [1, 3])
+        self.assertEqual((summary.dispatched, summary.succeeded, summary.failed), (4, 2, 2))
+        self.assertListEqual([e.line_number for e in summary.errors], [2, 4])
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import os
+import tempfile
+from time import sleep
+from unittest import IsolatedAsyncioTestCase
+from cliffs import CommandDispatcher
+from cliffs.serve import CommandServer
+
+
+class TestCommandServer(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.dispatcher = CommandDispatcher()
+
+        @self.dispatcher.command('echo <what>')
+        def echo(what):
+            return what
+
+        @self.dispatcher.command('whoami')
+        def whoami(user):
+            return user
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'cliffs.sock')
+
+        counter = iter(range(100))
+        self.server = CommandServer(
+            self.dispatcher, self.path, max_workers=2,
+            session_factory=lambda: {'user': f'user{next(counter)}'})
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        self.tmp.cleanup()
+
+    async def request(self, writer, reader, *calls):
+        writer.write(''.join(call + '\n' for call in calls).encode())
+        await writer.drain()
+        return [json.loads(await reader.readline()) for _ in calls]
+
+    async def test_pipelining(self):
+        reader, writer = await asyncio.open_unix_connection(self.path)
+
+        responses = await self.request(writer, reader, *(f'echo {i}' for i in range(20)), 'nope')
+
+        self.assertListEqual([r['result'] for r in responses[:-1]], [str(i) for i in range(20)])
+        self.assertEqual(responses[-1]['error'], 'UnknownCommandError')
+        writer.close()
+
+    async def test_session(self):
+        first = await asyncio.open_unix_connection(self.path)
+        second = await asyncio.open_unix_connection(self.path)
+
+        a, = await self.request(first[1], first[0], 'whoami')
+        b, = await self.request(second[1], second[0], 'whoami')
+        c, = await self.request(first[1], first[0], 'whoami')
+
+        self.assertNotEqual(a['result'], b['result'])
+        self.assertEqual(a['result'], c['result'])
+
+        first[1].close()
+        second[1].close()
+
+    async def test_disconnect(self):
+        finished = asyncio.Event()
+        errors = []
+        handle = self.server._handle_connection
+
+        async def handle_connection(reader, writer):
+            try:
+                await handle(reader, writer)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                finished.set()
+
+        self.server._handle_connection = handle_connection
+        self.server.max_pipeline = 2
+        await self.server.close()
+        await self.server.start()
+
+        @self.dispatcher.command('slow')
+        def slow():
+            sleep(0.01)
+            return 'x' * 100_000
+
+        # Disconnect without reading the responses while requests are still pending
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        writer.write(b'slow\n' * 50)
+        await writer.drain()
+        writer.transport.abort()
+
+        await asyncio.wait_for(finished.wait(), 10)
+        self.assertListEqual(errors, [])
+
+    async def test_malformedRequests(self):
+        errors = []
+        handle = self.server._handle_connection
+
+        async def handle_connection(reader, writer):
+            try:
+                await handle(reader, writer)
+            except BaseException as e:
+                errors.append(e)
+
+        self.server._handle_connection = handle_connection
+        self.server.max_request = 1024
+        await self.server.close()
+        await self.server.start()
+
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        writer.write(b'echo \xff\n' + b'echo a\n' + b'echo ' + b'x' * 4096 + b'\n')
+        await writer.drain()
+
+        invalid, echoed, oversized = [json.loads(await asyncio.wait_for(reader.readline(), 10)) for _ in range(3)]
+        self.assertEqual((invalid['ok'], invalid['error']), (False, 'UnicodeDecodeError'))
+        self.assertEqual(echoed['result'], 'a')
+        self.assertEqual((oversized['ok'], oversized['error']), (False, 'ValueError'))
+
+        # The connection is closed after an oversized request
+        self.assertEqual(await asyncio.wait_for(reader.read(), 10), b'')
+        self.assertListEqual(errors, [])
+        writer.close()
@@ -0,0 +1,70 @@
+from threading import Event, Thread
+from time import sleep
+from unittest import TestCase
+from cliffs import CommandDispatcher
+
+
+class TestSingleFlight(TestCase):
+
+    def setUp(self):
+        self.dispatcher = CommandDispatcher(coalesce=True)
+        self.release = Event()
+        self.calls = []
+
+        @self.dispatcher.command('status <cluster>', idempotent=True)
+        def status(cluster, session=None):
+            self.calls.append(cluster if session is None else (cluster, session))
+            self.release.wait(5)
+            return f'{cluster} ok' if session is None else f'{cluster} ok for {session}'
+
+    def test_coalescing(self):
+        results = []
+        threads = [
+            Thread(target=lambda: results.append(self.dispatcher.dispatch('status main')[0]))
+            for _ in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        # Wait for all followers to join the leader's execution
+        for _ in range(500):
+            if self.dispatcher._single_flight.coalesced == 7:
+                break
+            sleep(0.01)
+
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertListEqual(self.calls, ['main'])
+        self.assertListEqual(results, ['main ok'] * 8)
+
+    def test_sequentialCallsNotShared(self):
+        self.release.set()
+        self.dispatcher.dispatch('status main')
+        self.dispatcher.dispatch('status main')
+
+        self.assertListEqual(self.calls, ['main', 'main'])
+
+    def test_callbackArgsNotShared(self):
+        results = []
+        threads = [
+            Thread(target=lambda s=session: results.append(self.dispatcher.dispatch('status main', session=s)[0]))
+            for session in ['a', 'a', 'b']]
+        threads.append(Thread(target=lambda: results.append(self.dispatcher.dispatch('status main', session=[])[0])))
+
+        for thread in threads:
+            thread.start()
+
+        # Wait for the second call of session 'a' to join the first one
+        for _ in range(500):
+            if self.dispatcher._single_flight.coalesced == 1:
+                break
+            sleep(0.01)
+
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertCountEqual(self.calls, [('main', 'a'), ('main', 'b'), ('main', [])])
+        self.assertCountEqual(results, ['main ok for a', 'main ok for a', 'main ok for b', 'main ok for []'])
@@ -0,0 +1,80 @@
+from unittest import TestCase
+from cliffs import CommandDispatcher, CallMatchFail
+
+
+class TestSlowDispatchLog(TestCase):
+
+    def setUp(self):
+        self.dispatcher = CommandDispatcher(slow_threshold=0, slow_log_size=2, slow_log_sample=0)
+        self.dispatcher.command('get <key>')(lambda key: key)
+        self.dispatcher.command('get <key> <field>')(lambda key, field: field)
+
+    def test_explanation(self):
+        self.dispatcher.dispatch('get a')
+        entry, = self.dispatcher.slow_log.entries()
+
+        self.assertEqual((entry.command, entry.params), ('get <key>', {'key': 'a'}))
+        self.assertListEqual([(a[0], a[2], a[3]) for a in entry.attempts], [
+            ('get <key>', True, 1.5),
+            ('get <key> <field>', False, 1.5),
+        ])
+        self.assertIn('get <key> <field>', entry.explain())
+
+    def test_failure(self):
+        with self.assertRaises(CallMatchFail):
+            self.dispatcher.dispatch('get')
+
+        entry, = self.dispatcher.slow_log.entries()
+        self.assertIsInstance(entry.error, CallMatchFail)
+
+    def test_ringBuffer(self):
+        for call in ['get a', 'get b', 'get c']:
+            self.dispatcher.dispatch(call)
+
+        self.assertListEqual([e.call for e in self.dispatcher.slow_log.entries()], ['get b', 'get c'])
+
+    def test_threshold(self):
+        dispatcher = CommandDispatcher(slow_threshold=60_000)
+        dispatcher.command('get <key>')(lambda key: key)
+        dispatcher.dispatch('get a')
+
+        self.assertEqual(len(dispatcher.slow_log), 0)
+
+    def test_logging(self):
+        dispatcher = CommandDispatcher(slow_threshold=0)
+        dispatcher.command('get <key>')(lambda key: key)
+
+        with self.assertLogs('cliffs.dispatcher', 'WARNING') as logs:
+            dispatcher.dispatch('get a')
+
+        self.assertIn("Slow dispatch of 'get a'", logs.output[0])
+
+    def test_onlySlowExplained(self):
+        dispatcher = CommandDispatcher(slow_threshold=60_000)
+        dispatcher.command('get <key>')(lambda key: key)
+        collect = dispatcher._collect
+        measured = []
+
+        def _collect(call, mask=None, budgets=None, attempts=None):
+            measured.append(attempts is not None)
+            return collect(call, mask, budgets, attempts)
+
+        dispatcher._collect = _collect
+        dispatcher.dispatch('get a')
+        self.assertListEqual(measured, [False])
+
+    def test_cachedAndShortCircuited(self):
+        dispatcher = CommandDispatcher(slow_threshold=0, slow_log_sample=0, call_cache=True)
+        dispatcher.command('get <key>')(lambda key: key)
+        dispatcher.dispatch('get a')
+        dispatcher.dispatch('get a')
+        dispatcher.add_hook('before_match', lambda call, args: 'denied' if call == 'get b' else None)
+        dispatcher.dispatch('get b')
+
+        explained, cached, short_circuited = dispatcher.slow_log.entries()
+        self.assertEqual(len(explained.attempts), 1)
+        self.assertEqual((cached.attempts, cached.cached), ([], True))
+        self.assertIn('served from cache', cached.explain())
+        self.assertEqual((short_circuited.attempts, short_circuited.short_circuited), ([], True))
+        self.assertIn('short-circuited', short_circuited.explain())
+        self.assertNotIn('served from cache', short_circuited.explain())
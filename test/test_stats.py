@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+from cliffs import CommandDispatcher, CallMatchFail
+
+
+class TestDispatchStats(TestCase):
+
+    def setUp(self):
+        self.dispatcher = CommandDispatcher(stats=True)
+        self.dispatcher.command('get <key>')(lambda key: key)
+        self.dispatcher.command('set <key> <value>')(lambda key, value: None)
+
+    def test_disabled(self):
+        self.assertIsNone(CommandDispatcher().stats())
+
+    def test_counters(self):
+        self.dispatcher.dispatch('get a')
+        self.dispatcher.dispatch('get b')
+        with self.assertRaises(CallMatchFail):
+            self.dispatcher.dispatch('set a')
+
+        stats = self.dispatcher.stats()
+        self.assertEqual((stats['get <key>']['attempts'], stats['get <key>']['matches']), (3, 2))
+        self.assertEqual(stats['get <key>']['executions'], 2)
+        self.assertEqual(stats['get <key>']['execute_time']['count'], 2)
+        self.assertEqual((stats['set <key> <value>']['attempts'], stats['set <key> <value>']['matches']), (3, 0))
+        self.assertEqual(stats['set <key> <value>']['fail_time']['count'], 3)
+
+    def test_export(self):
+        self.dispatcher.dispatch('get a')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'stats')
+
+            self.dispatcher.export_stats(path)
+            with open(path) as f:
+                text = f.read()
+            self.assertIn('cliffs_command_attempts_total{command="get <key>"} 1', text)
+            self.assertIn('cliffs_command_execute_seconds_count{command="get <key>"} 1', text)
+
+            self.dispatcher.export_stats(path, 'json')
+            with open(path) as f:
+                self.assertEqual(json.load(f)['get <key>']['matches'], 1)
+
+    def test_sameSyntax(self):
+        # Overloads with the same syntax are reported together
+        self.dispatcher.command('get <key>')(lambda key: key)
+        self.dispatcher.dispatch('get a')
+
+        stats = self.dispatcher.stats()
+        self.assertEqual((stats['get <key>']['attempts'], stats['get <key>']['matches']), (2, 2))
+        self.assertEqual(stats['get <key>']['executions'], 1)
+        self.assertEqual(self.dispatcher._stats.to_prometheus().count('cliffs_command_attempts_total{command="get <key>"}'), 1)
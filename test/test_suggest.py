@@ -0,0 +1,72 @@
+import random
+from unittest import TestCase
+from cliffs import CommandDispatcher, UnknownCommandError
+from cliffs.suggest import SuggestionIndex, edit_distance
+
+
+class TestSuggestions(TestCase):
+
+    def test_sameAsLinearScan(self):
+        rng = random.Random(3)
+        words = [''.join(rng.choice('abcdef') for _ in range(rng.randint(2, 6))) for _ in range(300)]
+
+        dispatcher = CommandDispatcher()
+        for i, word in enumerate(words):
+            syntax = f'{word} <x>' if i % 3 else f'{word} {words[i - 1]}'
+            dispatcher.command(syntax)(lambda: None)
+
+        index = SuggestionIndex(max_distance=2, timeout=10, count=1000)
+        for command in dispatcher._commands:
+            index.add(command)
+
+        for _ in range(50):
+            call = f'{rng.choice(words)}{rng.choice("abz")} {rng.choice(words)}'
+            tokens = call.split()
+
+            expected = []
+            for order, command in enumerate(dispatcher._commands):
+                literals = [str(node) for node in command.syntax.children if not str(node).startswith('<')]
+                if len(tokens) < len(literals):
+                    continue
+
+                distance = sum(edit_distance(token, literal) for token, literal in zip(tokens, literals))
+                if distance <= 2 and distance < sum(map(len, literals)):
+                    expected.append((distance, order, command))
+
+            expected.sort(key=lambda e: e[:2])
+            self.assertEqual(index.suggest(call), [command for _, _, command in expected], call)
+
+    def test_editDistance(self):
+        self.assertEqual(edit_distance('kitten', 'sitting'), 3)
+        self.assertEqual(edit_distance('', 'abc'), 3)
+        self.assertEqual(edit_distance('abc', ''), 3)
+        self.assertEqual(edit_distance('flaw', 'lawn'), 2)
+        self.assertEqual(edit_distance('item12', 'itme12'), 2)
+
+    def test_dispatch(self):
+        dispatcher = CommandDispatcher(suggestions={'max_distance': 3})
+        push = dispatcher.command('git push', tags=['write'])(lambda: None)
+        pull = dispatcher.command('git pull')(lambda: None)
+        ls = dispatcher.command('ls <dir>')(lambda dir: None)
+
+        with self.assertRaises(UnknownCommandError) as cm:
+            dispatcher.dispatch('lx a')
+        self.assertEqual(cm.exception.suggestions, [ls])
+        self.assertIn('did you mean: ls <dir>?', str(cm.exception))
+
+        with self.assertRaises(UnknownCommandError) as cm:
+            dispatcher.dispatch('xit pul')
+        self.assertEqual(cm.exception.suggestions, [pull, push])
+
+        with self.assertRaises(UnknownCommandError) as cm:
+            dispatcher.dispatch('xit pul', mask=dispatcher.tag_mask('write'))
+        self.assertEqual(cm.exception.suggestions, [push])
+
+        dispatcher.unregister(pull)
+        with self.assertRaises(UnknownCommandError) as cm:
+            dispatcher.dispatch('xit pul')
+        self.assertEqual(cm.exception.suggestions, [push])
+
+        with self.assertRaises(UnknownCommandError) as cm:
+            dispatcher.dispatch('xyz')
+        self.assertEqual(cm.exception.suggestions, [])
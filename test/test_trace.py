@@ -0,0 +1,37 @@
+from unittest import TestCase
+from cliffs import CommandDispatcher, CallMatchFail
+
+
+class TestMatchTracer(TestCase):
+
+    def setUp(self):
+        self.dispatcher = CommandDispatcher()
+        self.dispatcher.command('get (a|b|c) <key>')(lambda: None)
+        self.dispatcher.command('put <key>')(lambda: None)
+
+    def test_spans(self):
+        tracer = self.dispatcher.trace('get b foo')
+        get, put = tracer.spans
+
+        self.assertIs(tracer.result, self.dispatcher._commands[0])
+        self.assertEqual((get.outcome, put.outcome), ('match', 'fail: MismatchedLiteral'))
+
+        variant_group = get.children[0].children[1]
+        self.assertEqual(variant_group.forks, 3)
+        self.assertEqual((variant_group.position, variant_group.end_position), (1, 2))
+        self.assertListEqual([v.outcome for v in variant_group.children],
+                             ['fail: MismatchedLiteral', 'match', 'fail: MismatchedLiteral'])
+
+    def test_failedResult(self):
+        tracer = self.dispatcher.trace('get d foo')
+        self.assertIsInstance(tracer.result, CallMatchFail)
+
+    def test_exports(self):
+        tracer = self.dispatcher.trace('put foo')
+
+        stacks = [line.rsplit(' ', 1)[0] for line in tracer.collapsed().splitlines()]
+        self.assertIn('command put <key>;sequence put <key>;literal put', stacks)
+
+        events = tracer.chrome_trace()['traceEvents']
+        self.assertEqual(len(events), len(stacks))
+        self.assertTrue(all(e['ph'] == 'X' and e['dur'] >= 0 for e in events))
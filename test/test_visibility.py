@@ -0,0 +1,98 @@
+from unittest import TestCase
+from cliffs import CommandDispatcher, CallMatchFail, UnknownCommandError
+from cliffs.corpus import CorpusGenerator
+
+
+class TestVisibility(TestCase):
+
+    def setUp(self):
+        generator = CorpusGenerator(seed=7)
+        self.syntaxes = ['get <key>', 'get <key: int>', 'get <a> [<b>]', 'set <key> <value>']
+        self.syntaxes += [generator.random_syntax(depth=1) for _ in range(96)]
+
+        self.calls = ['get 1', 'get a', 'get a b', 'set a b', 'foo']
+        for syntax in self.syntaxes[::4]:
+            self.calls += generator.corpus(syntax, 2, mix=(3., 1., 1.))
+
+    def outcome(self, dispatcher, call, mask=None):
+        try:
+            match, command = dispatcher._resolve(call, mask=mask)
+            return str(command.syntax), match._params, match.score
+        except (CallMatchFail, UnknownCommandError) as fail:
+            return fail.__class__, str(fail)
+
+    def test_sameAsFilteredDispatcher(self):
+        tenants = {'even': lambda i: i % 2 == 0, 'sparse': lambda i: i % 7 == 3}
+
+        for options in [{}, {'prefix_routing': True}, {'automaton': True},
+                        {'adaptive_order': True, 'call_cache': True}, {'stats': True}]:
+            dispatcher = CommandDispatcher(**options)
+            for i, syntax in enumerate(self.syntaxes):
+                tags = [tenant for tenant, permitted in tenants.items() if permitted(i)]
+                dispatcher.command(syntax, tags=tags)(lambda: None)
+
+            for tenant, permitted in tenants.items():
+                expected = CommandDispatcher()
+                for i, syntax in enumerate(self.syntaxes):
+                    if permitted(i):
+                        expected.command(syntax)(lambda: None)
+
+                mask = dispatcher.tag_mask(tenant)
+                for call in self.calls:
+                    self.assertEqual(self.outcome(dispatcher, call, mask), self.outcome(expected, call),
+                                     (options, tenant, call))
+
+    def test_masks(self):
+        dispatcher = CommandDispatcher(call_cache=True)
+        public = dispatcher.command('status', tags=['public'])(lambda: 'status')
+        admin = dispatcher.command('shutdown', tags=['admin'])(lambda: 'shutdown')
+
+        self.assertEqual(dispatcher.dispatch('shutdown')[0], 'shutdown')
+        with self.assertRaises(UnknownCommandError):
+            dispatcher.dispatch('shutdown', mask=dispatcher.tag_mask('public'))
+
+        both = dispatcher.tag_mask('public', 'admin')
+        self.assertEqual(both, dispatcher.command_mask(public, admin))
+        self.assertEqual(dispatcher.dispatch('shutdown', mask=both)[0], 'shutdown')
+        self.assertEqual(dispatcher.tag_mask('other'), 0)
+
+        dispatcher.unregister(admin)
+        self.assertEqual(dispatcher.tag_mask('public', 'admin'), dispatcher.command_mask(public))
+        with self.assertRaises(ValueError):
+            dispatcher.command_mask(admin)
+
+    def test_complement(self):
+        dispatcher = CommandDispatcher()
+        dispatcher.command('status', tags=['public'])(lambda: 'status')
+        dispatcher.command('shutdown', tags=['admin'])(lambda: 'shutdown')
+
+        guest = ~dispatcher.tag_mask('admin')
+        self.assertEqual(dispatcher.dispatch('status', mask=guest)[0], 'status')
+        with self.assertRaises(UnknownCommandError):
+            dispatcher.dispatch('shutdown', mask=guest)
+        self.assertEqual(dispatcher.complete('s', mask=guest).literals, ['status'])
+
+        # The complement covers commands registered later
+        dispatcher.command('uptime')(lambda: 'uptime')
+        self.assertEqual(dispatcher.dispatch('uptime', mask=guest)[0], 'uptime')
+
+    def test_replacedCommandsNotCovered(self):
+        dispatcher = CommandDispatcher(call_cache=True)
+        dispatcher.command('wipe', tags=['admin'], namespace='ops')(lambda: 'wipe')
+        dispatcher.command('status', tags=['admin'])(lambda: 'status')
+        admin = dispatcher.tag_mask('admin')
+
+        dispatcher.reload('ops', lambda d: d.command('wipe', tags=['guest'])(lambda: 'reloaded'))
+        self.assertEqual(dispatcher.tag_mask('admin'), dispatcher.command_mask(dispatcher._commands[1]))
+        with self.assertRaises(UnknownCommandError):
+            dispatcher.dispatch('wipe', mask=admin)
+        self.assertEqual(dispatcher.dispatch('wipe', mask=dispatcher.tag_mask('guest'))[0], 'reloaded')
+
+        old = dispatcher.replace(dispatcher.command_class(dispatcher.parser.parse('status'), lambda: 'replaced', tags=['admin']))
+        with self.assertRaises(UnknownCommandError):
+            dispatcher.dispatch('status', mask=admin)
+        self.assertEqual(dispatcher.dispatch('status', mask=dispatcher.tag_mask('admin'))[0], 'replaced')
+        self.assertEqual(str(old.syntax), 'status')
+
+        # Replaced commands keep their position in the registration order
+        self.assertEqual([c.callback() for c in dispatcher._visible(-1)], ['reloaded', 'replaced'])